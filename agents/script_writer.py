@@ -1,11 +1,15 @@
 import os
-import openai
+import sys
 from dotenv import load_dotenv
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+from utils.llm_gateway import get_gateway
+from utils.model_policy import policy_request
 
 load_dotenv()
-client = openai.OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
 
-def write_script(topic_title, topic_description):
+def script_request(topic_title, topic_description, bypass_cache=False):
     prompt = f"""
 You are a creative YouTube Shorts scriptwriter. Write a fast-paced, highly engaging 60-second script for a YouTube Short.
 
@@ -14,21 +18,24 @@ Description: {topic_description}
 
 Make it punchy, emotional, and structured for voiceover narration. Use short sentences and hooks. End with a call to action.
 """
-
-    response = client.chat.completions.create(
-        model="gpt-4",
-        messages=[
-            {"role": "system", "content": "You are a viral short-form scriptwriter for YouTube."},
-            {"role": "user", "content": prompt}
-        ],
-        temperature=0.9,
-        max_tokens=500
+    return policy_request(
+        "short_script",
+        prompt,
+        "You are a viral short-form scriptwriter for YouTube.",
+        bypass_cache=bypass_cache,
     )
 
-    script = response.choices[0].message.content.strip()
+async def awrite_script(topic_title, topic_description, bypass_cache=False):
+    request = script_request(topic_title, topic_description, bypass_cache)
+    script = (await get_gateway().acomplete(**request)).strip()
     print("📜 Generated Script:\n" + script)
     return script
 
+def write_script(topic_title, topic_description, bypass_cache=False):
+    return get_gateway().run(
+        awrite_script(topic_title, topic_description, bypass_cache)
+    )
+
 if __name__ == "__main__":
     write_script(
         topic_title="Rise and Grind - Morning Motivation Rituals",
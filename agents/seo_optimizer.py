@@ -1 +1,67 @@
-print("🚀 Agent active: seo_optimizer.py")
\ No newline at end of file
+import json
+import os
+import sys
+from dotenv import load_dotenv
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+from utils.llm_gateway import get_gateway
+from utils.model_policy import policy_request, register_validator
+
+load_dotenv()
+
+def seo_request(topic, script, bypass_cache=False):
+    prompt = f"""
+Write YouTube metadata for the video below.
+
+Topic: "{topic}"
+Script:
+{script[:1500]}
+
+Reply with JSON only, using the keys "title" (max 90 characters), "description" (2-3 sentences with a call to action) and "tags" (5-10 short keywords).
+"""
+    return policy_request(
+        "seo_metadata",
+        prompt,
+        "You are a YouTube SEO specialist.",
+        bypass_cache=bypass_cache,
+    )
+
+def parse_seo_metadata(raw):
+    """Parse the model's JSON reply; returns None if it is unusable"""
+    if not raw:
+        return None
+    start, end = raw.find("{"), raw.rfind("}")
+    if start == -1 or end <= start:
+        return None
+    try:
+        data = json.loads(raw[start:end + 1])
+    except json.JSONDecodeError:
+        return None
+    if not isinstance(data, dict) or not data.get("title"):
+        return None
+    tags = data.get("tags") or []
+    if isinstance(tags, str):
+        tags = [t.strip() for t in tags.split(",") if t.strip()]
+    return {
+        "title": str(data["title"])[:100],
+        "description": str(data.get("description", "")),
+        "tags": [str(t) for t in tags][:15],
+    }
+
+# Escalate to the larger model when the reply is not usable JSON metadata.
+register_validator("seo_metadata", lambda raw: parse_seo_metadata(raw) is not None)
+
+async def agenerate_seo_metadata(topic, script, bypass_cache=False):
+    raw = await get_gateway().acomplete(**seo_request(topic, script, bypass_cache))
+    metadata = parse_seo_metadata(raw)
+    print("🔎 SEO Metadata:\n" + json.dumps(metadata, indent=2))
+    return metadata
+
+def generate_seo_metadata(topic, script, bypass_cache=False):
+    return get_gateway().run(
+        agenerate_seo_metadata(topic, script, bypass_cache)
+    )
+
+if __name__ == "__main__":
+    print("🚀 Agent active: seo_optimizer.py")
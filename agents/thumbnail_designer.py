@@ -1,11 +1,15 @@
 import os
-import openai
+import sys
 from dotenv import load_dotenv
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+from utils.llm_gateway import get_gateway
+from utils.model_policy import policy_request
 
 load_dotenv()
-client = openai.OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
 
-def generate_thumbnail_idea(title, description):
+def thumbnail_request(title, description, bypass_cache=False):
     prompt = f"""
 You're an expert YouTube thumbnail designer. Based on the title and video concept below, suggest an attention-grabbing thumbnail idea for a YouTube Short.
 
@@ -17,21 +21,24 @@ Describe:
 - What visual elements should be included (person, object, background)
 - What emotion or tone it should convey (e.g., curiosity, urgency, awe)
 """
-
-    response = client.chat.completions.create(
-        model="gpt-4",
-        messages=[
-            {"role": "system", "content": "You're an expert in YouTube thumbnail design for viral Shorts."},
-            {"role": "user", "content": prompt}
-        ],
-        temperature=0.7,
-        max_tokens=300
+    return policy_request(
+        "thumbnail_idea",
+        prompt,
+        "You're an expert in YouTube thumbnail design for viral Shorts.",
+        bypass_cache=bypass_cache,
     )
 
-    thumbnail_concept = response.choices[0].message.content.strip()
+async def agenerate_thumbnail_idea(title, description, bypass_cache=False):
+    request = thumbnail_request(title, description, bypass_cache)
+    thumbnail_concept = (await get_gateway().acomplete(**request)).strip()
     print("🖼️ Thumbnail Concept:\n" + thumbnail_concept)
     return thumbnail_concept
 
+def generate_thumbnail_idea(title, description, bypass_cache=False):
+    return get_gateway().run(
+        agenerate_thumbnail_idea(title, description, bypass_cache)
+    )
+
 if __name__ == "__main__":
     generate_thumbnail_idea(
         title="Rise and Grind - Morning Motivation Rituals",
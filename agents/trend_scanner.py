@@ -1,29 +1,33 @@
 import os
-import openai
+import sys
 from dotenv import load_dotenv
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+from utils.llm_gateway import get_gateway
+from utils.model_policy import policy_request
 
 load_dotenv()
-client = openai.OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
 
-def generate_viral_idea():
+def viral_idea_request(bypass_cache=False):
     prompt = (
         "Give me a list of 3 viral YouTube Shorts topics related to personal finance, motivation, "
         "or entrepreneurship that are trending right now. Include a title and 1-sentence description for each."
     )
-
-    response = client.chat.completions.create(
-        model="gpt-4",
-        messages=[
-            {"role": "system", "content": "You are a viral trend analyst for YouTube content."},
-            {"role": "user", "content": prompt}
-        ],
-        temperature=0.8,
-        max_tokens=300
+    return policy_request(
+        "viral_ideas",
+        prompt,
+        "You are a viral trend analyst for YouTube content.",
+        bypass_cache=bypass_cache,
     )
 
-    ideas = response.choices[0].message.content.strip()
+async def agenerate_viral_idea(bypass_cache=False):
+    ideas = (await get_gateway().acomplete(**viral_idea_request(bypass_cache))).strip()
     print("🔥 Viral Topic Ideas:\n" + ideas)
     return ideas
 
+def generate_viral_idea(bypass_cache=False):
+    return get_gateway().run(agenerate_viral_idea(bypass_cache))
+
 if __name__ == "__main__":
     generate_viral_idea()
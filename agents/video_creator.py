@@ -1,9 +1,14 @@
+import json
 import os
 import sys
-import openai
 import requests
-import time
+import shutil
 import subprocess
+import tempfile
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import partial
 from PIL import Image
 from io import BytesIO
 from dotenv import load_dotenv
@@ -11,12 +16,40 @@ from pathlib import Path
 
 sys.path.append(str(Path(__file__).parent.parent))
 from utils.platform_utils import (
-    get_ffmpeg_command,
     normalize_path,
+    replace_file,
     run_command,
     ensure_directory,
     get_repo_dir,
 )
+from utils.ai_clients import (
+    ELEVENLABS_REQUEST_OPTIONS,
+    get_elevenlabs_client,
+    get_openai_client,
+)
+from utils.asset_cache import get_asset_cache, link_or_copy, make_asset_key
+from utils.audio_utils import audio_duration, silent_wav, write_silent_wav
+from utils.ffmpeg_pool import (
+    FFMPEG_PROGRESS,
+    SegmentEncoder,
+    concat_segments,
+    print_progress,
+)
+from utils.job_state import get_job_store
+from utils.llm_cache import get_call_site_ttl, get_llm_cache, make_cache_key
+from utils.llm_gateway import get_gateway
+from utils.media_fetch import fetch_media, fetch_media_bytes
+from utils.model_policy import policy_request
+from utils.provider_router import get_router
+from utils.rate_limiter import rate_limited_call
+from utils.storage import get_storage_governor
+from utils.tts_batch import batch_groups, synthesize_batch
+from utils.workspace import (
+    VIDEO_OUTPUT_DIR,
+    JobWorkspace,
+    is_job_id,
+    job_workspace,
+)
 
 
 def safe_import_elevenlabs():
@@ -37,6 +70,78 @@ ELEVENLABS_AVAILABLE, ElevenLabs = safe_import_elevenlabs()
 
 load_dotenv()
 
+STREAM_SCENE_PLAN = os.getenv("STREAM_SCENE_PLAN", "true").lower() == "true"
+SCENE_ASSET_WORKERS = int(os.getenv("SCENE_ASSET_WORKERS", "4"))
+SCENE_ASSET_RETRIES = int(os.getenv("SCENE_ASSET_RETRIES", "2"))
+# Voice all scenes in one timestamped ElevenLabs request and split the audio,
+# instead of one request per scene (which remains the fallback).
+TTS_BATCH = os.getenv("TTS_BATCH", "true").lower() == "true"
+# A batch can only be sent once the whole plan is known, which for a streamed
+# plan means after the last token, so streamed renders voice scene by scene
+# (starting with the first shot) unless this is set.
+TTS_BATCH_STREAMING = os.getenv("TTS_BATCH_STREAMING", "false").lower() == "true"
+# Generation parameters; they are part of the asset cache key.
+IMAGE_MODEL = "realtime-text2img"
+IMAGE_SIZE = 512
+VOICE_ID = os.getenv("ELEVENLABS_VOICE_ID", "JBFqnCBsd6RMkjVDRZzb")
+VOICE_MODEL = os.getenv("ELEVENLABS_MODEL", "eleven_multilingual_v2")
+# "segments": encode one file per scene, then concat (N+1 ffmpeg runs).
+# "filtergraph": one ffmpeg run over every scene, no intermediate files.
+# "memory": like filtergraph, but assets stay in memory and reach ffmpeg
+#           through named pipes, so only the final MP4 is written.
+VIDEO_RENDERER = os.getenv("VIDEO_RENDERER", "segments")
+# Cached assets are still read in memory mode, but new ones are only written
+# to the asset cache when this is set, so by default nothing but the final MP4
+# touches disk.
+MEMORY_RENDER_CACHE_WRITES = (
+    os.getenv("MEMORY_RENDER_CACHE_WRITES", "false").lower() == "true"
+)
+RENDER_WIDTH = int(os.getenv("RENDER_WIDTH", "512"))
+RENDER_HEIGHT = int(os.getenv("RENDER_HEIGHT", "512"))
+RENDER_FPS = int(os.getenv("RENDER_FPS", "25"))
+# Default profile for renders that do not ask for one.
+RENDER_PROFILE = os.getenv("RENDER_PROFILE", "standard")
+
+# Encode settings per render profile. "draft" is a fast low-resolution
+# preview for checking scene timing; "final" is the high-quality encode.
+RENDER_PROFILES = {
+    "draft": {
+        "width": 256,
+        "height": 256,
+        "fps": 5,
+        "preset": "ultrafast",
+        "crf": 35,
+        "audio_bitrate": "48k",
+    },
+    "standard": {
+        "width": RENDER_WIDTH,
+        "height": RENDER_HEIGHT,
+        "fps": RENDER_FPS,
+        "preset": "medium",
+        "crf": 23,
+        "audio_bitrate": "192k",
+    },
+    "final": {
+        "width": 1024,
+        "height": 1024,
+        "fps": 30,
+        "preset": "slow",
+        "crf": 18,
+        "audio_bitrate": "256k",
+    },
+}
+
+
+def get_render_profile(name=None):
+    """Settings for a named render profile (defaults to RENDER_PROFILE)"""
+    name = name or RENDER_PROFILE
+    if name not in RENDER_PROFILES:
+        raise ValueError(
+            f"Unknown render profile {name!r} "
+            f"(expected one of {', '.join(RENDER_PROFILES)})"
+        )
+    return dict(RENDER_PROFILES[name], name=name)
+
 
 def log_action(agent, action, reward=0):
     """Import the logging function from the main launcher"""
@@ -53,32 +158,328 @@ def log_action(agent, action, reward=0):
         print(f"[{agent}] {action} (Reward: {reward})")
 
 
-class VideoCreatorAgent:
+class SceneStreamParser:
+    """Incremental Narration/Prompt parser for a (possibly streamed) production plan
+
+    Text is fed in arbitrary chunks; a scene is returned as soon as the line
+    holding its image prompt is complete, which closes the "Shot X" block.
+    """
+
     def __init__(self):
-        self.client = openai.OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+        self._buffer = ""
+        self._current_scene = {}
+
+    def feed(self, text):
+        """Consume more completion text and return the scenes it completed"""
+        self._buffer += text
+        *lines, self._buffer = self._buffer.split("\n")
+        return self._parse_lines(lines)
+
+    def close(self):
+        """Flush the trailing partial line once the completion has ended"""
+        lines, self._buffer = [self._buffer], ""
+        return self._parse_lines(lines)
+
+    def _parse_lines(self, lines):
+        scenes = []
+        for line in lines:
+            line = line.strip()
+            scene = self._current_scene
+            if line.startswith("Narration:"):
+                scene["narration"] = line.replace("Narration:", "").strip()
+            elif line.startswith("Prompt:"):
+                scene["image_prompt"] = line.replace("Prompt:", "").strip()
+                if "narration" in scene:
+                    scenes.append(scene.copy())
+                    self._current_scene = {}
+        return scenes
+
+
+class SceneAssetStage:
+    """Concurrent image and voiceover generation for a video's scenes
+
+    Images and voiceovers run on separate bounded pools, so every scene's
+    ModelsLab and ElevenLabs calls overlap. Each asset is retried on its own;
+    narration that still fails is replaced by silence, and a scene whose
+    image still fails is dropped with a warning, the remaining scenes being
+    returned in their original order. With ``in_memory`` the
+    assets are returned as bytes instead of file paths. When the agent has
+    job checkpoints, assets a previous attempt of the job produced are reused.
+
+    With ``batch_voice`` the narration is voiced in one batched request once
+    every scene is known (when ``results`` is called), falling back to one
+    request per scene if the batch cannot be voiced or split.
+    """
+
+    def __init__(
+        self,
+        agent,
+        workers=SCENE_ASSET_WORKERS,
+        retries=SCENE_ASSET_RETRIES,
+        in_memory=None,
+        batch_voice=None,
+    ):
+        self.agent = agent
+        self.retries = retries
+        if in_memory is None:
+            in_memory = VIDEO_RENDERER == "memory"
+        self.in_memory = in_memory
+        if batch_voice is None:
+            batch_voice = TTS_BATCH and agent.elevenlabs_client is not None
+        self.batch_voice = batch_voice
+        self.started = time.time()
+        self._image_pool = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="scene-image"
+        )
+        self._voice_pool = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="scene-voice"
+        )
+        self._scenes = []
+        self.rendered_scenes = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        for pool in (self._image_pool, self._voice_pool):
+            pool.shutdown(wait=True, cancel_futures=True)
+
+    def __len__(self):
+        return len(self._scenes)
+
+    def _timed(self, label, fn, *args):
+        """Run ``fn`` with retries; returns (result, seconds)"""
+        started = time.time()
+        for attempt in range(self.retries + 1):
+            try:
+                return fn(*args), time.time() - started
+            except Exception as e:
+                if attempt == self.retries:
+                    raise
+                delay = 2**attempt
+                print(f"⚠️ {label} failed ({e}), retrying in {delay}s")
+                time.sleep(delay)
+
+    def _checkpointed(self, label, stage, inputs, fn, *args):
+        """``_timed``, skipping an asset this job has already produced
+
+        Only file assets are checkpointed; in-memory ones are covered by the
+        asset cache. Silent stand-in narration (a .wav) is not recorded, so a
+        resumed job asks ElevenLabs again.
+        """
+        checkpoints = None if self.in_memory else self.agent.checkpoints
+        if checkpoints is not None:
+            done = checkpoints.get(stage, inputs)
+            if done is not None:
+                print(f"⏭️ {label} already done, skipping")
+                return done["path"], 0.0
+        result, seconds = self._timed(label, fn, *args)
+        if checkpoints is not None and not result.endswith(".wav"):
+            checkpoints.record(stage, path=result, inputs=inputs)
+        return result, seconds
+
+    def _voice_job(self, idx, narration):
+        """``_voiced`` arguments for one scene's voiceover"""
+        inputs = {"narration": narration, "voice": VOICE_ID, "model": VOICE_MODEL}
+        if self.in_memory:
+            generate = partial(self.agent.generate_voiceover_bytes, fallback=False)
+            call = (generate, narration)
+        else:
+            generate = partial(self.agent.generate_voiceover, fallback=False)
+            call = (generate, narration, f"audio_{idx:02d}.mp3")
+        return (f"Scene {idx+1} voiceover", f"audio_{idx:02d}", inputs) + call
+
+    def _voiced(self, label, stage, inputs, fn, text, *args):
+        """``_checkpointed`` for a voiceover, using silence once retries run out"""
+        started = time.time()
+        try:
+            return self._checkpointed(label, stage, inputs, fn, text, *args)
+        except Exception as e:
+            print(f"❌ {label} failed ({e}), using silence")
+        if self.in_memory:
+            silence = self.agent._create_silent_audio_bytes(text)
+        else:
+            silence = self.agent._create_silent_audio(args[0], text)
+        return silence, time.time() - started
+
+    def _resumed_voice(self, idx, narration):
+        """A finished future if this job already voiced the scene, else None"""
+        if self.in_memory or self.agent.checkpoints is None:
+            return None
+        label, stage, inputs = self._voice_job(idx, narration)[:3]
+        done = self.agent.checkpoints.get(stage, inputs)
+        if done is None:
+            return None
+        print(f"⏭️ {label} already done, skipping")
+        voice = Future()
+        voice.set_result((done["path"], 0.0))
+        return voice
+
+    def submit(self, scene):
+        """Start generating one scene's assets; scenes keep submission order"""
+        idx = len(self._scenes)
+        elapsed = time.time() - self.started
+        print(f"🎬 Scene {idx+1} (+{elapsed:.1f}s): {scene['narration']}")
+        if self.in_memory:
+            image_call = (self.agent.generate_image_bytes, scene["image_prompt"])
+        else:
+            image_call = (self.agent.generate_image, scene["image_prompt"], idx)
+        image_inputs = {
+            "prompt": scene["image_prompt"],
+            "model": IMAGE_MODEL,
+            "size": IMAGE_SIZE,
+        }
+        image = self._image_pool.submit(
+            self._checkpointed,
+            f"Scene {idx+1} image",
+            f"image_{idx:02d}",
+            image_inputs,
+            *image_call,
+        )
+        if self.batch_voice:
+            voice = self._resumed_voice(idx, scene["narration"])
+        else:
+            voice = self._voice_pool.submit(
+                self._voiced, *self._voice_job(idx, scene["narration"])
+            )
+        self._scenes.append((scene, image, voice))
+
+    def _batched_voices(self):
+        """Voiceover futures, by scene index, for scenes not yet voiced"""
+        pending = [idx for idx, (_, _, voice) in enumerate(self._scenes) if voice is None]
+        texts = [self._scenes[idx][0]["narration"] for idx in pending]
+        filenames = None
+        if not self.in_memory:
+            filenames = [f"audio_{idx:02d}.mp3" for idx in pending]
+        started = time.time()
+        try:
+            audio = self.agent.generate_voiceovers_batched(texts, filenames)
+        except Exception as e:
+            print(f"⚠️ Batched voiceover failed ({e}), voicing scenes one by one")
+            return {
+                idx: self._voice_pool.submit(self._voiced, *self._voice_job(idx, text))
+                for idx, text in zip(pending, texts)
+            }
+        # Scenes share the request, so each is charged an equal part of it.
+        seconds = (time.time() - started) / max(len(audio), 1)
+        checkpoints = None if self.in_memory else self.agent.checkpoints
+        voices = {}
+        for idx, text, result in zip(pending, texts, audio):
+            if checkpoints is not None:
+                _, stage, inputs = self._voice_job(idx, text)[:3]
+                checkpoints.record(stage, path=result, inputs=inputs)
+            voice = Future()
+            voice.set_result((result, seconds))
+            voices[idx] = voice
+        return voices
+
+    def results(self):
+        """Wait for every scene and return its (image, audio) pairs in order"""
+        inputs = []
+        busy = 0.0
+        self.rendered_scenes = []
+        batched = {}
+        if any(voice is None for _, _, voice in self._scenes):
+            batched = self._batched_voices()
+        for idx, (scene, image, voice) in enumerate(self._scenes):
+            if voice is None:
+                voice = batched[idx]
+            try:
+                img_path, img_seconds = image.result()
+                audio_path, voice_seconds = voice.result()
+            except Exception as e:
+                print(f"❌ Scene {idx+1} dropped: {e}")
+                continue
+            busy += img_seconds + voice_seconds
+            print(
+                f"⏱️ Scene {idx+1}: image {img_seconds:.1f}s, voiceover "
+                f"{voice_seconds:.1f}s, ready at +{time.time() - self.started:.1f}s"
+            )
+            inputs.append((img_path, audio_path))
+            self.rendered_scenes.append(scene)
+        wall = time.time() - self.started
+        print(
+            f"⏱️ Assets for {len(inputs)}/{len(self._scenes)} scenes in {wall:.1f}s "
+            f"({busy:.1f}s if run one after another)"
+        )
+        return inputs
+
+
+class VideoCreatorAgent:
+    def __init__(self, output_dir=None, profile=None, job_id=None):
+        self.client = get_openai_client()
         self.eleven_key = os.getenv("ELEVENLABS_API_KEY")
         self.elevenlabs_client = (
-            ElevenLabs(api_key=self.eleven_key)
+            get_elevenlabs_client(self.eleven_key)
             if ELEVENLABS_AVAILABLE and ElevenLabs and self.eleven_key
             else None
         )
         self.stability_key = os.getenv("MODELSLAB_API_KEY")
-        self.output_dir = normalize_path("output")
+        self.output_dir = normalize_path(output_dir or "output")
         ensure_directory(self.output_dir)
+        self.profile = get_render_profile(profile)
+        # Scenes that made it into the last render and their (image, audio)
+        # assets, for draft manifests.
+        self.scenes = []
+        self.assets = []
+        # Stage records of the job this render belongs to, for resuming it.
+        self.checkpoints = get_job_store().checkpoints(job_id) if job_id else None
 
-    def execute_task(self, script_text):
+    def produce(self, script_text, production_plan=None):
+        """Render a script into ``output_dir``; returns the video path or None"""
+        if production_plan is None:
+            production_plan = self._resumed_scene_plan(script_text)
+        if production_plan is None and STREAM_SCENE_PLAN:
+            return self.create_video_streaming(script_text)
+        if production_plan is None:
+            production_plan = self.break_script_into_scenes(script_text)
+            self._record_scene_plan(script_text, production_plan)
+        scenes = self.parse_scenes(production_plan)
+        return self.create_video(scenes) if scenes else None
+
+    def prepare_assets(self, script_text, production_plan=None):
+        """Generate and checkpoint every scene's assets without rendering
+
+        Assets are written as files so they are checkpointed even when the
+        renderer works in memory (which then reads them from the asset
+        cache). Returns the number of scenes whose assets are ready.
+        """
+        if production_plan is None:
+            production_plan = self._resumed_scene_plan(script_text)
+        if production_plan is None:
+            production_plan = self.break_script_into_scenes(script_text)
+            self._record_scene_plan(script_text, production_plan)
+        with SceneAssetStage(self, in_memory=False) as stage:
+            for scene in self.parse_scenes(production_plan):
+                stage.submit(scene)
+            return len(stage.results())
+
+    def _resumed_scene_plan(self, script_text):
+        if self.checkpoints is None:
+            return None
+        done = self.checkpoints.get("scene_plan", {"script": script_text})
+        if done is None:
+            return None
+        print("⏭️ Scene plan already done, skipping")
+        return done["value"]
+
+    def _record_scene_plan(self, script_text, production_plan):
+        if self.checkpoints is not None and production_plan:
+            self.checkpoints.record(
+                "scene_plan", value=production_plan, inputs={"script": script_text}
+            )
+
+    def execute_task(self, script_text, production_plan=None):
         """Main entry point for CrewAI Agent integration"""
         try:
             log_action("video_creator", "Starting video creation process")
 
-            production_plan = self.break_script_into_scenes(script_text)
-            scenes = self.parse_scenes(production_plan)
+            video_path = self.produce(script_text, production_plan)
 
-            if not scenes:
+            if not video_path:
                 log_action("video_creator", "No scenes parsed from script", -1)
                 return "Error: Could not parse scenes from script"
 
-            video_path = self.create_video(scenes)
             log_action("video_creator", f"Video created successfully: {video_path}", 1)
             return f"Short video file created: {video_path}"
 
@@ -86,8 +487,9 @@ class VideoCreatorAgent:
             log_action("video_creator", f"Video creation failed: {str(e)}", -1)
             return f"Error creating video: {str(e)}"
 
-    def break_script_into_scenes(self, script_text):
-        """Convert script to production plan using GPT-4"""
+    @staticmethod
+    def scene_plan_request(script_text, bypass_cache=False):
+        """Gateway request that turns a script into a production plan"""
         prompt = f"""Break this YouTube Shorts script into a shot-by-shot production plan.
 For each shot, include:
 - Narration: (1 sentence max)
@@ -103,39 +505,34 @@ Prompt: [image prompt here]
 SCRIPT:
 {script_text}"""
 
-        response = self.client.chat.completions.create(
-            model="gpt-4",
-            messages=[{"role": "user", "content": prompt}],
-            max_tokens=700,
+        return policy_request("scene_plan", prompt, bypass_cache=bypass_cache)
+
+    def break_script_into_scenes(self, script_text, bypass_cache=False):
+        """Convert script to production plan using GPT-4 (cached per script)"""
+        return get_gateway().complete(
+            **self.scene_plan_request(script_text, bypass_cache)
         )
-        return response.choices[0].message.content
 
     def parse_scenes(self, production_plan):
         """Parse the production plan into scene objects"""
-        scenes = []
-        current_scene = {}
+        parser = SceneStreamParser()
+        return parser.feed(production_plan) + parser.close()
 
-        for line in production_plan.split("\n"):
-            line = line.strip()
-            if line.startswith("Narration:"):
-                current_scene["narration"] = line.replace("Narration:", "").strip()
-            elif line.startswith("Prompt:"):
-                current_scene["image_prompt"] = line.replace("Prompt:", "").strip()
-                if "narration" in current_scene and "image_prompt" in current_scene:
-                    scenes.append(current_scene.copy())
-                    current_scene = {}
-
-        return scenes
+    @staticmethod
+    def _image_key(prompt_text):
+        return make_asset_key(
+            "modelslab", IMAGE_MODEL, None, prompt_text, f"{IMAGE_SIZE}x{IMAGE_SIZE}"
+        )
 
-    def generate_image(self, prompt_text, idx):
-        """Generate image using ModelsLab API"""
+    def _request_image_url(self, prompt_text):
+        """Ask ModelsLab for an image and return its download URL"""
         stable_url = "https://modelslab.com/api/v6/realtime/text2img"
         payload = {
             "key": self.stability_key,
             "prompt": prompt_text,
             "negative_prompt": "bad quality",
-            "width": "512",
-            "height": "512",
+            "width": str(IMAGE_SIZE),
+            "height": str(IMAGE_SIZE),
             "samples": 1,
             "safety_checker": False,
             "seed": None,
@@ -144,22 +541,51 @@ SCRIPT:
             "track_id": None,
         }
 
-        response = requests.post(stable_url, json=payload)
-        response.raise_for_status()
-        data = response.json()
+        def post():
+            response = requests.post(stable_url, json=payload)
+            response.raise_for_status()
+            return response
+
+        data = rate_limited_call("modelslab", post).json()
 
         if "output" in data and isinstance(data["output"], list):
-            image_url = data["output"][0]
-            img_data = requests.get(image_url).content
-            img_path = os.path.join(self.output_dir, f"scene_{idx:02d}.png")
-            with open(img_path, "wb") as f:
-                f.write(img_data)
-            return img_path
+            return data["output"][0]
         else:
             raise ValueError("No output image received from Stable Diffusion API")
 
-    def generate_voiceover(self, text, filename):
-        """Generate voiceover using ElevenLabs with improved error handling"""
+    def generate_image(self, prompt_text, idx):
+        """Generate image using ModelsLab API (served from the asset cache when possible)"""
+        img_path = os.path.join(self.output_dir, f"scene_{idx:02d}.png")
+        key = self._image_key(prompt_text)
+        cache = get_asset_cache()
+        if cache.fetch(key, img_path, kind="image"):
+            print(f"♻️ Scene {idx + 1} image reused from the asset cache")
+            return img_path
+
+        fetch_media(self._request_image_url(prompt_text), img_path)
+        cache.store(key, img_path, kind="image")
+        return img_path
+
+    def generate_image_bytes(self, prompt_text):
+        """In-memory variant of ``generate_image`` for the memory renderer"""
+        key = self._image_key(prompt_text)
+        cache = get_asset_cache()
+        data = cache.read(key, kind="image")
+        if data is not None:
+            return data
+
+        data = fetch_media_bytes(self._request_image_url(prompt_text))
+        if MEMORY_RENDER_CACHE_WRITES:
+            cache.store_bytes(key, data, ".png", kind="image")
+        return data
+
+    def generate_voiceover(self, text, filename, fallback=True):
+        """Generate voiceover using ElevenLabs with improved error handling
+
+        A failed request falls back to silence, or with ``fallback=False`` is
+        raised so the caller can retry it. Missing credentials always give
+        silence, since retrying cannot help.
+        """
         if not self.eleven_key:
             print("❌ ElevenLabs API key not found")
             return self._create_silent_audio(filename, text)
@@ -168,128 +594,668 @@ SCRIPT:
             return self._create_silent_audio(filename, text)
         else:
             try:
-                audio_generator = self.elevenlabs_client.text_to_speech.convert(
-                    text=text,
-                    voice_id="JBFqnCBsd6RMkjVDRZzb",
-                    model_id="eleven_multilingual_v2",
-                )
-
                 out_path = os.path.join(self.output_dir, filename)
-                with open(out_path, "wb") as f:
-                    for chunk in audio_generator:
-                        if isinstance(chunk, bytes):
+                key = make_asset_key("elevenlabs", VOICE_MODEL, VOICE_ID, text)
+                cache = get_asset_cache()
+                if cache.fetch(key, out_path, kind="voiceover"):
+                    print(f"♻️ Voiceover for {filename} reused from the asset cache")
+                    return out_path
+
+                def convert():
+                    # The SDK issues the request lazily, so the download is
+                    # part of the rate-limited (and retried) call. It goes to
+                    # a .part file because out_path may be a read-only link
+                    # to a cached blob from an earlier fetch.
+                    part = f"{out_path}.part"
+                    with open(part, "wb") as f:
+                        for chunk in self._tts_chunks(text):
                             f.write(chunk)
+                    replace_file(part, out_path)
+                    return out_path
+
+                rate_limited_call("elevenlabs", convert)
+                # Only real narration is cached, never the silent fallback.
+                cache.store(key, out_path, kind="voiceover")
                 return out_path
             except Exception as e:
+                if not fallback:
+                    raise
                 print(f"❌ ElevenLabs voiceover failed: {e}")
                 return self._create_silent_audio(filename, text)
 
-    def _create_silent_audio(self, filename, text):
-        """Create silent audio as fallback"""
-        out_path = normalize_path(os.path.join(self.output_dir, filename))
+    def _tts_chunks(self, text):
+        """Audio chunks for ``text`` as the ElevenLabs SDK streams them"""
+        audio_generator = self.elevenlabs_client.text_to_speech.convert(
+            text=text,
+            voice_id=VOICE_ID,
+            model_id=VOICE_MODEL,
+            request_options=ELEVENLABS_REQUEST_OPTIONS,
+        )
+        return (chunk for chunk in audio_generator if isinstance(chunk, bytes))
+
+    def generate_voiceovers_batched(self, texts, filenames=None):
+        """Voice several narrations with batched, timestamped ElevenLabs requests
+
+        Returns a path in ``output_dir`` per entry of ``filenames``, or an MP3
+        buffer per text when ``filenames`` is None. Cached narrations are
+        reused and only the rest are sent. Unlike ``generate_voiceover`` this
+        raises instead of falling back to silence, so the caller can retry
+        scene by scene.
+        """
+        if not self.elevenlabs_client:
+            raise RuntimeError("ElevenLabs not configured")
+        cache = get_asset_cache()
+        keys = [make_asset_key("elevenlabs", VOICE_MODEL, VOICE_ID, t) for t in texts]
+        audio = [None] * len(texts)
+        for i, key in enumerate(keys):
+            if filenames is None:
+                audio[i] = cache.read(key, kind="voiceover")
+            else:
+                out_path = os.path.join(self.output_dir, filenames[i])
+                if cache.fetch(key, out_path, kind="voiceover"):
+                    audio[i] = out_path
+
+        missing = [i for i, result in enumerate(audio) if result is None]
+        groups = [
+            [missing[j] for j in group]
+            for group in batch_groups([texts[i] for i in missing])
+        ]
+        for group in groups:
+            pieces = rate_limited_call(
+                "elevenlabs",
+                lambda group=group: synthesize_batch(
+                    self.elevenlabs_client,
+                    [texts[i] for i in group],
+                    VOICE_ID,
+                    VOICE_MODEL,
+                ),
+            )
+            for i, data in zip(group, pieces):
+                if filenames is not None or MEMORY_RENDER_CACHE_WRITES:
+                    cache.store_bytes(keys[i], data, ".mp3", kind="voiceover")
+                if filenames is None:
+                    audio[i] = data
+                    continue
+                out_path = os.path.join(self.output_dir, filenames[i])
+                with open(f"{out_path}.part", "wb") as f:
+                    f.write(data)
+                replace_file(f"{out_path}.part", out_path)
+                audio[i] = out_path
+        print(
+            f"🗣️ {len(texts)} voiceovers from {len(groups)} batched request(s), "
+            f"{len(texts) - len(missing)} reused from the asset cache"
+        )
+        return audio
+
+    def generate_voiceover_bytes(self, text, fallback=True):
+        """In-memory variant of ``generate_voiceover`` for the memory renderer"""
+        if not self.eleven_key or not ELEVENLABS_AVAILABLE or not self.elevenlabs_client:
+            print("❌ ElevenLabs not configured, using silence")
+            return self._create_silent_audio_bytes(text)
         try:
-            ffmpeg_cmd = get_ffmpeg_command()
-            duration = max(3, len(text.split()) * 0.5)
-            cmd = [
-                ffmpeg_cmd,
-                "-y",
-                "-f",
-                "lavfi",
-                "-i",
-                f"anullsrc=duration={duration}",
-                "-c:a",
-                "aac",
-                out_path,
+            key = make_asset_key("elevenlabs", VOICE_MODEL, VOICE_ID, text)
+            cache = get_asset_cache()
+            data = cache.read(key, kind="voiceover")
+            if data is not None:
+                return data
+
+            data = rate_limited_call(
+                "elevenlabs", lambda: b"".join(self._tts_chunks(text))
+            )
+            if MEMORY_RENDER_CACHE_WRITES:
+                cache.store_bytes(key, data, ".mp3", kind="voiceover")
+            return data
+        except Exception as e:
+            if not fallback:
+                raise
+            print(f"❌ ElevenLabs voiceover failed: {e}")
+            return self._create_silent_audio_bytes(text)
+
+    @staticmethod
+    def _silence_duration(text):
+        """Length of the silent stand-in for narration that could not be voiced"""
+        return max(3, len(text.split()) * 0.5)
+
+    def _create_silent_audio(self, filename, text):
+        """Create silent audio as fallback (a WAV written in-process)"""
+        name = os.path.splitext(filename)[0] + ".wav"
+        out_path = normalize_path(os.path.join(self.output_dir, name))
+        return write_silent_wav(out_path, self._silence_duration(text))
+
+    def _create_silent_audio_bytes(self, text):
+        """In-memory variant of ``_create_silent_audio``"""
+        return silent_wav(self._silence_duration(text))
+
+    def create_video_streaming(self, script_text, bypass_cache=False):
+        """Stream the scene plan and start each scene's assets as soon as it closes
+
+        Image and voiceover generation for a shot is dispatched the moment its
+        Prompt line arrives, so time to first asset is one shot's worth of
+        tokens instead of the whole completion. Voiceovers of a streamed plan
+        are therefore not batched unless TTS_BATCH_STREAMING is set. The
+        finished plan is stored in the LLM cache just like
+        ``break_script_into_scenes`` would.
+        """
+        request = self.scene_plan_request(script_text, bypass_cache)
+        cache = get_llm_cache()
+        models = [request["model"]] + request["fallback_models"]
+        # Pick the routed endpoint up front, so the stream goes to a healthy
+        # provider and its plan is cached under the provider that wrote it.
+        provider = request["provider"]
+        if provider == "auto":
+            provider, _ = get_router().choose()
+
+        def cache_keys(key_provider):
+            return [
+                make_cache_key(
+                    key_provider,
+                    model,
+                    None,
+                    request["prompt"],
+                    request["temperature"],
+                    request["max_tokens"],
+                )
+                for model in models
             ]
-            subprocess.run(cmd, check=True)
-            return out_path
-        except RuntimeError as e:
-            print(f"❌ {e}")
-            raise
+
+        keys = cache_keys(provider)
+        cached_plan = None
+        if not bypass_cache:
+            # Plans from break_script_into_scenes are keyed by "auto".
+            lookups = keys
+            if request["provider"] == "auto":
+                lookups = keys + cache_keys("auto")
+            cached_plan = next(
+                (p for p in (cache.get(k, "scene_plan") for k in lookups) if p), None
+            )
+
+        started = time.time()
+        parser = SceneStreamParser()
+
+        # A cached plan arrives whole, so batching it delays nothing.
+        batch = TTS_BATCH_STREAMING or (TTS_BATCH and cached_plan is not None)
+        batch_voice = batch and self.elevenlabs_client is not None
+        with SceneAssetStage(self, batch_voice=batch_voice) as stage:
+
+            def dispatch(scenes):
+                for scene in scenes:
+                    stage.submit(scene)
+
+            plan_text = cached_plan
+            if cached_plan is not None:
+                dispatch(parser.feed(cached_plan) + parser.close())
+            else:
+                # A plan that yields no shots has dispatched nothing, so it is
+                # safe to escalate to the next model in the policy's chain.
+                for model, key in zip(models, keys):
+                    chunks = []
+                    for delta in get_gateway().stream(
+                        "scene_plan",
+                        request["prompt"],
+                        provider=provider,
+                        model=model,
+                        temperature=request["temperature"],
+                        max_tokens=request["max_tokens"],
+                    ):
+                        chunks.append(delta)
+                        dispatch(parser.feed(delta))
+                    dispatch(parser.close())
+                    if len(stage):
+                        plan_text = "".join(chunks)
+                        cache.put(
+                            key,
+                            plan_text,
+                            get_call_site_ttl("scene_plan"),
+                            call_site="scene_plan",
+                            provider=provider,
+                            model=model,
+                            latency=time.time() - started,
+                        )
+                        break
+                    print(f"🔁 Scene plan from {model} had no shots, escalating")
+                    parser = SceneStreamParser()
+
+            if len(stage):
+                self._record_scene_plan(script_text, plan_text)
+            inputs = stage.results()
+            self.scenes, self.assets = stage.rendered_scenes, inputs
+
+        if not inputs:
+            return None
+        return self.render_video(inputs)
 
     def create_video(self, scenes):
-        """Create final video from scenes"""
-        inputs = []
-        for i, scene in enumerate(scenes):
-            print(f"🎬 Scene {i+1}: {scene['narration']}")
+        """Create final video from scenes, generating their assets concurrently"""
+        with SceneAssetStage(self) as stage:
+            for scene in scenes:
+                stage.submit(scene)
+            inputs = stage.results()
+            self.scenes, self.assets = stage.rendered_scenes, inputs
 
-            image_path = self.generate_image(scene["image_prompt"], i)
-            audio_path = self.generate_voiceover(
-                scene["narration"], f"audio_{i:02d}.mp3"
-            )
-            inputs.append((image_path, audio_path))
+        if not inputs:
+            return None
+        return self.render_video(inputs)
+
+    def render_video(self, inputs, renderer=None):
+        """Render (image, audio) pairs with the configured renderer"""
+        renderer = renderer or VIDEO_RENDERER
+        if renderer == "memory":
+            return self.render_video_in_memory(inputs)
+        if renderer == "filtergraph":
+            return self.render_video_single_pass(inputs)
+        return self.render_video_segments(inputs)
+
+    def _frame_filter(self):
+        """Scale and pad a still to the profile's frame size"""
+        width, height = self.profile["width"], self.profile["height"]
+        return (
+            f"scale={width}:{height}:force_original_aspect_ratio=decrease,"
+            f"pad={width}:{height}:(ow-iw)/2:(oh-ih)/2,setsar=1,format=yuv420p"
+        )
+
+    def _encode_args(self):
+        """libx264/AAC (44.1 kHz stereo) output settings for the render profile"""
+        return [
+            "-c:v",
+            "libx264",
+            "-preset",
+            self.profile["preset"],
+            "-crf",
+            str(self.profile["crf"]),
+            "-tune",
+            "stillimage",
+            "-pix_fmt",
+            "yuv420p",
+            "-c:a",
+            "aac",
+            "-b:a",
+            self.profile["audio_bitrate"],
+            # One audio format for every segment: concat_segments stream-copies.
+            "-ar",
+            "44100",
+            "-ac",
+            "2",
+        ]
+
+    def _scene_filters(self, i, video, audio):
+        """Normalise one scene's video and audio streams to [v{i}] and [a{i}]"""
+        return [
+            f"{video}{self._frame_filter()}[v{i}]",
+            f"{audio}aresample=44100,"
+            f"aformat=sample_fmts=fltp:channel_layouts=stereo[a{i}]",
+        ]
 
-        segment_paths = []
+    def _concat_output_args(self, filters, count):
+        """Concat every normalised scene and encode the result"""
+        streams = "".join(f"[v{i}][a{i}]" for i in range(count))
+        filters = filters + [f"{streams}concat=n={count}:v=1:a=1[v][a]"]
+        return [
+            "-filter_complex",
+            ";".join(filters),
+            "-map",
+            "[v]",
+            "-map",
+            "[a]",
+        ] + self._encode_args()
+
+    def render_video_single_pass(self, inputs):
+        """Render every scene in one ffmpeg run through a concat filtergraph
+
+        Each still image is looped for exactly its narration's duration, all
+        scenes are normalised to one size and audio format, and the concat
+        filter joins them, so no per-scene segment files are written.
+        """
+        final_video = normalize_path(os.path.join(self.output_dir, "final_video.mp4"))
+        args = []
+        filters = []
+        for i, (img, audio) in enumerate(inputs):
+            duration = audio_duration(normalize_path(audio))
+            args += [
+                "-loop",
+                "1",
+                "-framerate",
+                str(self.profile["fps"]),
+                "-t",
+                f"{duration:.3f}",
+                "-i",
+                normalize_path(img),
+                "-i",
+                normalize_path(audio),
+            ]
+            filters += self._scene_filters(i, f"[{2 * i}:v]", f"[{2 * i + 1}:a]")
+        args += self._concat_output_args(filters, len(inputs))
         try:
-            ffmpeg_cmd = get_ffmpeg_command()
-        except RuntimeError as e:
-            print(f"❌ {e}")
+            return SegmentEncoder(workers=1).encode_all([(args, final_video)])[0]
+        except (subprocess.CalledProcessError, OSError) as e:
+            _print_encode_error(e)
             raise
 
+    def render_video_in_memory(self, inputs):
+        """Render (image bytes, audio bytes) pairs without intermediate files
+
+        Every asset is written into its own named pipe by a feeder thread and
+        read by a single ffmpeg run using the same filtergraph as
+        ``render_video_single_pass``; the image is decoded once and its frame
+        looped for the narration's duration. Only the final MP4 is written.
+        Platforms without ``os.mkfifo`` spill the assets to the workspace and
+        use the single-pass renderer instead.
+        """
+        if not hasattr(os, "mkfifo"):
+            return self.render_video_single_pass(self._spill_assets(inputs))
+
+        final_video = normalize_path(os.path.join(self.output_dir, "final_video.mp4"))
+        fifo_dir = tempfile.mkdtemp(prefix="render-fifo-")
+        feeders = []
+        try:
+            args = []
+            filters = []
+            for i, (image, audio) in enumerate(inputs):
+                duration = audio_duration(audio)
+                image_fifo = os.path.join(fifo_dir, f"image_{i:02d}")
+                audio_fifo = os.path.join(fifo_dir, f"audio_{i:02d}")
+                for fifo, data in ((image_fifo, image), (audio_fifo, audio)):
+                    os.mkfifo(fifo)
+                    feeder = threading.Thread(
+                        target=_feed_fifo, args=(fifo, data), daemon=True
+                    )
+                    feeders.append((feeder, fifo))
+                args += [
+                    "-f",
+                    "image2pipe",
+                    "-framerate",
+                    str(self.profile["fps"]),
+                    "-i",
+                    image_fifo,
+                    "-i",
+                    audio_fifo,
+                ]
+                filters += self._scene_filters(
+                    i,
+                    f"[{2 * i}:v]loop=loop=-1:size=1:start=0,"
+                    f"trim=duration={duration:.3f},setpts=N/{self.profile['fps']}/TB,",
+                    f"[{2 * i + 1}:a]",
+                )
+            args += self._concat_output_args(filters, len(inputs))
+            for feeder, _ in feeders:
+                feeder.start()
+            try:
+                return SegmentEncoder(workers=1).encode_all([(args, final_video)])[0]
+            except (subprocess.CalledProcessError, OSError) as e:
+                _print_encode_error(e)
+                raise
+        finally:
+            for feeder, fifo in feeders:
+                if feeder.ident is None:
+                    continue
+                if feeder.is_alive():
+                    _release_fifo(fifo)
+                feeder.join(timeout=5)
+            shutil.rmtree(fifo_dir, ignore_errors=True)
+
+    def _spill_assets(self, inputs):
+        """Write in-memory assets to the workspace as (image, audio) paths"""
+        paths = []
+        for i, (image, audio) in enumerate(inputs):
+            img_path = os.path.join(self.output_dir, f"scene_{i:02d}.png")
+            audio_path = os.path.join(self.output_dir, f"audio_{i:02d}.audio")
+            for path, data in ((img_path, image), (audio_path, audio)):
+                with open(path, "wb") as f:
+                    f.write(data)
+            paths.append((img_path, audio_path))
+        return paths
+
+    def render_video_segments(self, inputs):
+        """Encode (image, audio) pairs into segments and concatenate them
+
+        Segments are encoded concurrently; the concat pass starts as soon as
+        the last one finishes. Each segment is cut to its narration's exact
+        duration rather than relying on ``-shortest``. With job checkpoints,
+        every segment is recorded as it finishes, so a retry after a failed
+        encode or concat only encodes what is missing.
+        """
+        jobs = []
+        pending = []
+        segment_paths = [None] * len(inputs)
         for i, (img, audio) in enumerate(inputs):
             output_path = normalize_path(
                 os.path.join(self.output_dir, f"segment_{i:02d}.mp4")
             )
-            cmd = [
-                ffmpeg_cmd,
-                "-y",
+            duration = audio_duration(normalize_path(audio))
+            args = [
                 "-loop",
                 "1",
+                "-framerate",
+                str(self.profile["fps"]),
                 "-i",
                 normalize_path(img),
                 "-i",
                 normalize_path(audio),
-                "-c:v",
-                "libx264",
-                "-tune",
-                "stillimage",
-                "-c:a",
-                "aac",
-                "-b:a",
-                "192k",
-                "-shortest",
-                "-pix_fmt",
-                "yuv420p",
-                output_path,
-            ]
-            subprocess.run(cmd, check=True)
-            segment_paths.append(output_path)
+                "-vf",
+                self._frame_filter(),
+            ] + self._encode_args() + ["-t", f"{duration:.3f}"]
+            # Sources are identified by size and mtime: a regenerated image or
+            # narration invalidates its segment without re-hashing it here.
+            stage_inputs = {
+                "args": args,
+                "sources": [
+                    [os.path.getsize(p), os.stat(p).st_mtime_ns] for p in (img, audio)
+                ],
+            }
+            if self.checkpoints is not None:
+                done = self.checkpoints.get(f"segment_{i:02d}", stage_inputs)
+                if done is not None:
+                    segment_paths[i] = done["path"]
+                    continue
+            jobs.append((args, output_path))
+            pending.append((i, stage_inputs))
+        if len(jobs) < len(inputs):
+            print(f"⏭️ {len(inputs) - len(jobs)} segments already encoded, skipping")
 
-        segments_file = normalize_path(os.path.join(self.output_dir, "segments.txt"))
-        with open(segments_file, "w") as f:
-            for seg in segment_paths:
-                abs_path = os.path.abspath(seg).replace("\\", "/")
-                f.write(f"file '{abs_path}'\n")
+        def on_progress(event):
+            if FFMPEG_PROGRESS:
+                print_progress(event)
+            if event["done"] and self.checkpoints is not None:
+                i, stage_inputs = pending[event["index"]]
+                self.checkpoints.record(
+                    f"segment_{i:02d}", path=event["output"], inputs=stage_inputs
+                )
 
-        final_video = normalize_path(os.path.join(self.output_dir, "final_video.mp4"))
         try:
-            ffmpeg_cmd = get_ffmpeg_command()
-        except RuntimeError as e:
-            print(f"❌ {e}")
+            encoded = SegmentEncoder(progress=on_progress).encode_all(jobs)
+        except (subprocess.CalledProcessError, OSError) as e:
+            _print_encode_error(e)
             raise
+        for (i, _), path in zip(pending, encoded):
+            segment_paths[i] = path
 
-        cmd = [
-            ffmpeg_cmd,
-            "-y",
-            "-f",
-            "concat",
-            "-safe",
-            "0",
-            "-i",
-            segments_file,
-            "-c",
-            "copy",
-            final_video,
-        ]
-        subprocess.run(cmd, check=True)
+        segments_file = normalize_path(os.path.join(self.output_dir, "segments.txt"))
+        final_video = normalize_path(os.path.join(self.output_dir, "final_video.mp4"))
+        return concat_segments(segment_paths, segments_file, final_video)
+
+
+def _print_encode_error(error):
+    """Print why an ffmpeg run failed, with the tail of its stderr"""
+    print(f"❌ ffmpeg failed: {error}")
+    tail = getattr(error, "stderr", None)
+    if tail:
+        print(tail)
+
+
+def _feed_fifo(path, data):
+    """Write ``data`` into a named pipe; blocks until ffmpeg opens it"""
+    try:
+        with open(path, "wb") as f:
+            f.write(data)
+    except OSError:
+        # ffmpeg exited (or skipped the input) before reading everything.
+        pass
+
+
+def _release_fifo(path):
+    """Unblock a feeder still waiting for ffmpeg to open its pipe"""
+    try:
+        fd = os.open(path, os.O_RDONLY | os.O_NONBLOCK)
+        os.close(fd)
+    except OSError:
+        pass
+
+
+def draft_manifest_path(job_id):
+    """Where the scene list of a draft render is kept"""
+    return normalize_path(os.path.join(VIDEO_OUTPUT_DIR, f"{job_id}-draft.json"))
+
+
+def draft_assets_dir(job_id):
+    """Where the images and narration of a draft render are kept"""
+    return normalize_path(os.path.join(VIDEO_OUTPUT_DIR, f"{job_id}-draft-assets"))
 
-        return final_video
 
+def _keep_draft_assets(job_id, scenes, assets):
+    """Store a draft's assets for its promotion; returns the manifest's scenes
+
+    Promotion must render exactly the images and narration that were
+    approved, so they are kept next to the manifest rather than left to the
+    asset cache, which may evict them (or never see them in memory mode).
+    Files are hard-linked where possible.
+    """
+    directory = ensure_directory(draft_assets_dir(job_id))
+    kept = []
+    for i, (scene, (image, audio)) in enumerate(zip(scenes, assets)):
+        files = {}
+        for field, name, asset in (
+            ("image_file", f"scene_{i:02d}", image),
+            ("audio_file", f"audio_{i:02d}", audio),
+        ):
+            if isinstance(asset, bytes):
+                ext = ".png" if field == "image_file" else ".mp3"
+                if asset[:4] == b"RIFF":
+                    ext = ".wav"
+                with open(os.path.join(directory, name + ext), "wb") as f:
+                    f.write(asset)
+            else:
+                ext = os.path.splitext(asset)[1]
+                link_or_copy(asset, os.path.join(directory, name + ext))
+            files[field] = name + ext
+        kept.append({**scene, **files})
+    return kept
+
+
+def _draft_inputs(job_id, scenes):
+    """(image, audio) paths of a draft's kept assets, or None if any is gone"""
+    directory = draft_assets_dir(job_id)
+    inputs = []
+    for scene in scenes:
+        names = [scene.get("image_file"), scene.get("audio_file")]
+        paths = [os.path.join(directory, name) for name in names if name]
+        if len(paths) < 2 or not all(os.path.isfile(path) for path in paths):
+            return None
+        inputs.append(tuple(paths))
+    return inputs
+
+
+def execute_video_creation(
+    script_text, production_plan=None, job_id=None, profile=None
+):
+    """Render a video in its own job workspace and return the promoted path
+
+    Returns an "Error ..." string instead when the video could not be made.
+    The intermediate files are removed per WORKSPACE_CLEANUP; a failed job's
+    workspace is kept by default, and calling again with the same ``job_id``
+    resumes from its checkpointed scene plan, assets and segments. Draft
+    renders are promoted as ``<job_id>-draft.mp4`` next to a manifest of their
+    scenes and a copy of their assets, which ``promote_draft`` uses to produce
+    the final video. The render waits for the storage governor when the disk
+    is low on space.
+    """
+    try:
+        log_action("video_creator", "Starting video creation process")
+        get_storage_governor().admit()
+        with job_workspace(job_id) as workspace:
+            agent = VideoCreatorAgent(
+                output_dir=workspace.path, profile=profile, job_id=workspace.job_id
+            )
+            video_path = agent.produce(script_text, production_plan)
+            if not video_path:
+                log_action("video_creator", "No scenes parsed from script", -1)
+                return "Error: Could not parse scenes from script"
+            if agent.profile["name"] != "draft":
+                final_path = workspace.promote(video_path)
+            else:
+                manifest = workspace.path_for("draft.json")
+                scenes = _keep_draft_assets(
+                    workspace.job_id, agent.scenes, agent.assets
+                )
+                with open(manifest, "w") as f:
+                    json.dump(
+                        {
+                            "job_id": workspace.job_id,
+                            "script": script_text,
+                            "scenes": scenes,
+                            "created_at": time.time(),
+                        },
+                        f,
+                        indent=2,
+                    )
+                final_path = workspace.promote(
+                    video_path, f"{workspace.job_id}-draft.mp4"
+                )
+                workspace.promote(manifest, f"{workspace.job_id}-draft.json")
+    except Exception as e:
+        log_action("video_creator", f"Video creation failed: {str(e)}", -1)
+        return f"Error creating video: {str(e)}"
+
+    log_action("video_creator", f"Video created successfully: {final_path}", 1)
+    return final_path
+
+
+def prepare_video_assets(script_text, production_plan=None, job_id=None):
+    """Produce a job's scene assets ahead of its render
+
+    The assets go into the job's workspace without taking a render slot, so
+    the next job's images and narration can be fetched while another job is
+    encoding. ``execute_video_creation`` with the same ``job_id`` then finds
+    them checkpointed and only encodes. Returns the number of scenes ready.
+    """
+    get_storage_governor().admit()
+    workspace = JobWorkspace(job_id)
+    agent = VideoCreatorAgent(output_dir=workspace.path, job_id=workspace.job_id)
+    return agent.prepare_assets(script_text, production_plan)
+
+
+def promote_draft(job_id, profile="final"):
+    """Re-render an approved draft with a higher-quality profile
+
+    Only the encode is repeated, from the images and narration kept with the
+    draft. If they are gone the promotion fails rather than generating new
+    ones that would differ from what was approved. Returns the promoted video
+    path or an "Error ..." string.
+    """
+    if not is_job_id(job_id):
+        return f"Error: Invalid job id {job_id!r}"
+    try:
+        with open(draft_manifest_path(job_id)) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError) as e:
+        return f"Error: No draft found for job {job_id}: {e}"
+    inputs = _draft_inputs(job_id, manifest["scenes"])
+    if not inputs:
+        return f"Error: Assets of draft {job_id} are missing, render a new draft"
+
+    try:
+        log_action("video_creator", f"Promoting draft {job_id} to {profile}")
+        get_storage_governor().admit()
+        with job_workspace(f"{job_id}-{profile}") as workspace:
+            agent = VideoCreatorAgent(output_dir=workspace.path, profile=profile)
+            # The kept assets are files, which the memory renderer can't take.
+            renderer = "filtergraph" if VIDEO_RENDERER == "memory" else None
+            video_path = agent.render_video(inputs, renderer)
+            final_path = workspace.promote(video_path, f"{job_id}.mp4")
+    except Exception as e:
+        log_action("video_creator", f"Draft promotion failed: {str(e)}", -1)
+        return f"Error promoting draft: {str(e)}"
 
-def execute_video_creation(script_text):
-    """Entry point for CrewAI Agent"""
-    video_creator_agent = VideoCreatorAgent()
-    return video_creator_agent.execute_task(script_text)
+    log_action("video_creator", f"Draft {job_id} promoted: {final_path}", 1)
+    return final_path
 
 
 def generate_voiceover(text, output_file):
@@ -1,9 +1,7 @@
 import os
 import sys
-import openai
-import requests
 import time
-import subprocess
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 import elevenlabs
 from apscheduler.schedulers.background import BackgroundScheduler
@@ -14,11 +12,21 @@ import sqlite3
 from pathlib import Path
 
 sys.path.append(str(Path(__file__).parent))
-from utils.platform_utils import get_ffmpeg_command, normalize_path, ensure_directory
+from utils.platform_utils import normalize_path, ensure_directory
+from utils.ffmpeg_pool import SegmentEncoder, concat_segments
+from utils.workspace import job_workspace
+from utils.llm_gateway import get_gateway
+from utils.modelslab_jobs import (
+    ModelsLabJobClient,
+    VideoJob,
+    generate_clips,
+    handle_webhook,
+)
+from utils.model_policy import policy_request
+from utils.rate_limiter import rate_limited_call
 
 load_dotenv()
 
-client = openai.OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
 eleven_key = os.getenv("ELEVENLABS_API_KEY")
 MODELSLAB_KEY = os.getenv("MODELSLAB_API_KEY")
 YOUTUBE_API_KEY = os.getenv("YOUTUBE_API_KEY")
@@ -60,7 +68,7 @@ def notify_user(video_title):
     print(f"📧 Notification: Video '{video_title}' has been created and uploaded!")
 
 
-def break_script_into_scenes(script_text):
+def break_script_into_scenes(script_text, bypass_cache=False):
     prompt = f"""Break this YouTube Shorts script into a shot-by-shot production plan.
 For each shot, include:
 - Narration: (1 sentence max)
@@ -76,106 +84,67 @@ Prompt: [image prompt here]
 SCRIPT:
 {script_text}"""
 
-    response = client.chat.completions.create(
-        model="gpt-4",
-        messages=[{"role": "user", "content": prompt}],
-        max_tokens=700
+    return get_gateway().complete(
+        **policy_request("scene_plan", prompt, bypass_cache=bypass_cache)
     )
-    return response.choices[0].message.content
 
 
-def generate_video(prompt_text, idx):
-    url = "https://modelslab.com/api/v6/video/text2video_ultra"
-    headers = {
-        "Authorization": f"Bearer {MODELSLAB_KEY}",
-        "Content-Type": "application/json"
-    }
-    payload = {
-        "key": MODELSLAB_KEY,
-        "prompt": prompt_text,
-        "aspect_ratio": "16:9",
-        "duration": 4,
-        "motion": "medium",
-        "quality": "medium",
-        "webhook": None,
-        "seed": None
-    }
-
-    response = requests.post(url, headers=headers, json=payload)
-    response.raise_for_status()
-    data = response.json()
-
-    video_url = data.get("video") or (data.get("output") and data["output"][0])
-    if not video_url:
-        raise ValueError("❌ No video URL found in ModelsLab response.")
-
-    try:
-        vid_data = requests.get(video_url).content
-    except Exception as e:
-        raise RuntimeError(f"❌ Failed to download generated video: {e}")
-
-    vid_path = normalize_path(os.path.join(output_dir, f"scene_{idx:02d}.mp4"))
-    with open(vid_path, "wb") as f:
-        f.write(vid_data)
-    return vid_path
+def generate_video(prompt_text, idx, workdir=output_dir):
+    """Generate one scene clip (waits for the ModelsLab job to finish)"""
+    job = ModelsLabJobClient().run_jobs([VideoJob(idx, prompt_text)], workdir)[0]
+    if not job.path:
+        raise RuntimeError(f"❌ Scene {idx + 1} video failed: {job.error}")
+    return job.path
 
 
-def generate_voiceover(text, filename):
-    audio = elevenlabs.generate(
+def generate_voiceover(text, filename, workdir=output_dir):
+    audio = rate_limited_call("elevenlabs", lambda: elevenlabs.generate(
         text=text,
         voice="Rachel",
         model="eleven_monolingual_v1",
         api_key=eleven_key
-    )
-    out_path = normalize_path(os.path.join(output_dir, filename))
+    ))
+    out_path = normalize_path(os.path.join(workdir, filename))
     with open(out_path, "wb") as f:
         f.write(audio)
     return out_path
 
 
-def create_video(scenes):
-    inputs = []
-    for i, scene in enumerate(scenes):
-        prompt = scene['image_prompt']
-        narration = scene['narration']
-        print(f"🎬 Scene {i+1}: {narration}")
-
-        video_path = generate_video(prompt, i)
-        audio_path = generate_voiceover(narration, f"audio_{i:02d}.mp3")
-
-        output_path = normalize_path(os.path.join(output_dir, f"clip_{i:02d}.mp4"))
-        try:
-            ffmpeg_cmd = get_ffmpeg_command()
-        except RuntimeError as e:
-            print(f"❌ {e}")
-            raise
-            
-        cmd = [
-            ffmpeg_cmd, "-y",
+def create_video(scenes, workdir=output_dir):
+    # Every scene's video job is submitted up front and rendered by ModelsLab
+    # in parallel, while the voiceovers are generated here.
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        clips = pool.submit(
+            generate_clips, [scene['image_prompt'] for scene in scenes], workdir
+        )
+        audio_paths = []
+        for i, scene in enumerate(scenes):
+            print(f"🎬 Scene {i+1}: {scene['narration']}")
+            audio_paths.append(
+                generate_voiceover(scene['narration'], f"audio_{i:02d}.mp3", workdir)
+            )
+        video_paths = clips.result()
+
+    jobs = []
+    for i, (video_path, audio_path) in enumerate(zip(video_paths, audio_paths)):
+        output_path = normalize_path(os.path.join(workdir, f"clip_{i:02d}.mp4"))
+        args = [
             "-i", normalize_path(video_path),
             "-i", normalize_path(audio_path),
             "-c:v", "libx264", "-c:a", "aac",
             "-shortest", "-pix_fmt", "yuv420p",
-            output_path
         ]
-        subprocess.run(cmd, check=True)
-        inputs.append(output_path)
-
-    concat_file = normalize_path(os.path.join(output_dir, "segments.txt"))
-    with open(concat_file, "w") as f:
-        for clip in inputs:
-            abs_path = os.path.abspath(clip).replace('\\', '/')
-            f.write(f"file '{abs_path}'\n")
+        jobs.append((args, output_path))
 
-    final_video = normalize_path(os.path.join(output_dir, "final_video.mp4"))
     try:
-        ffmpeg_cmd = get_ffmpeg_command()
+        inputs = SegmentEncoder().encode_all(jobs)
     except RuntimeError as e:
         print(f"❌ {e}")
         raise
-        
-    cmd = [ffmpeg_cmd, "-y", "-f", "concat", "-safe", "0", "-i", concat_file, "-c", "copy", final_video]
-    subprocess.run(cmd, check=True)
+
+    concat_file = normalize_path(os.path.join(workdir, "segments.txt"))
+    final_video = normalize_path(os.path.join(workdir, "final_video.mp4"))
+    concat_segments(inputs, concat_file, final_video)
     print(f"🎉 Final video created: {final_video}")
     return final_video
 
@@ -192,11 +161,11 @@ def upload_to_youtube(video_path, title="Motivational Shorts", description="Crea
         "status": {"privacyStatus": "public"}
     }
     media_file = MediaFileUpload(video_path)
-    response = youtube.videos().insert(
+    response = rate_limited_call("youtube", youtube.videos().insert(
         part="snippet,status",
         body=request_body,
         media_body=media_file
-    ).execute()
+    ).execute)
 
     print("✅ Uploaded to YouTube:", response["id"])
     log_upload(video_path)
@@ -227,7 +196,8 @@ VO: This day is YOURS. What's your ritual?"""
                 scenes.append(current_scene.copy())
                 current_scene = {}
 
-    final_path = create_video(scenes)
+    with job_workspace() as workspace:
+        final_path = workspace.promote(create_video(scenes, workspace.path))
     upload_to_youtube(final_path)
 
 
@@ -242,6 +212,12 @@ def trigger_video():
     return "Video triggered manually."
 
 
+@app.route("/modelslab/webhook", methods=["POST"])
+def modelslab_webhook():
+    matched = handle_webhook(request.get_json(silent=True) or {})
+    return {"received": matched}
+
+
 if __name__ == "__main__":
     print("🚀 Animated video agent running with scheduler and API endpoint...")
     app.run(host="0.0.0.0", port=8001)
@@ -0,0 +1,152 @@
+"""
+Measure memory and resume behaviour of the streaming media fetcher.
+
+Serves generated files of several sizes from a local HTTP server (with Range
+support and an optional connection drop partway through), downloads each one
+with ``utils.media_fetch.fetch_media`` and with the old
+``requests.get(url).content`` pattern, and reports wall time and peak Python
+allocations (tracemalloc) for both:
+
+    python -m benchmarks.bench_fetch --sizes 1,16,64 --drop-at 0.5
+
+The fetcher's peak should stay flat as size grows; the buffered pattern's
+peak grows with the file.
+"""
+
+import argparse
+import json
+import os
+import re
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+
+def start_file_server(root: str, drop_at: float) -> Tuple[ThreadingHTTPServer, str]:
+    """Serve ``root`` with Range support; the first full GET of each file is
+    cut off after ``drop_at`` of its bytes (0 disables)"""
+    dropped = set()
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            path = os.path.join(root, self.path.lstrip("/"))
+            if not os.path.isfile(path):
+                self.send_error(404)
+                return
+            size = os.path.getsize(path)
+            start = 0
+            match = re.match(r"bytes=(\d+)-", self.headers.get("Range", ""))
+            if match:
+                start = int(match.group(1))
+                if start >= size:
+                    self.send_response(416)
+                    self.send_header("Content-Range", f"bytes */{size}")
+                    self.end_headers()
+                    return
+                self.send_response(206)
+                self.send_header("Content-Range", f"bytes {start}-{size - 1}/{size}")
+            else:
+                self.send_response(200)
+            self.send_header("Content-Length", str(size - start))
+            self.end_headers()
+
+            stop = size
+            if drop_at and not match and self.path not in dropped:
+                dropped.add(self.path)
+                stop = int(size * drop_at)
+            with open(path, "rb") as f:
+                f.seek(start)
+                remaining = stop - start
+                while remaining > 0:
+                    block = f.read(min(1 << 16, remaining))
+                    self.wfile.write(block)
+                    remaining -= len(block)
+            if stop < size:
+                self.close_connection = True
+                self.connection.shutdown(2)
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def _measure(fn) -> Dict[str, float]:
+    tracemalloc.start()
+    started = time.perf_counter()
+    fn()
+    wall = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"wall_seconds": round(wall, 3), "peak_kib": round(peak / 1024, 1)}
+
+
+def main(argv: List[str] = None) -> Dict[str, Any]:
+    parser = argparse.ArgumentParser(description="Benchmark media downloads")
+    parser.add_argument("--sizes", default="1,16,64", help="file sizes in MiB")
+    parser.add_argument("--drop-at", type=float, default=0.5)
+    parser.add_argument("--json", help="write the full report to this file")
+    args = parser.parse_args(argv)
+
+    import requests
+
+    from utils.media_fetch import fetch_media, get_media_fetch_stats
+
+    workdir = tempfile.mkdtemp(prefix="fetch-bench-")
+    served = os.path.join(workdir, "served")
+    os.makedirs(served)
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    for mib in sizes:
+        with open(os.path.join(served, f"{mib}.bin"), "wb") as f:
+            for _ in range(mib):
+                f.write(os.urandom(1 << 20))
+    server, base_url = start_file_server(served, args.drop_at)
+
+    results = []
+    try:
+        for mib in sizes:
+            url = f"{base_url}/{mib}.bin"
+            dest = os.path.join(workdir, f"{mib}.out")
+            streamed = _measure(lambda: fetch_media(url, dest))
+            assert os.path.getsize(dest) == mib << 20
+
+            def buffered():
+                with open(dest, "wb") as f:
+                    f.write(requests.get(url).content)
+
+            results.append(
+                {"mib": mib, "fetch_media": streamed, "buffered": _measure(buffered)}
+            )
+    finally:
+        server.shutdown()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print(f"\n📊 Downloads (first transfer dropped at {args.drop_at:.0%})")
+    for row in results:
+        print(
+            f"   {row['mib']:>4} MiB  fetch_media peak={row['fetch_media']['peak_kib']}KiB "
+            f"wall={row['fetch_media']['wall_seconds']}s | buffered "
+            f"peak={row['buffered']['peak_kib']}KiB "
+            f"wall={row['buffered']['wall_seconds']}s"
+        )
+    report = {"config": vars(args), "results": results, "stats": get_media_fetch_stats()}
+    print(f"   fetcher stats: {report['stats']}")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"💾 Report written to {args.json}")
+    return report
+
+
+if __name__ == "__main__":
+    main()
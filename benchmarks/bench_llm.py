@@ -0,0 +1,295 @@
+"""
+Offline benchmark of the LLM layer against the local mock server.
+
+Starts ``benchmarks.mock_openai`` in-process, points the pooled OpenAI client
+at it, then drives one or more scenarios and reports throughput, latency
+percentiles and allocations (via tracemalloc):
+
+    python -m benchmarks.bench_llm --scenarios agents,video_agent \
+        --iterations 20 --concurrency 4 --latency lognormal:0.3,0.5
+
+Scenarios:
+    agents         trend_scanner, script_writer, thumbnail_designer and
+                   seo_optimizer, one call each per iteration
+    video_agent    VideoCreatorAgent.execute_task (scene plan only)
+    video_creator  main.run_video_creator end to end (LLM stages only)
+    pipeline       main.run_pipeline (CrewAI)
+
+Image, voiceover, render and upload stages are replaced with no-ops so the
+numbers reflect the LLM path alone. The LLM cache is off unless --cache is
+given, and provider rate limits are lifted unless --respect-limits is given.
+Scenarios whose dependencies are not installed are reported as skipped.
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+from unittest import mock
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+SCENARIOS = ("agents", "video_agent", "video_creator", "pipeline")
+
+
+def configure_environment(base_url: str, args: argparse.Namespace) -> str:
+    """Point every module at the mock and at throwaway state files
+
+    Must run before the pipeline modules are imported, since they read their
+    settings at import time.
+    """
+    workdir = tempfile.mkdtemp(prefix="llm-bench-")
+    os.environ.update(
+        {
+            "OPENAI_BASE_URL": base_url,
+            "OPENAI_API_BASE": base_url,
+            "OPENAI_API_KEY": "mock",
+            "LLM_CACHE_ENABLED": "true" if args.cache else "false",
+            "LLM_CACHE_DB": os.path.join(workdir, "llm_cache.db"),
+            "RATE_LIMIT_DB": os.path.join(workdir, "rate_limits.db"),
+            "TOPIC_INDEX_DB": os.path.join(workdir, "video_logs.db"),
+            "TOPIC_INDEX_DIR": os.path.join(workdir, "topic_index"),
+        }
+    )
+    os.environ.pop("GITHUB_TOKEN", None)
+    if not args.respect_limits:
+        os.environ["RATE_LIMIT_OPENAI_RPM"] = "1000000"
+        os.environ["RATE_LIMIT_OPENAI_TPM"] = "0"
+    return workdir
+
+
+def _stub_media() -> None:
+    """Patch out image, voiceover and render work in the video agent"""
+    from agents.video_creator import VideoCreatorAgent
+
+    patches = [
+        mock.patch.object(
+            VideoCreatorAgent,
+            "generate_image",
+            lambda self, prompt, idx: f"scene_{idx:02d}.png",
+        ),
+        mock.patch.object(
+            VideoCreatorAgent,
+            "generate_voiceover",
+            lambda self, text, filename, fallback=True: filename,
+        ),
+        mock.patch.object(
+            VideoCreatorAgent, "render_video", lambda self, inputs: "bench_video.mp4"
+        ),
+    ]
+    for patch in patches:
+        patch.start()
+
+
+def build_agents_ops() -> Dict[str, Callable[[], Any]]:
+    from agents.script_writer import write_script
+    from agents.seo_optimizer import generate_seo_metadata
+    from agents.thumbnail_designer import generate_thumbnail_idea
+    from agents.trend_scanner import generate_viral_idea
+
+    return {
+        "trend_scanner": generate_viral_idea,
+        "script_writer": lambda: write_script("Morning habits", "Small wins daily"),
+        "thumbnail_designer": lambda: generate_thumbnail_idea(
+            "Morning habits", "Small wins daily"
+        ),
+        "seo_optimizer": lambda: generate_seo_metadata(
+            "Morning habits", "Wake up. Drink water. Move."
+        ),
+    }
+
+
+def build_video_agent_ops() -> Dict[str, Callable[[], Any]]:
+    from agents.video_creator import VideoCreatorAgent
+
+    _stub_media()
+    agent = VideoCreatorAgent()
+    script = "Hook. Three habits that make mornings easy. Call to action."
+
+    def execute():
+        result = agent.execute_task(script)
+        if str(result).startswith("Error"):
+            raise RuntimeError(result)
+        return result
+
+    return {"video_agent": execute}
+
+
+def build_video_creator_ops() -> Dict[str, Callable[[], Any]]:
+    import main
+
+    _stub_media()
+    mock.patch.object(main, "upload_to_youtube", return_value="mock-video-id").start()
+    return {"run_video_creator": main.run_video_creator}
+
+
+def build_pipeline_ops() -> Dict[str, Callable[[], Any]]:
+    import main
+
+    return {"run_pipeline": main.run_pipeline}
+
+
+BUILDERS = {
+    "agents": build_agents_ops,
+    "video_agent": build_video_agent_ops,
+    "video_creator": build_video_creator_ops,
+    "pipeline": build_pipeline_ops,
+}
+
+
+def run_scenario(
+    name: str, iterations: int, concurrency: int, trace: bool
+) -> Dict[str, Any]:
+    """Run every op of a scenario ``iterations`` times and measure it"""
+    from utils.latency import LatencyTracker
+
+    try:
+        ops = BUILDERS[name]()
+    except ImportError as e:
+        return {"scenario": name, "skipped": f"missing dependency: {e}"}
+
+    latencies = LatencyTracker(window=iterations * max(1, len(ops)))
+    failures: Dict[str, int] = {op: 0 for op in ops}
+
+    def timed(op: str) -> None:
+        started = time.perf_counter()
+        try:
+            ops[op]()
+        except Exception as e:
+            failures[op] += 1
+            print(f"⚠️ {op} failed: {e}")
+            return
+        latencies.record(op, time.perf_counter() - started)
+
+    jobs = [op for _ in range(iterations) for op in ops]
+    if trace:
+        tracemalloc.start()
+        before = tracemalloc.take_snapshot()
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(timed, jobs))
+    wall = time.perf_counter() - started
+
+    report: Dict[str, Any] = {
+        "scenario": name,
+        "operations": len(jobs),
+        "failures": dict(failures),
+        "wall_seconds": round(wall, 3),
+        "throughput_per_s": round(len(jobs) / wall, 2) if wall else None,
+        "latency": latencies.summary(),
+    }
+    if trace:
+        after = tracemalloc.take_snapshot()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        diff = after.compare_to(before, "filename")
+        report["allocations"] = {
+            "net_blocks": sum(stat.count_diff for stat in diff),
+            "net_kib": round(sum(stat.size_diff for stat in diff) / 1024, 1),
+            "peak_kib": round(peak / 1024, 1),
+            "top_files": [
+                {
+                    "file": str(stat.traceback),
+                    "blocks": stat.count_diff,
+                    "kib": round(stat.size_diff / 1024, 1),
+                }
+                for stat in diff[:5]
+            ],
+        }
+    return report
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    name = report["scenario"]
+    if "skipped" in report:
+        print(f"\n⏭️  {name}: skipped ({report['skipped']})")
+        return
+    print(
+        f"\n📊 {name}: {report['operations']} ops in {report['wall_seconds']}s "
+        f"({report['throughput_per_s']}/s), failures {report['failures']}"
+    )
+    for op, stats in report["latency"].items():
+        print(
+            f"   {op:<20} n={stats['samples']:<4} p50={stats['p50']}s "
+            f"p95={stats['p95']}s p99={stats['p99']}s"
+        )
+    allocations = report.get("allocations")
+    if allocations:
+        print(
+            f"   allocations: {allocations['net_blocks']} net blocks, "
+            f"{allocations['net_kib']} KiB net, {allocations['peak_kib']} KiB peak"
+        )
+
+
+def main(argv: List[str] = None) -> Dict[str, Any]:
+    parser = argparse.ArgumentParser(description="Benchmark the LLM layer offline")
+    parser.add_argument("--scenarios", default="agents,video_agent")
+    parser.add_argument("--iterations", type=int, default=10)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--latency", default="lognormal:0.3,0.5")
+    parser.add_argument("--token-delay", type=float, default=0.005)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--retry-after", type=float, default=0.5)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--cache", action="store_true", help="keep the LLM cache on")
+    parser.add_argument("--respect-limits", action="store_true")
+    parser.add_argument("--no-tracemalloc", action="store_true")
+    parser.add_argument("--json", help="write the full report to this file")
+    args = parser.parse_args(argv)
+
+    scenarios = [s.strip() for s in args.scenarios.split(",") if s.strip()]
+    unknown = set(scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+
+    from benchmarks.mock_openai import start_mock_server
+
+    server, state, base_url = start_mock_server(
+        latency=args.latency,
+        token_delay=args.token_delay,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        retry_after=args.retry_after,
+        seed=args.seed,
+    )
+    workdir = configure_environment(base_url, args)
+    print(f"🧪 Mock server at {base_url}, state in {workdir}")
+
+    reports = []
+    try:
+        for name in scenarios:
+            print(f"\n▶️  Running {name}...")
+            report = run_scenario(
+                name, args.iterations, args.concurrency, not args.no_tracemalloc
+            )
+            print_report(report)
+            reports.append(report)
+    finally:
+        mock.patch.stopall()
+        server.shutdown()
+
+    from utils.llm_gateway import get_gateway
+
+    summary = {
+        "config": vars(args),
+        "scenarios": reports,
+        "mock_server": dict(state.counters),
+        "gateway": get_gateway().stats(),
+    }
+    print(f"\n🧪 Mock server counters: {summary['mock_server']}")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(summary, f, indent=2, default=str)
+        print(f"💾 Report written to {args.json}")
+    return summary
+
+
+if __name__ == "__main__":
+    main()
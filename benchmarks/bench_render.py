@@ -0,0 +1,149 @@
+"""
+Compare the segment, single-pass filtergraph and in-memory (named pipe)
+renderers.
+
+Generates synthetic scenes (test-pattern stills plus tones of varying length,
+standing in for ModelsLab images and ElevenLabs narration), renders them with
+each VideoCreatorAgent renderer and reports wall time, child CPU time, files
+and bytes written, and block output from the ffmpeg processes. The memory
+renderer gets the assets as bytes, as the asset stage hands them over when
+VIDEO_RENDERER=memory, so its written bytes are the final MP4 alone:
+
+    python -m benchmarks.bench_render --scenes 8 --repeat 3
+
+Needs ffmpeg on PATH. Block I/O counters come from getrusage and are only
+available on Linux/macOS.
+"""
+
+import argparse
+import json
+import os
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+RENDERERS = ("segments", "filtergraph", "memory")
+
+
+def make_scenes(workdir: str, count: int, seed: int) -> List[Tuple[str, str]]:
+    """Write ``count`` (png, mp3) pairs with 2-6s narration-length audio"""
+    from utils.platform_utils import get_ffmpeg_command
+
+    ffmpeg = get_ffmpeg_command()
+    rng = random.Random(seed)
+    scenes = []
+    for i in range(count):
+        image = os.path.join(workdir, f"scene_{i:02d}.png")
+        audio = os.path.join(workdir, f"audio_{i:02d}.mp3")
+        tone = f"sine=frequency={220 + 40 * i}:duration={rng.uniform(2, 6):.2f}"
+        pattern = f"testsrc=size=512x512:rate=1,hue=h={i * 40}"
+        quiet = [ffmpeg, "-y", "-v", "error", "-f", "lavfi", "-i"]
+        subprocess.run(quiet + [pattern, "-frames:v", "1", image], check=True)
+        subprocess.run(
+            quiet + [tone, "-c:a", "libmp3lame", "-b:a", "128k", audio], check=True
+        )
+        scenes.append((image, audio))
+    return scenes
+
+
+def _children_usage() -> Dict[str, float]:
+    if resource is None:
+        return {"cpu": 0.0, "out_blocks": 0}
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return {"cpu": usage.ru_utime + usage.ru_stime, "out_blocks": usage.ru_oublock}
+
+
+def _written(directory: str) -> Tuple[int, int]:
+    files = [os.path.join(directory, f) for f in os.listdir(directory)]
+    return len(files), sum(os.path.getsize(f) for f in files)
+
+
+def _as_bytes(scenes: List[Tuple[str, str]]) -> List[Tuple[bytes, bytes]]:
+    return [(Path(img).read_bytes(), Path(audio).read_bytes()) for img, audio in scenes]
+
+
+def run_once(agent: Any, renderer: str, scenes, output_dir: str) -> Dict[str, Any]:
+    shutil.rmtree(output_dir, ignore_errors=True)
+    os.makedirs(output_dir)
+    agent.output_dir = output_dir
+    if renderer == "memory":
+        scenes = _as_bytes(scenes)
+    before = _children_usage()
+    started = time.perf_counter()
+    final = agent.render_video(scenes, renderer=renderer)
+    wall = time.perf_counter() - started
+    after = _children_usage()
+    files, written = _written(output_dir)
+    return {
+        "wall_seconds": wall,
+        "child_cpu_seconds": after["cpu"] - before["cpu"],
+        "files_written": files,
+        "bytes_written": written,
+        "intermediate_bytes": written - os.path.getsize(final),
+        "out_blocks": after["out_blocks"] - before["out_blocks"],
+    }
+
+
+def main(argv: List[str] = None) -> Dict[str, Any]:
+    parser = argparse.ArgumentParser(description="Benchmark the video renderers")
+    parser.add_argument("--scenes", type=int, default=6)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--json", help="write the full report to this file")
+    args = parser.parse_args(argv)
+
+    os.environ.setdefault("OPENAI_API_KEY", "bench")
+    os.environ.setdefault("FFMPEG_PROGRESS", "false")
+    from agents.video_creator import VideoCreatorAgent
+
+    workdir = tempfile.mkdtemp(prefix="render-bench-")
+    try:
+        scenes = make_scenes(workdir, args.scenes, args.seed)
+        agent = VideoCreatorAgent()
+        results: Dict[str, List[Dict[str, Any]]] = {r: [] for r in RENDERERS}
+        for _ in range(args.repeat):
+            # Alternate renderers so page-cache warmth favours neither.
+            for renderer in RENDERERS:
+                output_dir = os.path.join(workdir, f"out_{renderer}")
+                run = run_once(agent, renderer, scenes, output_dir)
+                results[renderer].append(run)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    report = {"config": vars(args), "renderers": {}}
+    print(f"\n📊 {args.scenes} scenes, median of {args.repeat} runs")
+    for renderer, runs in results.items():
+        summary = {
+            key: statistics.median(run[key] for run in runs) for key in runs[0]
+        }
+        report["renderers"][renderer] = {"median": summary, "runs": runs}
+        print(
+            f"   {renderer:<12} wall={summary['wall_seconds']:.2f}s "
+            f"cpu={summary['child_cpu_seconds']:.2f}s "
+            f"files={summary['files_written']:.0f} "
+            f"written={summary['bytes_written'] / 1024:.0f}KiB "
+            f"(intermediate {summary['intermediate_bytes'] / 1024:.0f}KiB) "
+            f"out_blocks={summary['out_blocks']:.0f}"
+        )
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"💾 Report written to {args.json}")
+    return report
+
+
+if __name__ == "__main__":
+    main()
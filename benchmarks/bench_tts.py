@@ -0,0 +1,200 @@
+"""
+Benchmark per-scene against batched ElevenLabs narration.
+
+Starts ``benchmarks.mock_elevenlabs`` in-process and voices the same scenes
+through ``SceneAssetStage`` both ways:
+
+    per_scene  one text_to_speech.convert request per scene, on the stage's
+               voiceover pool
+    batched    one convert_with_timestamps request for every scene, split
+               into per-scene MP3s at the alignment's scene boundaries
+
+and reports wall time, requests sent, time spent queued behind the mock's
+concurrency limit and the per-scene durations each mode produced:
+
+    python -m benchmarks.bench_tts --scenes 8 --concurrency 2
+
+Images are skipped (the stage gets placeholder bytes) and the asset cache is
+disabled, so only narration is measured. Uses the ElevenLabs SDK pointed at
+the mock when it is installed, and a plain HTTP client otherwise.
+"""
+
+import argparse
+import json
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+from unittest import mock
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+MODES = ("per_scene", "batched")
+
+WORDS = (
+    "the city wakes as light spills across quiet streets while old stories "
+    "return and every small choice shapes what comes next for the people here"
+).split()
+
+
+class _HttpTextToSpeech:
+    """The two ElevenLabs SDK calls the agent makes, over plain HTTP"""
+
+    def __init__(self, base_url: str):
+        import requests
+
+        self.base_url = base_url
+        self.session = requests.Session()
+
+    def _post(self, path: str, text: str, model_id: str, **kwargs: Any):
+        response = self.session.post(
+            f"{self.base_url}/v1/text-to-speech/{path}",
+            json={"text": text, "model_id": model_id},
+            headers={"xi-api-key": "mock"},
+            **kwargs,
+        )
+        response.raise_for_status()
+        return response
+
+    def convert(self, voice_id: str, text: str, model_id: str, **_: Any):
+        response = self._post(voice_id, text, model_id, stream=True)
+        return response.iter_content(chunk_size=64 * 1024)
+
+    def convert_with_timestamps(
+        self, voice_id: str, text: str, model_id: str, **_: Any
+    ) -> Dict[str, Any]:
+        return self._post(f"{voice_id}/with-timestamps", text, model_id).json()
+
+
+class _HttpClient:
+    def __init__(self, base_url: str):
+        self.text_to_speech = _HttpTextToSpeech(base_url)
+
+
+def make_client(base_url: str) -> Any:
+    try:
+        from elevenlabs.client import ElevenLabs
+
+        return ElevenLabs(api_key="mock", base_url=base_url)
+    except ImportError:
+        return _HttpClient(base_url)
+
+
+def make_narrations(count: int, seed: int) -> List[str]:
+    rng = random.Random(seed)
+    narrations = []
+    for _ in range(count):
+        words = rng.sample(WORDS, rng.randint(10, 22))
+        narrations.append(" ".join(words).capitalize() + ".")
+    return narrations
+
+
+def configure_environment() -> str:
+    """Throwaway rate-limit state and no asset cache; call before importing"""
+    workdir = tempfile.mkdtemp(prefix="tts-bench-")
+    os.environ.update(
+        {
+            "ELEVENLABS_API_KEY": "mock",
+            "OPENAI_API_KEY": os.getenv("OPENAI_API_KEY", "bench"),
+            "ASSET_CACHE_ENABLED": "false",
+            "RATE_LIMIT_DB": os.path.join(workdir, "rate_limits.db"),
+            "RATE_LIMIT_ELEVENLABS_RPM": "1000000",
+        }
+    )
+    return workdir
+
+
+def run_mode(mode: str, narrations: List[str], client: Any, state: Any, workdir: str):
+    from agents import video_creator
+    from agents.video_creator import SceneAssetStage, VideoCreatorAgent
+    from utils.audio_utils import audio_duration
+
+    agent = VideoCreatorAgent(output_dir=os.path.join(workdir, mode))
+    agent.elevenlabs_client = client
+    before = dict(state.counters)
+    started = time.perf_counter()
+    with mock.patch.object(video_creator, "ELEVENLABS_AVAILABLE", True), mock.patch.object(
+        VideoCreatorAgent, "generate_image_bytes", lambda self, prompt: b"png"
+    ):
+        with SceneAssetStage(
+            agent, in_memory=True, batch_voice=mode == "batched"
+        ) as stage:
+            for i, narration in enumerate(narrations):
+                stage.submit({"narration": narration, "image_prompt": f"shot {i}"})
+            inputs = stage.results()
+    wall = time.perf_counter() - started
+    durations = [audio_duration(audio, fallback=False) for _, audio in inputs]
+    after = state.counters
+    return {
+        "wall_seconds": round(wall, 2),
+        "scenes": len(inputs),
+        "requests": after["requests"] - before["requests"],
+        "queued_seconds": round(after["queued_seconds"] - before["queued_seconds"], 2),
+        "audio_seconds": round(sum(durations), 2),
+        "mean_scene_seconds": round(statistics.mean(durations), 2) if durations else 0,
+        "scene_seconds": [round(d, 2) for d in durations],
+    }
+
+
+def main(argv: List[str] = None) -> Dict[str, Any]:
+    parser = argparse.ArgumentParser(description="Benchmark batched ElevenLabs TTS")
+    parser.add_argument("--scenes", type=int, default=8)
+    parser.add_argument("--modes", default=",".join(MODES))
+    parser.add_argument("--latency", default="fixed:0.4")
+    parser.add_argument("--chars-per-second", type=float, default=800.0)
+    parser.add_argument("--concurrency", type=int, default=2)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--json", help="write the full report to this file")
+    args = parser.parse_args(argv)
+
+    modes = [m.strip() for m in args.modes.split(",") if m.strip()]
+    unknown = set(modes) - set(MODES)
+    if unknown:
+        parser.error(f"unknown modes: {', '.join(sorted(unknown))}")
+
+    workdir = configure_environment()
+    from benchmarks.mock_elevenlabs import start_mock_server
+
+    server, state, base_url = start_mock_server(
+        latency=args.latency,
+        chars_per_second=args.chars_per_second,
+        concurrency=args.concurrency,
+        seed=args.seed,
+    )
+    client = make_client(base_url)
+    narrations = make_narrations(args.scenes, args.seed)
+    results = {}
+    try:
+        for mode in modes:
+            print(f"\n▶️  {mode}")
+            results[mode] = run_mode(mode, narrations, client, state, workdir)
+    finally:
+        server.shutdown()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print(
+        f"\n📊 {args.scenes} scenes, {sum(map(len, narrations))} characters "
+        f"(latency {args.latency}, concurrency {args.concurrency})"
+    )
+    for mode, result in results.items():
+        print(
+            f"   {mode:<10} wall={result['wall_seconds']}s "
+            f"requests={result['requests']} queued={result['queued_seconds']}s "
+            f"audio={result['audio_seconds']}s "
+            f"mean_scene={result['mean_scene_seconds']}s"
+        )
+    report = {"config": vars(args), "modes": results, "mock_server": state.counters}
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"💾 Report written to {args.json}")
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+Benchmark ModelsLab text2video job handling against the local stand-in.
+
+Starts ``benchmarks.mock_modelslab`` in-process and generates the same set of
+scene clips three ways:
+
+    sequential  one job at a time, as generate_video used to work
+    polling     every job submitted up front, polled with backoff
+    webhook     every job submitted up front, completions pushed to a local
+                webhook receiver (polling only as a backstop)
+
+and reports wall time, polls issued and time from submission to each clip:
+
+    python -m benchmarks.bench_video_jobs --scenes 6 --process uniform:3,8
+"""
+
+import argparse
+import json
+import shutil
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+MODES = ("sequential", "polling", "webhook")
+
+
+def start_webhook_receiver() -> str:
+    """Local stand-in for the Flask app's /modelslab/webhook route"""
+    from flask import Flask, request
+    from werkzeug.serving import make_server
+
+    from utils.modelslab_jobs import handle_webhook
+
+    app = Flask("webhook-receiver")
+
+    @app.route("/modelslab/webhook", methods=["POST"])
+    def webhook():
+        return {"received": handle_webhook(request.get_json(silent=True) or {})}
+
+    server = make_server("127.0.0.1", 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{server.server_port}/modelslab/webhook"
+
+
+def run_mode(mode: str, prompts: List[str], api_base: str, args) -> Dict[str, Any]:
+    from utils.modelslab_jobs import ModelsLabJobClient, VideoJob
+
+    webhook = start_webhook_receiver() if mode == "webhook" else None
+    client = ModelsLabJobClient(
+        api_key="mock",
+        api_base=api_base,
+        webhook_url=webhook,
+        poll_initial=args.poll_initial,
+        poll_max=args.poll_max,
+    )
+    workdir = tempfile.mkdtemp(prefix=f"jobs-{mode}-")
+    started = time.perf_counter()
+    try:
+        if mode == "sequential":
+            jobs = []
+            for i, prompt in enumerate(prompts):
+                jobs += client.run_jobs([VideoJob(i, prompt)], workdir)
+        else:
+            jobs = client.run(prompts, workdir)
+        wall = time.perf_counter() - started
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    ready = [job.finished_at - job.submitted_at for job in jobs if job.finished_at]
+    return {
+        "wall_seconds": round(wall, 2),
+        "clips": sum(1 for job in jobs if job.path),
+        "failed": sum(1 for job in jobs if not job.path),
+        "polls": sum(job.polls for job in jobs),
+        "median_ready_seconds": round(statistics.median(ready), 2) if ready else None,
+    }
+
+
+def main(argv: List[str] = None) -> Dict[str, Any]:
+    parser = argparse.ArgumentParser(description="Benchmark ModelsLab video jobs")
+    parser.add_argument("--scenes", type=int, default=6)
+    parser.add_argument("--modes", default=",".join(MODES))
+    parser.add_argument("--queue", default="uniform:0.5,2")
+    parser.add_argument("--process", default="uniform:2,6")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--poll-initial", type=float, default=1.0)
+    parser.add_argument("--poll-max", type=float, default=8.0)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--json", help="write the full report to this file")
+    args = parser.parse_args(argv)
+
+    modes = [m.strip() for m in args.modes.split(",") if m.strip()]
+    unknown = set(modes) - set(MODES)
+    if unknown:
+        parser.error(f"unknown modes: {', '.join(sorted(unknown))}")
+
+    from benchmarks.mock_modelslab import start_mock_server
+
+    server, state, api_base = start_mock_server(
+        queue=args.queue,
+        process=args.process,
+        error_rate=args.error_rate,
+        seed=args.seed,
+    )
+    prompts = [f"Cinematic sunrise over a city, shot {i}" for i in range(args.scenes)]
+    results = {}
+    try:
+        for mode in modes:
+            print(f"\n▶️  {mode}")
+            results[mode] = run_mode(mode, prompts, api_base, args)
+    finally:
+        server.shutdown()
+
+    print(f"\n📊 {args.scenes} scenes (queue {args.queue}, render {args.process})")
+    for mode, result in results.items():
+        print(
+            f"   {mode:<11} wall={result['wall_seconds']}s clips={result['clips']} "
+            f"failed={result['failed']} polls={result['polls']} "
+            f"median_ready={result['median_ready_seconds']}s"
+        )
+    report = {"config": vars(args), "modes": results, "mock_server": state.counters}
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"💾 Report written to {args.json}")
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+"""
+Local stand-in for the ElevenLabs text-to-speech API.
+
+Serves ``POST /v1/text-to-speech/<voice_id>`` (MP3 body) and
+``POST /v1/text-to-speech/<voice_id>/with-timestamps`` (base64 MP3 plus
+per-character alignment), so per-scene and batched narration can be compared
+without spending character quota:
+
+    python -m benchmarks.mock_elevenlabs --port 8300 --latency fixed:0.4 \
+        --concurrency 2
+    python -m benchmarks.bench_tts --scenes 8
+
+Each request waits the sampled latency plus ``len(text) / chars_per_second``
+of "generation". At most ``concurrency`` requests are generated at once, as
+with the per-plan concurrency limit of the real service; the rest queue. The
+audio is silent MPEG-1 Layer III (44.1 kHz mono, 128 kbps) whose length
+follows the alignment: ``speech_rate`` characters per second, and a
+``paragraph_pause`` for every blank line. Counters are at ``GET /mock/stats``.
+"""
+
+import argparse
+import base64
+import math
+import random
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from flask import Flask, Response, jsonify, request
+
+from benchmarks.mock_openai import sample_latency
+
+DEFAULT_CONFIG = {
+    "latency": "fixed:0.4",
+    "chars_per_second": 800.0,
+    "concurrency": 2,
+    "speech_rate": 15.0,
+    "paragraph_pause": 0.6,
+    "error_rate": 0.0,
+    "seed": None,
+}
+
+_SAMPLE_RATE = 44100
+_FRAME_SAMPLES = 1152
+# MPEG-1 Layer III, 128 kbps, 44.1 kHz, mono, no CRC; zeroed side info and
+# main data decode as silence.
+_SILENT_FRAME = bytes((0xFF, 0xFB, 0x90, 0xC0)) + bytes(417 - 4)
+
+
+class MockState:
+    """Runtime config, the concurrency gate and counters shared by the handlers"""
+
+    def __init__(self, **config: Any):
+        self.config = {**DEFAULT_CONFIG, **config}
+        self.rng = random.Random(self.config["seed"])
+        self._lock = threading.Lock()
+        self.slots = threading.Semaphore(int(self.config["concurrency"]))
+        self.active = 0
+        self.counters = {
+            "requests": 0,
+            "timestamp_requests": 0,
+            "characters": 0,
+            "audio_seconds": 0.0,
+            "queued_seconds": 0.0,
+            "peak_concurrency": 0,
+            "failed": 0,
+        }
+
+    def count(self, name: str, amount: float = 1) -> None:
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def sample(self) -> Tuple[float, bool]:
+        with self._lock:
+            latency = sample_latency(self.config["latency"], self.rng)
+            fail = self.rng.random() < self.config["error_rate"]
+        return latency, fail
+
+
+def alignment_for(text: str, speech_rate: float, pause: float) -> Dict[str, List]:
+    """Character timings as ElevenLabs reports them for ``text``"""
+    starts, ends = [], []
+    t = 0.0
+    for char in text:
+        duration = pause / 2 if char == "\n" else 1.0 / speech_rate
+        starts.append(round(t, 3))
+        t += duration
+        ends.append(round(t, 3))
+    return {
+        "characters": list(text),
+        "character_start_times_seconds": starts,
+        "character_end_times_seconds": ends,
+    }
+
+
+def silent_mp3(duration: float) -> bytes:
+    frames = max(1, math.ceil(duration * _SAMPLE_RATE / _FRAME_SAMPLES))
+    return _SILENT_FRAME * frames
+
+
+def _synthesize(state: MockState) -> Optional[Tuple[str, Dict[str, List], bytes]]:
+    """Validate the request and generate its audio, or None if it fails"""
+    payload = request.get_json(silent=True) or {}
+    text = payload.get("text") or ""
+    latency, fail = state.sample()
+    queued = time.perf_counter()
+    with state.slots:
+        state.count("queued_seconds", time.perf_counter() - queued)
+        with state._lock:
+            state.active += 1
+            state.counters["peak_concurrency"] = max(
+                state.counters["peak_concurrency"], state.active
+            )
+        try:
+            time.sleep(latency + len(text) / state.config["chars_per_second"])
+        finally:
+            with state._lock:
+                state.active -= 1
+    state.count("requests")
+    if fail or not text:
+        state.count("failed")
+        return None
+    alignment = alignment_for(
+        text, state.config["speech_rate"], state.config["paragraph_pause"]
+    )
+    duration = alignment["character_end_times_seconds"][-1]
+    state.count("characters", len(text))
+    state.count("audio_seconds", duration)
+    return text, alignment, silent_mp3(duration)
+
+
+def create_app(state: Optional[MockState] = None) -> Flask:
+    state = state or MockState()
+    app = Flask(__name__)
+
+    def error():
+        detail = {"status": "generation_failed", "message": "Mock TTS failure"}
+        return jsonify({"detail": detail}), 500
+
+    @app.route("/v1/text-to-speech/<voice_id>", methods=["POST"])
+    @app.route("/v1/text-to-speech/<voice_id>/stream", methods=["POST"])
+    def convert(voice_id):
+        result = _synthesize(state)
+        if result is None:
+            return error()
+        return Response(result[2], mimetype="audio/mpeg")
+
+    @app.route("/v1/text-to-speech/<voice_id>/with-timestamps", methods=["POST"])
+    def convert_with_timestamps(voice_id):
+        state.count("timestamp_requests")
+        result = _synthesize(state)
+        if result is None:
+            return error()
+        _, alignment, audio = result
+        return jsonify(
+            {
+                "audio_base64": base64.b64encode(audio).decode("ascii"),
+                "alignment": alignment,
+                "normalized_alignment": alignment,
+            }
+        )
+
+    @app.route("/mock/stats")
+    def mock_stats():
+        return jsonify(state.counters)
+
+    return app
+
+
+def start_mock_server(host: str = "127.0.0.1", port: int = 0, **config: Any):
+    """Serve the mock in a daemon thread; returns (server, state, base_url)"""
+    import logging
+
+    from werkzeug.serving import make_server
+
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+    state = MockState(**config)
+    server = make_server(host, port, create_app(state), threaded=True)
+    threading.Thread(
+        target=server.serve_forever, name="mock-elevenlabs", daemon=True
+    ).start()
+    return server, state, f"http://{host}:{server.server_port}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mock ElevenLabs TTS server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8300)
+    parser.add_argument("--latency", default=DEFAULT_CONFIG["latency"])
+    parser.add_argument(
+        "--chars-per-second", type=float, default=DEFAULT_CONFIG["chars_per_second"]
+    )
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONFIG["concurrency"])
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    state = MockState(
+        latency=args.latency,
+        chars_per_second=args.chars_per_second,
+        concurrency=args.concurrency,
+        error_rate=args.error_rate,
+        seed=args.seed,
+    )
+    print(f"🧪 Mock ElevenLabs server on http://{args.host}:{args.port}")
+    create_app(state).run(host=args.host, port=args.port, threaded=True)
+
+
+if __name__ == "__main__":
+    main()
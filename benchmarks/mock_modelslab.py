@@ -0,0 +1,225 @@
+"""
+Local stand-in for ModelsLab's asynchronous text2video API.
+
+Jobs move through "queued" and "processing" to "success" (or "error") on a
+timer, the way the real service reports them, so the job client can be
+exercised without paying for renders:
+
+    python -m benchmarks.mock_modelslab --port 8200 --queue uniform:1,4 \
+        --process uniform:5,15 --error-rate 0.05
+    MODELSLAB_API_BASE=http://127.0.0.1:8200/api/v6 python animated_video_creator.py
+
+Submissions answer "queued" with an id, an ``eta`` and a ``fetch_result``
+URL. ``POST /api/v6/video/fetch/<id>`` reports the current state; finished
+jobs list a clip URL served from ``/files/<id>.mp4``. When a submission
+carries a ``webhook`` URL, the finished job is POSTed there with its
+``track_id``. Timings use the same distribution specs as
+``benchmarks.mock_openai``. Counters are at ``GET /mock/stats``.
+"""
+
+import argparse
+import random
+import threading
+import time
+import uuid
+from typing import Any, Dict, Optional
+
+import requests
+from flask import Flask, Response, jsonify, request
+
+from benchmarks.mock_openai import sample_latency
+
+DEFAULT_CONFIG = {
+    "queue": "uniform:0.5,2",
+    "process": "uniform:2,6",
+    "error_rate": 0.0,
+    # Share of jobs that finish within the submit call itself.
+    "immediate_rate": 0.0,
+    "clip_bytes": 256 * 1024,
+    # Serve this file as every clip instead of random bytes.
+    "clip_path": None,
+    "seed": None,
+}
+
+
+class MockState:
+    """Runtime config, jobs and counters shared by the handlers"""
+
+    def __init__(self, **config: Any):
+        self.config = {**DEFAULT_CONFIG, **config}
+        self.rng = random.Random(self.config["seed"])
+        self._lock = threading.Lock()
+        self.jobs: Dict[str, Dict[str, Any]] = {}
+        self.counters = {
+            "submitted": 0,
+            "polls": 0,
+            "webhooks_sent": 0,
+            "downloads": 0,
+            "failed": 0,
+        }
+
+    def count(self, name: str, amount: int = 1) -> None:
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def create_job(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        with self._lock:
+            queue = sample_latency(self.config["queue"], self.rng)
+            process = sample_latency(self.config["process"], self.rng)
+            if self.rng.random() < self.config["immediate_rate"]:
+                queue = process = 0.0
+            job = {
+                "id": uuid.uuid4().hex[:12],
+                "created": time.time(),
+                "queue": queue,
+                "process": process,
+                "fail": self.rng.random() < self.config["error_rate"],
+                "webhook": payload.get("webhook"),
+                "track_id": payload.get("track_id"),
+                "delivered": False,
+            }
+            self.jobs[job["id"]] = job
+        return job
+
+    def status(self, job: Dict[str, Any]) -> str:
+        elapsed = time.time() - job["created"]
+        if elapsed < job["queue"]:
+            return "queued"
+        if elapsed < job["queue"] + job["process"]:
+            return "processing"
+        return "error" if job["fail"] else "success"
+
+
+def _clip(state: MockState, job_id: str) -> bytes:
+    if state.config["clip_path"]:
+        with open(state.config["clip_path"], "rb") as f:
+            return f.read()
+    return random.Random(job_id).randbytes(int(state.config["clip_bytes"]))
+
+
+def _describe(state: MockState, job: Dict[str, Any], base: str) -> Dict[str, Any]:
+    status = state.status(job)
+    body = {
+        "status": status,
+        "id": job["id"],
+        "track_id": job["track_id"],
+        "fetch_result": f"{base}/api/v6/video/fetch/{job['id']}",
+    }
+    if status in ("queued", "processing"):
+        remaining = job["created"] + job["queue"] + job["process"] - time.time()
+        body["eta"] = round(max(0.0, remaining), 1)
+        body["message"] = f"Request is {status}"
+    elif status == "success":
+        body["output"] = [f"{base}/files/{job['id']}.mp4"]
+    else:
+        body["message"] = "Video generation failed"
+    return body
+
+
+def _deliver_webhooks(state: MockState, base: str) -> None:
+    """Post finished jobs to their webhook URLs (runs forever, daemon thread)"""
+    while True:
+        time.sleep(0.05)
+        with state._lock:
+            due = [
+                job
+                for job in state.jobs.values()
+                if job["webhook"] and not job["delivered"]
+            ]
+        for job in due:
+            if state.status(job) in ("queued", "processing"):
+                continue
+            job["delivered"] = True
+            try:
+                requests.post(job["webhook"], json=_describe(state, job, base), timeout=5)
+                state.count("webhooks_sent")
+            except requests.RequestException:
+                pass
+
+
+def create_app(state: Optional[MockState] = None) -> Flask:
+    state = state or MockState()
+    app = Flask(__name__)
+
+    def base_url() -> str:
+        return request.host_url.rstrip("/")
+
+    @app.route("/api/v6/video/text2video_ultra", methods=["POST"])
+    def text2video():
+        payload = request.get_json(silent=True) or {}
+        if not payload.get("key") or not payload.get("prompt"):
+            return jsonify({"status": "error", "message": "key and prompt are required"})
+        job = state.create_job(payload)
+        state.count("submitted")
+        return jsonify(_describe(state, job, base_url()))
+
+    @app.route("/api/v6/video/fetch/<job_id>", methods=["POST"])
+    def fetch(job_id):
+        state.count("polls")
+        job = state.jobs.get(job_id)
+        if job is None:
+            return jsonify({"status": "error", "message": "Unknown request id"})
+        body = _describe(state, job, base_url())
+        if body["status"] == "error":
+            state.count("failed")
+        return jsonify(body)
+
+    @app.route("/files/<job_id>.mp4")
+    def clip(job_id):
+        if job_id not in state.jobs:
+            return Response(status=404)
+        state.count("downloads")
+        return Response(_clip(state, job_id), mimetype="video/mp4")
+
+    @app.route("/mock/stats")
+    def mock_stats():
+        return jsonify({**state.counters, "jobs": len(state.jobs)})
+
+    return app
+
+
+def start_mock_server(host: str = "127.0.0.1", port: int = 0, **config: Any):
+    """Serve the mock in a daemon thread; returns (server, state, api_base)"""
+    import logging
+
+    from werkzeug.serving import make_server
+
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+    state = MockState(**config)
+    server = make_server(host, port, create_app(state), threaded=True)
+    base = f"http://{host}:{server.server_port}"
+    threading.Thread(
+        target=server.serve_forever, name="mock-modelslab", daemon=True
+    ).start()
+    threading.Thread(target=_deliver_webhooks, args=(state, base), daemon=True).start()
+    return server, state, f"{base}/api/v6"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mock ModelsLab text2video server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8200)
+    parser.add_argument("--queue", default=DEFAULT_CONFIG["queue"])
+    parser.add_argument("--process", default=DEFAULT_CONFIG["process"])
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--immediate-rate", type=float, default=0.0)
+    parser.add_argument("--clip-path", default=None)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    state = MockState(
+        queue=args.queue,
+        process=args.process,
+        error_rate=args.error_rate,
+        immediate_rate=args.immediate_rate,
+        clip_path=args.clip_path,
+        seed=args.seed,
+    )
+    base = f"http://{args.host}:{args.port}"
+    threading.Thread(target=_deliver_webhooks, args=(state, base), daemon=True).start()
+    print(f"🧪 Mock ModelsLab server on {base}/api/v6")
+    create_app(state).run(host=args.host, port=args.port, threaded=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,321 @@
+"""
+Local stand-in for the OpenAI chat-completions and embeddings APIs.
+
+Point the pooled OpenAI client at it with OPENAI_BASE_URL to exercise the
+generation path without paying for real calls:
+
+    python -m benchmarks.mock_openai --port 8100 --latency lognormal:0.8,0.5 \
+        --error-rate 0.02 --rate-limit-rate 0.05
+    OPENAI_BASE_URL=http://127.0.0.1:8100/v1 OPENAI_API_KEY=mock python main.py
+
+Latency is sampled per request from a distribution ("fixed:S",
+"uniform:LO,HI", "normal:MEAN,SD" or "lognormal:MEDIAN,SIGMA", in seconds).
+Streamed responses wait the sampled latency before the first token and
+``token_delay`` between tokens. Replies are shaped like the real ones for the
+prompts the pipeline sends (one-line topics, shot-by-shot scene plans, SEO
+JSON), so downstream parsing runs as it would in production.
+
+Settings can be changed at runtime with ``POST /mock/config`` and counters
+read from ``GET /mock/stats``.
+"""
+
+import argparse
+import hashlib
+import json
+import math
+import random
+import threading
+import time
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+from flask import Flask, Response, jsonify, request
+
+DEFAULT_CONFIG = {
+    "latency": "lognormal:0.6,0.4",
+    "token_delay": 0.01,
+    "error_rate": 0.0,
+    "rate_limit_rate": 0.0,
+    "retry_after": 1.0,
+    "hang_rate": 0.0,
+    "hang_seconds": 30.0,
+    "scene_count": 5,
+    "embedding_dim": 256,
+    "seed": None,
+}
+
+LOREM = (
+    "success starts with one small habit repeated every single day until it "
+    "becomes who you are and the results follow faster than you expect"
+).split()
+
+
+def sample_latency(spec: str, rng: random.Random) -> float:
+    """Draw one latency (seconds) from a "kind:params" distribution spec"""
+    kind, _, params = spec.partition(":")
+    values = [float(v) for v in params.split(",") if v] if params else []
+    if kind == "fixed":
+        return values[0] if values else 0.0
+    if kind == "uniform":
+        return rng.uniform(values[0], values[1])
+    if kind == "normal":
+        return max(0.0, rng.gauss(values[0], values[1]))
+    if kind == "lognormal":
+        return values[0] * math.exp(values[1] * rng.gauss(0, 1))
+    raise ValueError(f"Unknown latency distribution: {spec}")
+
+
+class MockState:
+    """Runtime config plus request counters shared by the handlers"""
+
+    def __init__(self, **config: Any):
+        self.config = {**DEFAULT_CONFIG, **config}
+        self.rng = random.Random(self.config["seed"])
+        self._lock = threading.Lock()
+        self.counters = {
+            "requests": 0,
+            "streamed": 0,
+            "embeddings": 0,
+            "errors_injected": 0,
+            "rate_limited": 0,
+            "hung": 0,
+            "completion_tokens": 0,
+        }
+        self._topic_counter = 0
+
+    def count(self, name: str, amount: int = 1) -> None:
+        with self._lock:
+            self.counters[name] += amount
+
+    def roll(self) -> Tuple[float, float]:
+        """Sample (latency, fault roll) under the lock for reproducibility"""
+        with self._lock:
+            return (
+                sample_latency(self.config["latency"], self.rng),
+                self.rng.random(),
+            )
+
+    def next_topic(self) -> int:
+        with self._lock:
+            self._topic_counter += 1
+            return self._topic_counter
+
+
+def _reply_for(state: MockState, prompt: str, max_tokens: Optional[int]) -> str:
+    """A canned reply shaped like what the pipeline expects for ``prompt``"""
+    lowered = prompt.lower()
+    if "shot-by-shot" in lowered:
+        shots = []
+        for i in range(1, state.config["scene_count"] + 1):
+            shots.append(
+                f"Shot {i}:\nNarration: Step {i} of building a habit that sticks.\n"
+                f"Visual: A person at a desk at sunrise, scene {i}.\n"
+                f"Prompt: cinematic photo of a focused person at sunrise, shot {i}"
+            )
+        return "\n\n".join(shots)
+    if "reply with json" in lowered:
+        return json.dumps(
+            {
+                "title": "The 5-Minute Habit That Changes Everything",
+                "description": "A quick look at one habit. Subscribe for more!",
+                "tags": ["habits", "motivation", "productivity", "shorts"],
+            }
+        )
+    if "trending topic" in lowered:
+        return f"Micro-habit #{state.next_topic()}: the two-minute morning reset"
+    words = min(max_tokens or 200, 400)
+    return " ".join(LOREM[i % len(LOREM)] for i in range(words))
+
+
+def _embedding(text: str, dim: int) -> list:
+    seed = int(hashlib.sha256(text.encode("utf-8")).hexdigest()[:16], 16)
+    rng = random.Random(seed)
+    return [rng.gauss(0, 1) for _ in range(dim)]
+
+
+def create_app(state: Optional[MockState] = None) -> Flask:
+    state = state or MockState()
+    app = Flask(__name__)
+    app.config["MOCK_STATE"] = state
+
+    def inject_fault(fault: float) -> Optional[Response]:
+        config = state.config
+        if fault < config["error_rate"]:
+            state.count("errors_injected")
+            response = jsonify(
+                {"error": {"message": "Injected failure", "type": "server_error"}}
+            )
+            response.status_code = 500
+            return response
+        fault -= config["error_rate"]
+        if fault < config["rate_limit_rate"]:
+            state.count("rate_limited")
+            response = jsonify(
+                {"error": {"message": "Rate limit reached", "type": "rate_limit_error"}}
+            )
+            response.status_code = 429
+            response.headers["Retry-After"] = str(config["retry_after"])
+            return response
+        fault -= config["rate_limit_rate"]
+        if fault < config["hang_rate"]:
+            state.count("hung")
+            time.sleep(config["hang_seconds"])
+        return None
+
+    @app.route("/v1/chat/completions", methods=["POST"])
+    @app.route("/chat/completions", methods=["POST"])
+    def chat_completions():
+        body = request.get_json(force=True) or {}
+        state.count("requests")
+        latency, fault = state.roll()
+        failure = inject_fault(fault)
+        if failure is not None:
+            return failure
+
+        messages = body.get("messages") or []
+        prompt = "\n".join(str(m.get("content", "")) for m in messages)
+        model = body.get("model", "mock")
+        content = _reply_for(state, prompt, body.get("max_tokens"))
+        tokens = content.split(" ")
+        state.count("completion_tokens", len(tokens))
+        completion_id = f"chatcmpl-mock-{state.counters['requests']}"
+
+        if body.get("stream"):
+            state.count("streamed")
+            return Response(
+                _stream(state, completion_id, model, tokens, latency),
+                mimetype="text/event-stream",
+            )
+
+        time.sleep(latency)
+        prompt_tokens = max(1, len(prompt) // 4)
+        return jsonify(
+            {
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [
+                    {
+                        "index": 0,
+                        "message": {"role": "assistant", "content": content},
+                        "finish_reason": "stop",
+                    }
+                ],
+                "usage": {
+                    "prompt_tokens": prompt_tokens,
+                    "completion_tokens": len(tokens),
+                    "total_tokens": prompt_tokens + len(tokens),
+                },
+            }
+        )
+
+    @app.route("/v1/embeddings", methods=["POST"])
+    def embeddings():
+        body = request.get_json(force=True) or {}
+        state.count("embeddings")
+        latency, fault = state.roll()
+        failure = inject_fault(fault)
+        if failure is not None:
+            return failure
+        time.sleep(latency / 4)
+        inputs = body.get("input") or []
+        inputs = [inputs] if isinstance(inputs, str) else inputs
+        dim = state.config["embedding_dim"]
+        tokens = sum(max(1, len(t) // 4) for t in inputs)
+        return jsonify(
+            {
+                "object": "list",
+                "model": body.get("model", "mock-embedding"),
+                "data": [
+                    {"object": "embedding", "index": i, "embedding": _embedding(t, dim)}
+                    for i, t in enumerate(inputs)
+                ],
+                "usage": {"prompt_tokens": tokens, "total_tokens": tokens},
+            }
+        )
+
+    @app.route("/mock/config", methods=["GET", "POST"])
+    def mock_config():
+        if request.method == "POST":
+            updates = request.get_json(force=True) or {}
+            unknown = set(updates) - set(DEFAULT_CONFIG)
+            if unknown:
+                return jsonify({"error": f"Unknown settings: {sorted(unknown)}"}), 400
+            state.config.update(updates)
+        return jsonify(state.config)
+
+    @app.route("/mock/stats")
+    def mock_stats():
+        return jsonify(dict(state.counters))
+
+    return app
+
+
+def _stream(
+    state: MockState, completion_id: str, model: str, tokens: list, latency: float
+) -> Iterator[str]:
+    def chunk(delta: Dict[str, Any], finish_reason: Optional[str] = None) -> str:
+        payload = {
+            "id": completion_id,
+            "object": "chat.completion.chunk",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+        }
+        return f"data: {json.dumps(payload)}\n\n"
+
+    time.sleep(latency)
+    yield chunk({"role": "assistant", "content": ""})
+    for i, token in enumerate(tokens):
+        if i:
+            time.sleep(state.config["token_delay"])
+        yield chunk({"content": token if i == 0 else " " + token})
+    yield chunk({}, "stop")
+    yield "data: [DONE]\n\n"
+
+
+def start_mock_server(host: str = "127.0.0.1", port: int = 0, **config: Any):
+    """Serve the mock in a daemon thread; returns (server, state, base_url)"""
+    import logging
+
+    from werkzeug.serving import make_server
+
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+    state = MockState(**config)
+    server = make_server(host, port, create_app(state), threaded=True)
+    threading.Thread(
+        target=server.serve_forever, name="mock-openai", daemon=True
+    ).start()
+    return server, state, f"http://{host}:{server.server_port}/v1"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mock OpenAI-compatible server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--latency", default=DEFAULT_CONFIG["latency"])
+    parser.add_argument("--token-delay", type=float, default=DEFAULT_CONFIG["token_delay"])
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--retry-after", type=float, default=DEFAULT_CONFIG["retry_after"])
+    parser.add_argument("--hang-rate", type=float, default=0.0)
+    parser.add_argument("--scene-count", type=int, default=DEFAULT_CONFIG["scene_count"])
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    state = MockState(
+        latency=args.latency,
+        token_delay=args.token_delay,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        retry_after=args.retry_after,
+        hang_rate=args.hang_rate,
+        scene_count=args.scene_count,
+        seed=args.seed,
+    )
+    print(f"🧪 Mock OpenAI server on http://{args.host}:{args.port}/v1")
+    create_app(state).run(host=args.host, port=args.port, threaded=True)
+
+
+if __name__ == "__main__":
+    main()
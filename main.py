@@ -54,6 +54,36 @@ except ImportError:
     print("⚠️ Azure AI inference not available. Using OpenAI only.")
     AZURE_AI_AVAILABLE = False
 
+from utils.ai_clients import (
+    get_azure_client,
+    get_openai_client,
+    get_pool_stats,
+    invalidate_clients,
+)
+from utils.asset_cache import get_asset_cache_stats
+from utils.job_state import JobBusy, get_job_state_stats, get_job_store
+from utils.llm_cache import get_cache_stats
+from utils.llm_gateway import get_gateway
+from utils.media_fetch import get_media_fetch_stats
+from utils.model_policy import policy_request
+from utils.provider_router import get_router
+from utils.topic_index import get_topic_index, get_topic_index_stats
+from utils.workspace import (
+    get_workspace_stats,
+    is_job_id,
+    new_job_id,
+    sweep_stale_workspaces,
+)
+from utils.rate_limiter import get_rate_limiter, rate_limited_call
+from utils.script_backlog import (
+    SCRIPT_BACKLOG_FILL_INTERVAL,
+    get_script_backlog,
+    get_script_backlog_stats,
+    has_spare_quota,
+)
+from utils.stage_pipeline import StagePipeline, parse_budgets
+from utils.storage import STORAGE_GC_INTERVAL, get_storage_governor, get_storage_stats
+
 load_dotenv()
 
 faker = Faker()
@@ -79,7 +109,7 @@ shared_data = {
     "content_pipeline_active": True,
     "infrastructure_agents_active": 0,
     "video_generation_active": True,
-    "ai_provider": "openai",
+    "ai_provider": "auto",
     "system_status": "running",
     "monetization_eligible": True,
     "total_revenue": 0,
@@ -90,49 +120,55 @@ app = Flask(__name__)
 
 
 def get_ai_client():
-    """Get AI client based on configured provider with fallback"""
-    if shared_data["ai_provider"] == "azure" and AZURE_AI_AVAILABLE and GITHUB_TOKEN:
-        try:
-            return ChatCompletionsClient(
-                endpoint=AZURE_ENDPOINT, credential=AzureKeyCredential(GITHUB_TOKEN)
-            )
-        except Exception as e:
-            print(f"⚠️ Azure AI client failed, falling back to OpenAI: {e}")
-            shared_data["ai_provider"] = "openai"
+    """Get pooled AI client for the provider the router currently prefers"""
+    provider, _ = get_router().choose()
+    if provider == "azure":
+        return get_azure_client(GITHUB_TOKEN, AZURE_ENDPOINT)
+    return get_openai_client(os.getenv("OPENAI_API_KEY"))
+
+
+def ai_request(
+    prompt,
+    system_message="You are a helpful assistant.",
+    call_site="default",
+    cache_ttl=None,
+    bypass_cache=False,
+):
+    """Build a gateway request routed by provider health
+
+    The provider router picks OpenAI or GitHub Models per request, honouring
+    any ``/switch_ai`` override while that provider's breaker is closed. The
+    call site's model policy picks the model tier and generation settings.
+    """
+    return policy_request(
+        call_site,
+        prompt,
+        system_message,
+        provider="auto",
+        top_p=1.0,
+        cache_ttl=cache_ttl,
+        bypass_cache=bypass_cache,
+    )
 
-    return openai.OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
 
+def generate_ai_content(
+    prompt,
+    system_message="You are a helpful assistant.",
+    call_site="default",
+    cache_ttl=None,
+    bypass_cache=False,
+):
+    """Generate content using configured AI provider
 
-def generate_ai_content(prompt, system_message="You are a helpful assistant."):
-    """Generate content using configured AI provider"""
+    Requests go through the LLM gateway, so they share its per-provider
+    concurrency limits and deadlines. Responses are served from the LLM cache
+    when an identical request was answered within the call site's TTL; pass
+    ``bypass_cache=True`` for prompts that must stay creative.
+    """
     try:
-        if (
-            shared_data["ai_provider"] == "azure"
-            and AZURE_AI_AVAILABLE
-            and GITHUB_TOKEN
-        ):
-            client = get_ai_client()
-            response = client.complete(
-                messages=[
-                    SystemMessage(system_message),
-                    UserMessage(prompt),
-                ],
-                temperature=1.0,
-                top_p=1.0,
-                model=AZURE_MODEL,
-            )
-            return response.choices[0].message.content
-        else:
-            client = get_ai_client()
-            response = client.chat.completions.create(
-                model="gpt-4",
-                messages=[
-                    {"role": "system", "content": system_message},
-                    {"role": "user", "content": prompt},
-                ],
-                temperature=1.0,
-            )
-            return response.choices[0].message.content
+        return get_gateway().complete(
+            **ai_request(prompt, system_message, call_site, cache_ttl, bypass_cache)
+        )
     except Exception as e:
         print(f"❌ AI generation failed: {e}")
         return None
@@ -228,7 +264,7 @@ def check_youtube_monetization():
     try:
         youtube = build("youtube", "v3", developerKey=YOUTUBE_API_KEY)
         request = youtube.channels().list(part="monetizationDetails", mine=True)
-        response = request.execute()
+        response = rate_limited_call("youtube", request.execute)
 
         if response["items"]:
             monetization = response["items"][0].get("monetizationDetails", {})
@@ -307,7 +343,7 @@ def get_youtube_service():
     return build("youtube", "v3", credentials=creds)
 
 
-def upload_to_youtube(video_file, title, description):
+def upload_to_youtube(video_file, title, description, tags=None):
     """Upload video to YouTube using OAuth2 authentication"""
     try:
         youtube = get_youtube_service()
@@ -316,7 +352,7 @@ def upload_to_youtube(video_file, title, description):
             "snippet": {
                 "title": title,
                 "description": description,
-                "tags": ["AI", "automation", "content"],
+                "tags": tags or ["AI", "automation", "content"],
                 "categoryId": "22",
             },
             "status": {"privacyStatus": "public"},
@@ -327,7 +363,7 @@ def upload_to_youtube(video_file, title, description):
             part=",".join(body.keys()), body=body, media_body=media
         )
 
-        response = request.execute()
+        response = rate_limited_call("youtube", request.execute)
         video_id = response["id"]
 
         log_video_upload(title, description, video_id, "success")
@@ -340,8 +376,8 @@ def upload_to_youtube(video_file, title, description):
         return None
 
 
-def generate_video_script(topic):
-    """Generate video script using AI"""
+def video_script_request(topic):
+    """Gateway request for a video script about ``topic``"""
     prompt = f"""Create an engaging 2-minute YouTube video script about: {topic}
     
     Include:
@@ -352,58 +388,433 @@ def generate_video_script(topic):
     
     Format as scenes with timestamps."""
 
-    return generate_ai_content(prompt, "You are a professional YouTube scriptwriter.")
-
+    return ai_request(
+        prompt, "You are a professional YouTube scriptwriter.", call_site="video_script"
+    )
 
-def run_video_creator():
-    """Main video creation function using consolidated video creator"""
-    if not shared_data["video_generation_active"] or shared_data["paused"]:
-        return
 
+def generate_video_script(topic):
+    """Generate video script using AI"""
     try:
-        print("🎬 Starting video creation...")
+        return get_gateway().complete(**video_script_request(topic))
+    except Exception as e:
+        print(f"❌ AI generation failed: {e}")
+        return None
+
+
+def prepare_video_plan(topic, script):
+    """Run the independent per-script LLM steps concurrently
+
+    Scene breakdown, SEO metadata and the thumbnail concept only depend on the
+    script, so they are issued together through the gateway instead of back to
+    back. Each entry is the result or the exception that step raised.
+    """
+    from agents.seo_optimizer import parse_seo_metadata, seo_request
+    from agents.thumbnail_designer import thumbnail_request
+    from agents.video_creator import VideoCreatorAgent
+
+    results = get_gateway().run_concurrently(
+        {
+            "scene_plan": VideoCreatorAgent.scene_plan_request(script),
+            "seo": seo_request(topic, script),
+            "thumbnail": thumbnail_request(topic, script[:500]),
+        }
+    )
+    if not isinstance(results["seo"], Exception):
+        results["seo"] = parse_seo_metadata(results["seo"])
+    return results
+
+
+def checkpointable_plan(topic, script):
+    """``prepare_video_plan`` with failed steps as None, so it can be stored"""
+    return {
+        step: None if isinstance(result, Exception) else result
+        for step, result in prepare_video_plan(topic, script).items()
+    }
 
+
+TOPIC_MAX_ATTEMPTS = int(os.getenv("TOPIC_MAX_ATTEMPTS", "3"))
+
+
+def generate_fresh_topic(avoid=()):
+    """Ask for a trending topic, rejecting ones we have already covered
+
+    Rejected topics are fed back into the prompt so the next attempt steers
+    away from them; the retries bypass the LLM cache. ``avoid`` lists topics
+    of videos still in production, which are not in the index yet.
+    """
+    index = get_topic_index("topic")
+    covered = list(avoid)
+    in_production = {t.strip().lower() for t in avoid}
+    for attempt in range(TOPIC_MAX_ATTEMPTS):
+        prompt = "Generate a trending topic for a YouTube video"
+        if covered:
+            prompt += "\nAvoid these topics, we already covered them:\n" + "\n".join(
+                f"- {t}" for t in covered
+            )
         topic = generate_ai_content(
-            "Generate a trending topic for a YouTube video",
+            prompt,
             "You are a trend analyst. Suggest one specific, engaging topic.",
+            call_site="trending_topic",
+            bypass_cache=attempt > 0,
         )
-
         if not topic:
-            print("❌ Failed to generate topic")
-            return
+            return None
+        if topic.strip().lower() in in_production:
+            print(f"♻️ Topic already in production: {topic}")
+            continue
+        duplicate = index.find_duplicate(topic)
+        if duplicate is None:
+            return topic
+        print(
+            f"♻️ Topic too close to a past video ({duplicate['similarity']:.2f}): "
+            f"{duplicate['text']}"
+        )
+        log_action("video_creator", f"Rejected duplicate topic: {topic[:100]}", 0)
+        covered.append(duplicate["text"] or topic)
+    return None
 
-        print(f"📝 Topic: {topic}")
 
-        script = generate_video_script(topic)
-        if not script:
-            print("❌ Failed to generate script")
-            return
+class VideoJobStop(Exception):
+    """Ends a video job early with a final status other than success"""
 
-        from agents.video_creator import execute_video_creation
+    def __init__(self, reason, status="failed"):
+        super().__init__(reason)
+        self.status = status
 
-        video_file = f"video_{int(time.time())}.mp4"
-        result = execute_video_creation(script)
-        if result and "Error" not in str(result):
-            print(f"🎥 Video created: {result}")
 
-            title = f"AI Generated: {topic[:50]}..."
-            description = f"Auto-generated content about {topic}\n\n{script[:500]}..."
+# Topics of jobs between topic selection and upload, which the topic index
+# does not know about yet.
+_topics_in_production = {}
+_topics_lock = threading.Lock()
 
-            video_id = upload_to_youtube(result, title, description)
 
-            if video_id:
-                print(f"✅ Video uploaded: https://youtube.com/watch?v={video_id}")
-                shared_data["revenue"] += 10
-                shared_data["total_revenue"] += 10
+def pop_backlog_item(avoid=()):
+    """Oldest prepared backlog item that is still fresh, or None
 
-            if os.path.exists(result):
-                os.remove(result)
-        else:
-            print(f"❌ Video creation failed: {result}")
+    Items whose topic or script has been covered since they were prepared
+    (or whose topic is in production right now) are discarded.
+    """
+    backlog = get_script_backlog()
+    if not backlog.enabled:
+        return None
+    in_production = {t.strip().lower() for t in avoid}
+    while True:
+        item = backlog.pop()
+        if item is None:
+            return None
+        if item["topic"].strip().lower() in in_production:
+            print(f"♻️ Backlog topic already in production: {item['topic']}")
+            continue
+        if get_topic_index("topic").find_duplicate(item["topic"]) is not None:
+            print(f"♻️ Backlog topic covered since it was prepared: {item['topic']}")
+            continue
+        if get_topic_index("script").find_duplicate(item["script"]) is not None:
+            print(f"♻️ Backlog script covered since it was prepared: {item['topic']}")
+            continue
+        print(f"📦 Using prepared backlog item: {item['topic']}")
+        return item
+
+
+def prepare_backlog_item():
+    """Generate one ready-to-render item (topic, script, plan), or None"""
+    with _topics_lock:
+        avoid = list(_topics_in_production.values())
+    topic = generate_fresh_topic(avoid + get_script_backlog().topics())
+    if not topic:
+        return None
+    script = generate_video_script(topic)
+    if not script:
+        return None
+    if get_topic_index("script").find_duplicate(script) is not None:
+        print(f"♻️ Backlog script too close to a past video: {topic}")
+        return None
+    plan = checkpointable_plan(topic, script)
+    if plan["scene_plan"] is None:
+        return None
+    return {"topic": topic, "script": script, "plan": plan}
+
+
+def fill_script_backlog():
+    """Top the backlog up while the LLM providers have idle quota
+
+    Stops at the target depth, as soon as live work starts using the quota,
+    or when an item cannot be generated. Returns the number of items added.
+    """
+    backlog = get_script_backlog()
+    added = 0
+    while backlog.missing() and has_spare_quota():
+        item = prepare_backlog_item()
+        if item is None:
+            break
+        backlog.push(item["topic"], item["script"], item["plan"])
+        added += 1
+        print(f"📦 Backlog item ready: {item['topic']}")
+    return added
+
+
+def script_backlog_loop():
+    """Keep the script backlog filled during idle quota windows"""
+    backlog = get_script_backlog()
+    while True:
+        if not shared_data["paused"] and shared_data["video_generation_active"]:
+            try:
+                expired = backlog.purge()
+                if expired:
+                    print(f"🗑️ Dropped {expired} stale backlog items")
+                fill_script_backlog()
+            except Exception as e:
+                print(f"❌ Script backlog error: {e}")
+                log_action("video_creator", f"Script backlog error: {e}", -5)
+        time.sleep(SCRIPT_BACKLOG_FILL_INTERVAL)
+
+
+def start_video_job(job_id=None):
+    """Open (or resume) a checkpointed video job; returns its context"""
+    store = get_job_store()
+    job_id = store.start_job(job_id, resume=True)
+    print(f"🎬 Starting video creation (job {job_id})...")
+    return {"job_id": job_id, "job": store.checkpoints(job_id)}
+
+
+def end_video_job(ctx, error=None):
+    """Record how a job ended and release its in-production topic"""
+    with _topics_lock:
+        _topics_in_production.pop(ctx["job_id"], None)
+    if error is None:
+        get_job_store().finish_job(ctx["job_id"])
+        return
+    status = getattr(error, "status", "failed")
+    if status == "failed":
+        print(f"❌ {error}")
+    if not isinstance(error, VideoJobStop):
+        log_action("video_creator", f"Video creation failed: {error}", -10)
+    get_job_store().finish_job(ctx["job_id"], status, str(error))
+
+
+def prepare_video_job(ctx):
+    """Topic, script and the per-script LLM steps (scene plan, SEO, thumbnail)"""
+    job = ctx["job"]
+    if job.get("upload") is not None:
+        print(f"✅ Job {ctx['job_id']} was already uploaded")
+        raise VideoJobStop("already uploaded", "done")
+
+    with _topics_lock:
+        avoid = list(_topics_in_production.values())
+    if job.get("topic") is None:
+        item = pop_backlog_item(avoid)
+        if item is not None:
+            # Seed the checkpoints so the stages below reuse the prepared item.
+            job.record("topic", value=item["topic"])
+            job.record("script", value=item["script"], inputs={"topic": item["topic"]})
+            job.record("plan", value=item["plan"], inputs={"script": item["script"]})
+    topic = job.run(
+        "topic",
+        lambda: generate_fresh_topic(avoid + get_script_backlog().topics()),
+    )
+
+    if not topic:
+        raise VideoJobStop("Failed to generate a new topic")
+    with _topics_lock:
+        _topics_in_production[ctx["job_id"]] = topic
+
+    print(f"📝 Topic: {topic}")
+
+    script = job.run(
+        "script", lambda: generate_video_script(topic), inputs={"topic": topic}
+    )
+    if not script:
+        raise VideoJobStop("Failed to generate script")
+
+    duplicate = get_topic_index("script").find_duplicate(script)
+    if duplicate is not None:
+        print(
+            f"♻️ Script too close to a past video "
+            f"({duplicate['similarity']:.2f}), skipping this run"
+        )
+        raise VideoJobStop("duplicate script", "skipped")
+
+    plan = job.run(
+        "plan", lambda: checkpointable_plan(topic, script), inputs={"script": script}
+    )
+    if plan["scene_plan"] is None:
+        print("⚠️ Scene breakdown failed, retrying inline")
+    else:
+        job.record("scene_plan", value=plan["scene_plan"], inputs={"script": script})
+    if isinstance(plan["thumbnail"], str):
+        log_action(
+            "thumbnail_designer", f"Thumbnail concept: {plan['thumbnail'][:200]}"
+        )
+    ctx.update(topic=topic, script=script, plan=plan)
+    return ctx
+
+
+def produce_video_assets(ctx):
+    """Scene images and narration, checkpointed for the render stage"""
+    from agents.video_creator import prepare_video_assets
 
+    if ctx["job"].get("final", {"script": ctx["script"]}) is None:
+        scenes = prepare_video_assets(
+            ctx["script"], ctx["plan"]["scene_plan"], ctx["job_id"]
+        )
+        if not scenes:
+            raise VideoJobStop("Video creation failed: no scene assets")
+    return ctx
+
+
+def render_video_job(ctx):
+    """Encode the video (reusing checkpointed assets) and promote it"""
+    from agents.video_creator import execute_video_creation
+
+    def render():
+        video = execute_video_creation(
+            ctx["script"], ctx["plan"]["scene_plan"], job_id=ctx["job_id"]
+        )
+        if not video or str(video).startswith("Error"):
+            raise VideoJobStop(f"Video creation failed: {video}")
+        return video
+
+    ctx["video"] = ctx["job"].run(
+        "final", render, inputs={"script": ctx["script"]}, artifact=True
+    )
+    print(f"🎥 Video created: {ctx['video']}")
+    return ctx
+
+
+def upload_video_job(ctx):
+    """Upload with SEO metadata, index the topic and script, tidy up"""
+    topic, script, result = ctx["topic"], ctx["script"], ctx["video"]
+    seo = ctx["plan"]["seo"] if isinstance(ctx["plan"]["seo"], dict) else None
+    if seo:
+        title = seo["title"]
+        description = f"{seo['description']}\n\n{script[:500]}..."
+        tags = seo["tags"] or None
+    else:
+        title = f"AI Generated: {topic[:50]}..."
+        description = f"Auto-generated content about {topic}\n\n{script[:500]}..."
+        tags = None
+
+    video_id = ctx["job"].run(
+        "upload", lambda: upload_to_youtube(result, title, description, tags)
+    )
+    if not video_id:
+        # Keep the video so that resuming the job retries only the upload.
+        raise VideoJobStop(f"Upload failed, resume job {ctx['job_id']} to retry it")
+
+    get_topic_index("topic").add(topic, video_id)
+    get_topic_index("script").add(script, video_id)
+
+    print(f"✅ Video uploaded: https://youtube.com/watch?v={video_id}")
+    shared_data["revenue"] += 10
+    shared_data["total_revenue"] += 10
+    end_video_job(ctx)
+
+    if os.path.exists(result):
+        os.remove(result)
+    return ctx
+
+
+def run_video_creator(job_id=None):
+    """Create and upload one video as a resumable, checkpointed job
+
+    Every stage (topic, script, scene plan, scene assets, segments, final
+    video, upload) is recorded in the job-state table. Given a ``job_id``, or
+    when an earlier job failed or died part-way, the job is resumed and every
+    completed stage is skipped instead of starting over from a new topic.
+    A new job takes its topic, script and scene plan from the script backlog
+    when it has an item ready, and only generates them live otherwise.
+    """
+    if not shared_data["video_generation_active"] or shared_data["paused"]:
+        return
+
+    try:
+        ctx = start_video_job(job_id)
+    except JobBusy as e:
+        print(f"⏭️ {e}, not starting it again")
+        return
+    try:
+        for stage in (prepare_video_job, render_video_job, upload_video_job):
+            stage(ctx)
     except Exception as e:
-        print(f"❌ Video creation failed: {e}")
-        log_action("video_creator", f"Video creation failed: {e}", -10)
+        end_video_job(ctx, e)
+
+
+VIDEO_PIPELINE = os.getenv("VIDEO_PIPELINE", "false").lower() == "true"
+# Jobs allowed in flight beyond the one furthest along.
+VIDEO_PIPELINE_LOOKAHEAD = int(os.getenv("VIDEO_PIPELINE_LOOKAHEAD", "1"))
+# Minimum time between starting consecutive jobs (0 = as fast as stages allow).
+VIDEO_PIPELINE_INTERVAL = float(os.getenv("VIDEO_PIPELINE_INTERVAL_MINUTES", "0")) * 60
+# Admission pause after consecutive failed jobs, doubling per failure up to the max.
+VIDEO_PIPELINE_FAILURE_BACKOFF = float(os.getenv("VIDEO_PIPELINE_FAILURE_BACKOFF", "30"))
+VIDEO_PIPELINE_MAX_BACKOFF = float(os.getenv("VIDEO_PIPELINE_MAX_BACKOFF_MINUTES", "30")) * 60
+VIDEO_STAGE_CONCURRENCY = parse_budgets(
+    os.getenv("VIDEO_STAGE_CONCURRENCY", ""),
+    {"prepare": 1, "assets": 2, "render": 1, "upload": 1},
+)
+
+video_pipeline = None
+
+
+def run_video_pipeline(max_jobs=None):
+    """Produce videos back to back with the stages of consecutive jobs overlapping
+
+    While one video encodes or uploads, the next one's topic, script, scene
+    plan and assets are produced, each stage within its own concurrency
+    budget (VIDEO_STAGE_CONCURRENCY) and at most VIDEO_PIPELINE_LOOKAHEAD
+    jobs ahead. Stops admitting jobs when video generation is paused, and
+    backs off exponentially after consecutive failed jobs.
+    """
+    global video_pipeline
+    budgets = VIDEO_STAGE_CONCURRENCY
+    video_pipeline = StagePipeline(
+        [
+            ("prepare", prepare_video_job, budgets["prepare"]),
+            ("assets", produce_video_assets, budgets["assets"]),
+            ("render", render_video_job, budgets["render"]),
+            ("upload", upload_video_job, budgets["upload"]),
+        ],
+        lookahead=VIDEO_PIPELINE_LOOKAHEAD,
+        on_error=lambda ctx, stage, error: end_video_job(ctx, error),
+        failure_backoff=VIDEO_PIPELINE_FAILURE_BACKOFF,
+        max_backoff=VIDEO_PIPELINE_MAX_BACKOFF,
+    )
+    report = video_pipeline.run(
+        start_video_job,
+        max_jobs=max_jobs,
+        should_stop=lambda: not shared_data["video_generation_active"]
+        or shared_data["paused"],
+        min_interval=VIDEO_PIPELINE_INTERVAL,
+    )
+    print(
+        f"📈 Video pipeline: {report['completed']}/{report['admitted']} videos in "
+        f"{report['wall_seconds']:.0f}s ({report['jobs_per_hour']}/hour)"
+    )
+    return report
+
+
+def video_pipeline_loop():
+    """Keep the video pipeline running while video generation is enabled"""
+    while True:
+        if shared_data["paused"] or not shared_data["video_generation_active"]:
+            time.sleep(60)
+            continue
+        try:
+            run_video_pipeline()
+        except Exception as e:
+            print(f"❌ Video pipeline error: {e}")
+            log_action("video_creator", f"Video pipeline error: {e}", -10)
+            time.sleep(60)
+
+
+def storage_loop():
+    """Evict stale and least recently used output on a fixed interval"""
+    while True:
+        try:
+            get_storage_governor().collect()
+        except Exception as e:
+            print(f"❌ Storage collection error: {e}")
+            log_action("system", f"Storage collection error: {e}", -1)
+        time.sleep(STORAGE_GC_INTERVAL)
 
 
 def content_loop():
@@ -459,7 +870,24 @@ def infrastructure_loop():
 @app.route("/status")
 def status():
     """Get system status"""
-    return jsonify(shared_data)
+    return jsonify(
+        {
+            **shared_data,
+            "ai_clients": get_pool_stats(),
+            "llm_cache": get_cache_stats(),
+            "llm_gateway": get_gateway().stats(),
+            "rate_limits": get_rate_limiter().snapshot(),
+            "providers": get_router().snapshot(),
+            "topic_index": get_topic_index_stats(),
+            "workspaces": get_workspace_stats(),
+            "asset_cache": get_asset_cache_stats(),
+            "media_fetch": get_media_fetch_stats(),
+            "video_jobs": get_job_state_stats(),
+            "video_pipeline": video_pipeline.snapshot() if video_pipeline else None,
+            "script_backlog": get_script_backlog_stats(),
+            "storage": get_storage_stats(),
+        }
+    )
 
 
 @app.route("/metrics")
@@ -503,19 +931,99 @@ def toggle_video():
 
 @app.route("/trigger_video", methods=["POST"])
 def trigger_video():
-    """Manually trigger video creation"""
-    threading.Thread(target=run_video_creator, daemon=True).start()
+    """Manually trigger video creation, or resume a job given its job_id"""
+    job_id = (request.get_json(silent=True) or {}).get("job_id")
+    if job_id:
+        store = get_job_store()
+        if store.get_job(job_id) is None:
+            return jsonify({"error": f"unknown job {job_id}"}), 404
+        if store.is_running(job_id):
+            return jsonify({"error": f"job {job_id} is already running"}), 409
+    threading.Thread(target=run_video_creator, args=(job_id,), daemon=True).start()
+    if job_id:
+        return jsonify({"message": "Video job resumed", "job_id": job_id})
     return jsonify({"message": "Video creation triggered"})
 
 
+@app.route("/jobs/<job_id>")
+def job_state(job_id):
+    """Recorded stages of a video job"""
+    job = get_job_store().get_job(job_id)
+    if job is None:
+        return jsonify({"error": f"unknown job {job_id}"}), 404
+    return jsonify(job)
+
+
+@app.route("/render_draft", methods=["POST"])
+def render_draft():
+    """Render a fast low-resolution preview of a script for review"""
+    from agents.video_creator import execute_video_creation
+
+    body = request.get_json(silent=True) or {}
+    script = body.get("script")
+    if not script:
+        return jsonify({"error": "script is required"}), 400
+    # Registered before the render starts so /jobs/<job_id> knows it at once.
+    job_id = get_job_store().start_job(new_job_id(), kind="draft")
+
+    def render():
+        try:
+            result = execute_video_creation(
+                script, body.get("production_plan"), job_id, "draft"
+            )
+        except Exception as e:
+            result = f"Error creating video: {e}"
+        if result.startswith("Error"):
+            get_job_store().finish_job(job_id, "failed", result)
+        else:
+            get_job_store().finish_job(job_id)
+
+    threading.Thread(target=render, daemon=True).start()
+    return jsonify({"message": "Draft render triggered", "job_id": job_id})
+
+
+@app.route("/promote_draft", methods=["POST"])
+def promote_draft_route():
+    """Re-render an approved draft at final quality, reusing its assets"""
+    from agents.video_creator import (
+        RENDER_PROFILES,
+        draft_manifest_path,
+        promote_draft,
+    )
+
+    body = request.get_json(silent=True) or {}
+    job_id = body.get("job_id")
+    profile = body.get("profile", "final")
+    if not job_id:
+        return jsonify({"error": "job_id is required"}), 400
+    if not is_job_id(job_id):
+        return jsonify({"error": f"invalid job_id {job_id!r}"}), 400
+    if profile not in RENDER_PROFILES:
+        return jsonify({"error": f"unknown profile {profile}"}), 400
+    if not os.path.isfile(draft_manifest_path(job_id)):
+        return jsonify({"error": f"no draft found for job {job_id}"}), 404
+    threading.Thread(
+        target=promote_draft, args=(job_id, profile), daemon=True
+    ).start()
+    return jsonify({"message": f"Draft promotion to {profile} triggered"})
+
+
 @app.route("/switch_ai", methods=["POST"])
 def switch_ai():
-    """Switch AI provider"""
+    """Override the provider router ("auto" returns to health-weighted routing)"""
     provider = request.json.get("provider", "openai")
-    if provider in ["openai", "azure"]:
+    if provider in ["openai", "azure", "auto"]:
+        if provider not in ("auto", shared_data["ai_provider"]):
+            invalidate_clients(provider)
+        get_router().set_override(provider)
         shared_data["ai_provider"] = provider
         log_action("system", f"Switched to {provider} AI", 0)
-        return jsonify({"ai_provider": shared_data["ai_provider"]})
+        return jsonify(
+            {
+                "ai_provider": shared_data["ai_provider"],
+                "providers": get_router().snapshot(),
+            }
+        )
     return jsonify({"error": "Invalid provider"}), 400
 
 
@@ -608,7 +1116,18 @@ def create_stub_agents():
 
 
 def run_pipeline():
-    """Run CrewAI pipeline"""
+    """Run CrewAI pipeline
+
+    Starts from a prepared backlog item when one is ready; the trend and
+    script tasks only run when the backlog is empty.
+    """
+    with _topics_lock:
+        avoid = list(_topics_in_production.values())
+    item = pop_backlog_item(avoid)
+    brief = ""
+    if item is not None:
+        brief = f" about '{item['topic']}' using this script:\n{item['script']}"
+
     trend_scanner = Agent(
         role="TrendScout", goal="Find viral topics", backstory="Scans social trends"
     )
@@ -637,25 +1156,30 @@ def run_pipeline():
         backstory="Monitors monetization",
     )
 
-    core_tasks = [
-        Task(
-            agent=trend_scanner,
-            description="Find a viral idea",
-            expected_output="Trending topic identified",
-        ),
-        Task(
-            agent=script_writer,
-            description="Write a 60s script",
-            expected_output="60-second video script",
-        ),
+    idea_tasks = []
+    if item is None:
+        idea_tasks = [
+            Task(
+                agent=trend_scanner,
+                description="Find a viral idea",
+                expected_output="Trending topic identified",
+            ),
+            Task(
+                agent=script_writer,
+                description="Write a 60s script",
+                expected_output="60-second video script",
+            ),
+        ]
+
+    core_tasks = idea_tasks + [
         Task(
             agent=thumbnail_designer,
-            description="Design a thumbnail",
+            description="Design a thumbnail" + brief,
             expected_output="Thumbnail image file",
         ),
         Task(
             agent=video_creator,
-            description="Create a video",
+            description="Create a video" + brief,
             expected_output="Short video file",
         ),
         Task(
@@ -724,6 +1248,10 @@ def main(mode="unified"):
     print("📊 Initializing databases...")
     init_memory()
     init_video_db()
+    removed = sweep_stale_workspaces()
+    if removed:
+        print(f"🧹 Removed {removed} stale job workspaces")
+    threading.Thread(target=storage_loop, daemon=True).start()
 
     print("💰 Checking YouTube monetization...")
     check_youtube_monetization()
@@ -738,9 +1266,17 @@ def main(mode="unified"):
         print("🎭 Creating stub agents...")
         create_stub_agents()
 
-    print("🎬 Starting video generation scheduler...")
+    if get_script_backlog().enabled:
+        print("📦 Starting script backlog filler...")
+        threading.Thread(target=script_backlog_loop, daemon=True).start()
+
     scheduler = BackgroundScheduler()
-    scheduler.add_job(run_video_creator, "interval", minutes=15)
+    if VIDEO_PIPELINE:
+        print("🎬 Starting pipelined video production...")
+        threading.Thread(target=video_pipeline_loop, daemon=True).start()
+    else:
+        print("🎬 Starting video generation scheduler...")
+        scheduler.add_job(run_video_creator, "interval", minutes=15)
     scheduler.start()
 
     processes = []
@@ -767,7 +1303,10 @@ def main(mode="unified"):
     print("=" * 60)
     print("✅ Unified Autonomous Agent System is running!")
     print("📊 Monitor at: http://localhost:8000/status")
-    print("🎬 Video generation: Every 15 minutes")
+    if VIDEO_PIPELINE:
+        print("🎬 Video generation: Pipelined, back to back")
+    else:
+        print("🎬 Video generation: Every 15 minutes")
     print("📝 Content pipeline: Every 60 minutes")
     print("🏗️ Infrastructure: Every 60 minutes")
     if mode in ["unified", "crewai"]:
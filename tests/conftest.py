@@ -0,0 +1,8 @@
+"""
+Shared setup for the unit tests: make the repo's packages importable.
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
@@ -0,0 +1,110 @@
+"""
+Tests for the content-addressed asset cache.
+"""
+
+import os
+import stat
+import sys
+
+import pytest
+
+from utils.asset_cache import AssetCache, link_or_copy, make_asset_key
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return AssetCache(cache_dir=str(tmp_path / "cache"), max_bytes=1 << 20)
+
+
+def write(path, data):
+    with open(path, "wb") as f:
+        f.write(data)
+    return str(path)
+
+
+def test_keys_depend_on_every_input():
+    key = make_asset_key("openai", "dall-e-3", None, "a cat", "1024x1024")
+    assert key == make_asset_key("openai", "dall-e-3", "", "a cat", "1024x1024")
+    assert key != make_asset_key("openai", "dall-e-3", None, "a dog", "1024x1024")
+    assert key != make_asset_key("openai", "dall-e-3", None, "a cat", "512x512")
+
+
+def test_store_then_fetch(cache, tmp_path):
+    src = write(tmp_path / "voice.mp3", b"narration")
+    cache.store("k1", src, kind="audio")
+
+    dest = str(tmp_path / "workspace.mp3")
+    assert cache.fetch("k1", dest, kind="audio") == dest
+    with open(dest, "rb") as f:
+        assert f.read() == b"narration"
+    assert cache.read("k1", kind="audio") == b"narration"
+    assert cache.stats()["kinds"]["audio"]["hits"] == 2
+
+
+def test_miss_returns_none(cache, tmp_path):
+    assert cache.fetch("missing", str(tmp_path / "out.png"), kind="image") is None
+    assert cache.stats()["kinds"]["image"]["misses"] == 1
+
+
+def test_store_bytes(cache):
+    cache.store_bytes("k2", b"\x89PNG data", ".png", kind="image")
+    assert cache.read("k2", kind="image") == b"\x89PNG data"
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="POSIX permission bits")
+def test_blobs_are_read_only(cache, tmp_path):
+    cache.store_bytes("k3", b"blob", ".bin")
+    path, _ = cache._lookup("k3", "asset")
+    assert not os.stat(path).st_mode & (stat.S_IWUSR | stat.S_IWGRP | stat.S_IWOTH)
+
+
+def test_relinking_over_a_fetched_blob_leaves_the_blob_intact(cache, tmp_path):
+    cache.store_bytes("k4", b"cached", ".bin")
+    dest = str(tmp_path / "asset.bin")
+    cache.fetch("k4", dest)
+
+    link_or_copy(write(tmp_path / "other.bin", b"replacement"), dest)
+
+    with open(dest, "rb") as f:
+        assert f.read() == b"replacement"
+    assert cache.read("k4") == b"cached"
+
+
+def test_corrupt_blob_is_dropped(cache):
+    cache.store_bytes("k5", b"original", ".bin")
+    path, _ = cache._lookup("k5", "asset")
+    os.chmod(path, 0o644)
+    write(path, b"tampered")
+
+    assert cache.read("k5") is None
+    assert cache.stats()["kinds"]["asset"]["corrupt"] == 1
+    assert not os.path.exists(path)
+
+
+def test_missing_blob_is_a_miss(cache):
+    cache.store_bytes("k6", b"original", ".bin")
+    path, _ = cache._lookup("k6", "asset")
+    os.remove(path)
+
+    assert cache.read("k6") is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_least_recently_used_blob_is_evicted(tmp_path):
+    cache = AssetCache(cache_dir=str(tmp_path / "cache"), max_bytes=25)
+    cache.store_bytes("old", b"x" * 10, ".bin")
+    cache.store_bytes("used", b"y" * 10, ".bin")
+    cache.read("old")
+
+    cache.store_bytes("new", b"z" * 10, ".bin")
+
+    assert [key for key, _, _ in cache.entries()] == ["old", "new"]
+    assert cache.read("used") is None
+    assert cache.stats()["kinds"]["asset"]["evictions"] == 1
+
+
+def test_disabled_cache_stores_nothing(tmp_path):
+    cache = AssetCache(cache_dir=str(tmp_path / "cache"), enabled=False)
+    cache.store_bytes("k7", b"data", ".bin")
+    assert cache.read("k7") is None
+    assert not os.path.exists(tmp_path / "cache")
@@ -0,0 +1,114 @@
+"""
+Tests for the in-process WAV/MP3/AAC duration parser.
+"""
+
+import struct
+
+import pytest
+
+from utils.audio_utils import (
+    AudioFormatError,
+    audio_duration,
+    parse_duration,
+    silent_wav,
+    split_mp3,
+)
+
+# MPEG-1 Layer III, 128 kbps, 44.1 kHz, stereo: 417-byte frames of 1152 samples.
+MP3_HEADER = 0xFFFB9000
+MP3_FRAME_LENGTH = 417
+MP3_FRAME_SECONDS = 1152 / 44100
+
+
+def mp3_frame(body=b""):
+    frame = struct.pack(">I", MP3_HEADER) + body
+    return frame + bytes(MP3_FRAME_LENGTH - len(frame))
+
+
+def mp3(frames):
+    return mp3_frame() * frames
+
+
+def xing_frame(frames):
+    # Side info is 32 bytes for MPEG-1 stereo; flag 1 = frame count present.
+    return mp3_frame(bytes(32) + b"Xing" + struct.pack(">II", 1, frames))
+
+
+def id3_tag(size):
+    synchsafe = bytes((size >> shift) & 0x7F for shift in (21, 14, 7, 0))
+    return b"ID3\x04\x00\x00" + synchsafe + bytes(size)
+
+
+def adts_frame(length=200, sample_rate_index=4):
+    # MPEG-4 AAC LC without CRC, two channels, one raw data block.
+    header = bytes(
+        (
+            0xFF,
+            0xF1,
+            0x40 | (sample_rate_index << 2),
+            0x80 | (length >> 11),
+            (length >> 3) & 0xFF,
+            ((length & 7) << 5) | 0x1F,
+            0xFC,
+        )
+    )
+    return header + bytes(length - len(header))
+
+
+def test_wav_duration():
+    assert parse_duration(silent_wav(1.5)) == pytest.approx(1.5)
+
+
+def test_mp3_frame_walk():
+    assert parse_duration(mp3(100)) == pytest.approx(100 * MP3_FRAME_SECONDS)
+
+
+def test_mp3_xing_header_frame_count():
+    # The Xing count wins over the (much shorter) audio actually present.
+    data = xing_frame(5000) + mp3(3)
+    assert parse_duration(data) == pytest.approx(5000 * MP3_FRAME_SECONDS)
+
+
+def test_mp3_after_id3_tag():
+    data = id3_tag(300) + mp3(10)
+    assert parse_duration(data) == pytest.approx(10 * MP3_FRAME_SECONDS)
+
+
+def test_adts_aac_duration():
+    data = adts_frame() * 43
+    assert parse_duration(data) == pytest.approx(43 * 1024 / 44100)
+
+
+def test_adts_sample_rate():
+    data = adts_frame(sample_rate_index=3) * 10
+    assert parse_duration(data) == pytest.approx(10 * 1024 / 48000)
+
+
+def test_file_and_bytes_sources_agree(tmp_path):
+    path = tmp_path / "voice.mp3"
+    path.write_bytes(mp3(20))
+    assert audio_duration(str(path)) == audio_duration(path.read_bytes())
+
+
+def test_unparseable_audio_raises_without_fallback(tmp_path):
+    with pytest.raises(AudioFormatError):
+        audio_duration(b"not audio at all", fallback=False)
+    empty = tmp_path / "empty.mp3"
+    empty.write_bytes(b"")
+    with pytest.raises(AudioFormatError):
+        audio_duration(str(empty), fallback=False)
+
+
+def test_split_mp3_at_frame_boundaries():
+    data = id3_tag(50) + xing_frame(30) + mp3(30)
+    pieces = split_mp3(data, [10 * MP3_FRAME_SECONDS, 25 * MP3_FRAME_SECONDS])
+
+    assert [len(p) // MP3_FRAME_LENGTH for p in pieces] == [10, 15, 5]
+    assert all(len(p) % MP3_FRAME_LENGTH == 0 for p in pieces)
+    assert parse_duration(pieces[1]) == pytest.approx(15 * MP3_FRAME_SECONDS)
+
+
+def test_split_mp3_pads_cuts_past_the_end():
+    pieces = split_mp3(mp3(4), [1.0, 2.0])
+    assert len(pieces) == 3
+    assert pieces[1:] == [b"", b""]
@@ -0,0 +1,96 @@
+"""
+Tests for the job-state store and its stage checkpoints.
+"""
+
+import pytest
+
+from utils.job_state import JobBusy, JobStateStore
+from utils.workspace import new_job_id
+
+
+@pytest.fixture
+def store(tmp_path):
+    return JobStateStore(str(tmp_path / "job_state.db"))
+
+
+def test_start_job_registers_a_running_job(store):
+    job_id = store.start_job(kind="draft")
+
+    job = store.get_job(job_id)
+    assert job["kind"] == "draft"
+    assert job["status"] == "running"
+    assert job["attempts"] == 1
+    assert store.is_running(job_id)
+
+
+def test_unknown_job(store):
+    assert store.get_job(new_job_id()) is None
+
+
+def test_running_job_cannot_be_claimed_twice(store):
+    job_id = store.start_job()
+    with pytest.raises(JobBusy):
+        store.start_job(job_id)
+    # Nor from another process while it is making progress.
+    with pytest.raises(JobBusy):
+        JobStateStore(store.db_path).start_job(job_id)
+
+
+def test_finish_job(store):
+    job_id = store.start_job()
+    store.finish_job(job_id, "failed", "ffmpeg exited with 1")
+
+    job = store.get_job(job_id)
+    assert job["status"] == "failed"
+    assert job["error"] == "ffmpeg exited with 1"
+    assert not store.is_running(job_id)
+
+
+def test_resume_picks_up_the_failed_job_of_the_same_kind(store):
+    failed = store.start_job()
+    store.finish_job(failed, "failed", "boom")
+    draft = store.start_job(kind="draft")
+    store.finish_job(draft, "failed", "boom")
+
+    assert store.start_job(resume=True) == failed
+    assert store.get_job(failed)["attempts"] == 2
+    # Nothing else to resume, so a new job is created.
+    assert store.start_job(resume=True) not in (failed, draft)
+
+
+def test_checkpoints_skip_completed_stages(store):
+    job = store.checkpoints(store.start_job())
+    calls = []
+
+    def plan():
+        calls.append(1)
+        return {"scenes": 3}
+
+    assert job.run("scene_plan", plan, inputs="script") == {"scenes": 3}
+    assert job.run("scene_plan", plan, inputs="script") == {"scenes": 3}
+    assert len(calls) == 1
+    # Different inputs invalidate the record.
+    job.run("scene_plan", plan, inputs="new script")
+    assert len(calls) == 2
+
+
+def test_failed_stages_are_not_recorded(store):
+    job = store.checkpoints(store.start_job())
+    assert job.run("upload", lambda: None) is None
+    assert job.get("upload") is None
+
+
+def test_changed_artifacts_are_produced_again(store, tmp_path):
+    job = store.checkpoints(store.start_job())
+    segment = tmp_path / "segment_00.mp4"
+
+    def encode():
+        segment.write_bytes(b"frames")
+        return str(segment)
+
+    assert job.run("segment_00", encode, artifact=True) == str(segment)
+    assert job.get("segment_00")["path"] == str(segment)
+
+    segment.write_bytes(b"truncated")
+    assert job.get("segment_00") is None
+    assert store.stats()["invalid"] == 1
@@ -0,0 +1,124 @@
+"""
+Tests for the SQLite token-bucket rate limiter.
+"""
+
+import email.utils
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from utils.rate_limiter import (
+    RateLimiter,
+    RateLimitTimeout,
+    is_rate_limited,
+    retry_after_seconds,
+)
+
+
+class FakeRateLimitError(Exception):
+    """An SDK-style 429 carrying its response"""
+
+    def __init__(self, headers=None):
+        super().__init__("429 Too Many Requests")
+        self.response = SimpleNamespace(status_code=429, headers=headers or {})
+
+
+@pytest.fixture
+def limiter(tmp_path, monkeypatch):
+    monkeypatch.setenv("RATE_LIMIT_TESTPROV_RPM", "600")
+    monkeypatch.setenv("RATE_LIMIT_TESTPROV_TPM", "100")
+    return RateLimiter(str(tmp_path / "rate_limits.db"))
+
+
+def test_try_acquire_grants_until_empty(limiter, monkeypatch):
+    monkeypatch.setenv("RATE_LIMIT_TESTPROV_RPM", "2")
+    assert limiter.try_acquire("testprov") == 0.0
+    assert limiter.try_acquire("testprov") == 0.0
+    # One request refills every 30s at 2 RPM.
+    assert limiter.try_acquire("testprov") == pytest.approx(30, abs=0.5)
+
+
+def test_token_charge_is_capped_at_capacity(limiter):
+    assert limiter.try_acquire("testprov", tokens=1000) == 0.0
+    snapshot = limiter.snapshot()["testprov"]
+    assert snapshot["tpm_available"] == pytest.approx(0, abs=0.5)
+    assert limiter.try_acquire("testprov", tokens=60) > 0
+
+
+def test_acquire_raises_instead_of_waiting_too_long(limiter, monkeypatch):
+    monkeypatch.setenv("RATE_LIMIT_TESTPROV_RPM", "1")
+    limiter.acquire("testprov")
+    with pytest.raises(RateLimitTimeout):
+        limiter.acquire("testprov", max_wait=1)
+
+
+def test_throttled_call_is_retried_and_charged_actual_usage(limiter):
+    attempts = []
+
+    def fn():
+        attempts.append(time.time())
+        if len(attempts) == 1:
+            raise FakeRateLimitError({"retry-after-ms": "1"})
+        return SimpleNamespace(usage=SimpleNamespace(total_tokens=10))
+
+    result = limiter.call("testprov", fn, tokens=50)
+
+    assert result.usage.total_tokens == 10
+    assert len(attempts) == 2
+    bucket = limiter.snapshot()["testprov"]
+    # The rejected attempt is refunded and the retry settles to 10 tokens.
+    assert bucket["tpm_available"] == pytest.approx(90, abs=1)
+    assert bucket["throttled_total"] == 1
+    assert bucket["granted_total"] == 2
+
+
+def test_non_rate_limit_errors_are_not_retried(limiter):
+    calls = []
+
+    def fn():
+        calls.append(1)
+        raise ValueError("bad request")
+
+    with pytest.raises(ValueError):
+        limiter.call("testprov", fn)
+    assert len(calls) == 1
+
+
+def test_throttle_blocks_and_halves_the_rate(limiter):
+    delay = limiter.report_throttled("testprov", retry_after=60)
+
+    assert delay == 60
+    assert limiter.headroom("testprov") == 0.0
+    assert limiter.try_acquire("testprov") == pytest.approx(60, abs=0.5)
+    assert limiter.snapshot()["testprov"]["rate_scale"] == 0.5
+
+
+def test_success_ramps_the_rate_back_up(limiter):
+    limiter.report_throttled("testprov", retry_after=0)
+    limiter.report_success("testprov")
+    assert limiter.snapshot()["testprov"]["rate_scale"] == pytest.approx(0.55)
+
+
+def test_headroom_does_not_create_buckets(limiter):
+    assert limiter.headroom("testprov") == 1.0
+    assert limiter._known_providers() == set()
+
+
+def test_headroom_reflects_spent_quota(limiter):
+    limiter.try_acquire("testprov", tokens=75)
+    assert limiter.headroom("testprov") == pytest.approx(0.25, abs=0.01)
+
+
+def test_retry_after_parsing():
+    assert retry_after_seconds(FakeRateLimitError({"retry-after": "7"})) == 7.0
+    assert retry_after_seconds(FakeRateLimitError({"retry-after-ms": "250"})) == 0.25
+    date = email.utils.formatdate(time.time() + 30, usegmt=True)
+    parsed = retry_after_seconds(FakeRateLimitError({"retry-after": date}))
+    assert parsed == pytest.approx(30, abs=2)
+    assert retry_after_seconds(FakeRateLimitError()) is None
+
+
+def test_is_rate_limited():
+    assert is_rate_limited(FakeRateLimitError())
+    assert not is_rate_limited(ValueError("boom"))
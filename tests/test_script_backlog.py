@@ -0,0 +1,72 @@
+"""
+Tests for the backlog of pre-generated scripts.
+"""
+
+import time
+
+import pytest
+
+import utils.script_backlog as script_backlog
+from utils.rate_limiter import RateLimiter
+from utils.script_backlog import ScriptBacklog, has_spare_quota
+
+
+@pytest.fixture
+def backlog(tmp_path):
+    return ScriptBacklog(str(tmp_path / "script_backlog.db"), depth=3, ttl=3600)
+
+
+def test_items_pop_oldest_first(backlog):
+    backlog.push("topic a", "script a", {"scenes": [1]})
+    backlog.push("topic b", "script b", {"scenes": [2]})
+
+    first = backlog.pop()
+    assert (first["topic"], first["script"], first["plan"]) == (
+        "topic a",
+        "script a",
+        {"scenes": [1]},
+    )
+    assert backlog.pop()["topic"] == "topic b"
+    assert backlog.pop() is None
+    assert backlog.stats()["empty"] == 1
+
+
+def test_items_are_popped_once_across_processes(backlog):
+    backlog.push("topic", "script", {})
+    other = ScriptBacklog(backlog.db_path)
+    assert other.pop() is not None
+    assert backlog.pop() is None
+
+
+def test_expired_items_are_dropped(tmp_path):
+    backlog = ScriptBacklog(str(tmp_path / "script_backlog.db"), depth=3, ttl=0.01)
+    backlog.push("stale", "script", {})
+    time.sleep(0.05)
+
+    assert backlog.topics() == []
+    assert backlog.purge() == 1
+    assert backlog.pop() is None
+
+
+def test_missing_counts_towards_depth(backlog):
+    assert backlog.missing() == 3
+    backlog.push("topic", "script", {})
+    assert backlog.missing() == 2
+    assert backlog.topics() == ["topic"]
+    assert backlog.stats()["depth"] == 1
+
+
+def test_zero_depth_disables_the_backlog(tmp_path):
+    backlog = ScriptBacklog(str(tmp_path / "script_backlog.db"), depth=0)
+    assert not backlog.enabled
+    assert backlog.missing() == 0
+
+
+def test_spare_quota_follows_provider_headroom(tmp_path, monkeypatch):
+    limiter = RateLimiter(str(tmp_path / "rate_limits.db"))
+    monkeypatch.setattr(script_backlog, "get_rate_limiter", lambda: limiter)
+
+    assert has_spare_quota(["openai", "azure"], min_headroom=0.5)
+    limiter.report_throttled("azure", retry_after=60)
+    assert not has_spare_quota(["openai", "azure"], min_headroom=0.5)
+    assert has_spare_quota(["openai"], min_headroom=0.5)
@@ -0,0 +1,124 @@
+"""
+Tests for the bounded-lookahead stage pipeline.
+"""
+
+import threading
+import time
+
+from utils.stage_pipeline import StagePipeline, parse_budgets
+
+
+def jobs(count):
+    """next_job callback handing out ``count`` numbered jobs"""
+    remaining = iter(range(count))
+    return lambda: next(remaining, None)
+
+
+def test_parse_budgets():
+    defaults = {"prepare": 1, "render": 1}
+    assert parse_budgets("", defaults) == defaults
+    assert parse_budgets("render=2, upload=3", defaults) == {
+        "prepare": 1,
+        "render": 2,
+        "upload": 3,
+    }
+    assert parse_budgets("render=0", defaults)["render"] == 1
+
+
+def test_jobs_pass_through_every_stage_in_order():
+    seen = []
+    lock = threading.Lock()
+
+    def stage(name):
+        def fn(job):
+            with lock:
+                seen.append((job, name))
+            return job
+
+        return (name, fn, 2)
+
+    pipeline = StagePipeline([stage("prepare"), stage("render"), stage("upload")])
+    report = pipeline.run(jobs(4))
+
+    assert report["admitted"] == report["completed"] == 4
+    for job in range(4):
+        assert [name for j, name in seen if j == job] == ["prepare", "render", "upload"]
+    assert report["stages"]["render"]["jobs"] == 4
+
+
+def test_lookahead_bounds_jobs_in_flight():
+    active = []
+    peak = []
+    lock = threading.Lock()
+
+    def slow(job):
+        with lock:
+            active.append(job)
+            peak.append(len(active))
+        time.sleep(0.02)
+        with lock:
+            active.remove(job)
+        return job
+
+    pipeline = StagePipeline(
+        [("prepare", slow, 4), ("render", slow, 4)], lookahead=1
+    )
+    pipeline.run(jobs(6))
+
+    assert max(peak) <= 2
+
+
+def test_failed_jobs_stop_and_are_reported():
+    errors = []
+    rendered = []
+
+    def prepare(job):
+        if job == 1:
+            raise RuntimeError("no topic")
+        return job
+
+    pipeline = StagePipeline(
+        [("prepare", prepare, 1), ("render", lambda job: rendered.append(job) or job, 1)],
+        on_error=lambda job, stage, error: errors.append((job, stage, str(error))),
+        failure_backoff=0,
+    )
+    report = pipeline.run(jobs(3))
+
+    assert errors == [(1, "prepare", "no topic")]
+    assert sorted(rendered) == [0, 2]
+    assert report["completed"] == 2
+    assert report["stages"]["prepare"]["failed"] == 1
+
+
+def test_a_stage_returning_none_drops_the_job():
+    rendered = []
+    pipeline = StagePipeline(
+        [("prepare", lambda job: None, 1), ("render", rendered.append, 1)]
+    )
+    report = pipeline.run(jobs(2))
+    assert report["admitted"] == 2
+    assert rendered == []
+    assert report["completed"] == 0
+
+
+def test_failures_back_off_admission():
+    def fail(job):
+        raise RuntimeError("outage")
+
+    pipeline = StagePipeline(
+        [("prepare", fail, 1)], lookahead=0, failure_backoff=0.2, max_backoff=0.3
+    )
+    started = time.time()
+    report = pipeline.run(jobs(3))
+
+    # 0.2s after the first failure, then 0.3s (capped) after the second.
+    assert time.time() - started >= 0.45
+    assert report["failure_streak"] == 3
+
+
+def test_should_stop_and_max_jobs_end_admission():
+    pipeline = StagePipeline([("prepare", lambda job: job, 1)])
+    assert pipeline.run(jobs(10), max_jobs=3)["admitted"] == 3
+
+    pipeline = StagePipeline([("prepare", lambda job: job, 1)])
+    assert pipeline.run(jobs(10), should_stop=lambda: True)["admitted"] == 0
@@ -0,0 +1,289 @@
+"""
+Process-wide registry of long-lived AI provider clients.
+
+Every client is built once per (provider, credential, endpoint) and reused by
+all threads, so requests share keep-alive HTTP connection pools instead of
+paying for a fresh TLS handshake on every call.
+"""
+
+import hashlib
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+try:
+    import httpx
+
+    HTTPX_AVAILABLE = True
+except ImportError:
+    httpx = None
+    HTTPX_AVAILABLE = False
+
+try:
+    import openai
+
+    OPENAI_AVAILABLE = True
+except ImportError:
+    openai = None
+    OPENAI_AVAILABLE = False
+
+try:
+    from azure.ai.inference import ChatCompletionsClient
+    from azure.core.credentials import AzureKeyCredential
+
+    AZURE_AI_AVAILABLE = True
+except ImportError:
+    ChatCompletionsClient = None
+    AzureKeyCredential = None
+    AZURE_AI_AVAILABLE = False
+
+try:
+    from elevenlabs.client import ElevenLabs
+
+    ELEVENLABS_AVAILABLE = True
+except ImportError:
+    ElevenLabs = None
+    ELEVENLABS_AVAILABLE = False
+
+
+AZURE_ENDPOINT = "https://models.github.ai/inference"
+
+POOL_MAX_CONNECTIONS = int(os.getenv("AI_POOL_MAX_CONNECTIONS", "20"))
+POOL_MAX_KEEPALIVE = int(os.getenv("AI_POOL_MAX_KEEPALIVE", "10"))
+POOL_KEEPALIVE_EXPIRY = float(os.getenv("AI_POOL_KEEPALIVE_EXPIRY", "90"))
+POOL_TIMEOUT = float(os.getenv("AI_POOL_TIMEOUT", "120"))
+
+# Every call goes through the rate limiter, which retries 429s itself and
+# backs the provider off; SDK-level retries would hide those 429s from it.
+ELEVENLABS_REQUEST_OPTIONS = {"max_retries": 0}
+
+
+def _fingerprint(credential: Optional[str]) -> str:
+    """Hash a credential so it can be used as a key without being stored"""
+    if not credential:
+        return "anonymous"
+    return hashlib.sha256(credential.encode("utf-8")).hexdigest()[:16]
+
+
+class _PooledClient:
+    """A cached client plus the bookkeeping behind its pool stats"""
+
+    def __init__(self, client: Any, http_client: Any = None):
+        self.client = client
+        self.http_client = http_client
+        self.created_at = time.time()
+        self.last_used = self.created_at
+        self.checkouts = 0
+        self.requests_sent = 0
+        self._lock = threading.Lock()
+
+    def on_request(self, _request: Any) -> None:
+        with self._lock:
+            self.requests_sent += 1
+
+    def pool_connections(self) -> Dict[str, int]:
+        """Inspect the underlying httpx/httpcore pool (best effort)"""
+        transport = getattr(self.http_client, "_transport", None)
+        pool = getattr(transport, "_pool", None)
+        connections = list(getattr(pool, "connections", []) or [])
+        idle = 0
+        for conn in connections:
+            try:
+                idle += 1 if conn.is_idle() else 0
+            except Exception:
+                pass
+        return {"open": len(connections), "idle": idle}
+
+    def close(self) -> None:
+        for target in (self.client, self.http_client):
+            close = getattr(target, "close", None)
+            if callable(close):
+                try:
+                    close()
+                except Exception:
+                    pass
+
+
+def _build_http_client(entry_hook: Callable[[Any], None]) -> Any:
+    """Build a keep-alive httpx client with the configured pool limits"""
+    if not HTTPX_AVAILABLE:
+        return None
+    limits = httpx.Limits(
+        max_connections=POOL_MAX_CONNECTIONS,
+        max_keepalive_connections=POOL_MAX_KEEPALIVE,
+        keepalive_expiry=POOL_KEEPALIVE_EXPIRY,
+    )
+    return httpx.Client(
+        limits=limits,
+        timeout=POOL_TIMEOUT,
+        event_hooks={"request": [entry_hook]},
+    )
+
+
+class ClientRegistry:
+    """Thread-safe cache of provider clients keyed by provider and credentials"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries: Dict[Tuple[str, str, str], _PooledClient] = {}
+        self._builds = 0
+        self._hits = 0
+
+    def get(
+        self,
+        provider: str,
+        credential: Optional[str] = None,
+        endpoint: Optional[str] = None,
+    ) -> Any:
+        """Return the shared client for a provider, building it on first use"""
+        key = (provider, _fingerprint(credential), endpoint or "")
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._evict_stale(provider, key)
+                entry = self._build(provider, credential, endpoint)
+                self._entries[key] = entry
+                self._builds += 1
+            else:
+                self._hits += 1
+            entry.checkouts += 1
+            entry.last_used = time.time()
+            return entry.client
+
+    def _evict_stale(self, provider: str, keep: Tuple[str, str, str]) -> None:
+        """Forget clients for a provider whose credentials have been rotated
+
+        They are not closed: other threads may still be mid-request on them.
+        Once the last caller drops its reference the client (and its
+        connection pool) is garbage collected.
+        """
+        for key in [k for k in self._entries if k[0] == provider and k != keep]:
+            del self._entries[key]
+
+    def _build(
+        self, provider: str, credential: Optional[str], endpoint: Optional[str]
+    ) -> _PooledClient:
+        if provider == "openai":
+            if not OPENAI_AVAILABLE:
+                raise RuntimeError("openai package is not installed")
+            entry = _PooledClient(None)
+            entry.http_client = _build_http_client(entry.on_request)
+            kwargs = {"api_key": credential, "max_retries": 0}
+            if endpoint:
+                kwargs["base_url"] = endpoint
+            if entry.http_client is not None:
+                kwargs["http_client"] = entry.http_client
+            entry.client = openai.OpenAI(**kwargs)
+            return entry
+
+        if provider == "azure":
+            if not AZURE_AI_AVAILABLE:
+                raise RuntimeError("azure-ai-inference package is not installed")
+            client = ChatCompletionsClient(
+                endpoint=endpoint or AZURE_ENDPOINT,
+                credential=AzureKeyCredential(credential or ""),
+                retry_total=0,
+            )
+            return _PooledClient(client)
+
+        if provider == "elevenlabs":
+            if not ELEVENLABS_AVAILABLE:
+                raise RuntimeError("elevenlabs package is not installed")
+            entry = _PooledClient(None)
+            entry.http_client = _build_http_client(entry.on_request)
+            kwargs = {"api_key": credential}
+            if entry.http_client is not None:
+                kwargs["httpx_client"] = entry.http_client
+            entry.client = ElevenLabs(**kwargs)
+            return entry
+
+        raise ValueError(f"Unknown AI provider: {provider}")
+
+    def invalidate(self, provider: Optional[str] = None) -> int:
+        """Drop cached clients so they are rebuilt lazily on next use
+
+        Dropped clients are left to the garbage collector rather than closed,
+        since requests already in flight may still be using them.
+        """
+        with self._lock:
+            keys = [k for k in self._entries if provider is None or k[0] == provider]
+            for key in keys:
+                del self._entries[key]
+            return len(keys)
+
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of client reuse and connection pool usage"""
+        with self._lock:
+            clients = []
+            for (provider, fingerprint, endpoint), entry in self._entries.items():
+                clients.append(
+                    {
+                        "provider": provider,
+                        "credential": fingerprint,
+                        "endpoint": endpoint or None,
+                        "age_seconds": round(time.time() - entry.created_at, 1),
+                        "checkouts": entry.checkouts,
+                        "requests_sent": entry.requests_sent,
+                        "connections": entry.pool_connections(),
+                    }
+                )
+            return {
+                "builds": self._builds,
+                "reuses": self._hits,
+                "pool_limits": {
+                    "max_connections": POOL_MAX_CONNECTIONS,
+                    "max_keepalive": POOL_MAX_KEEPALIVE,
+                    "keepalive_expiry": POOL_KEEPALIVE_EXPIRY,
+                },
+                "clients": clients,
+            }
+
+
+_registry = ClientRegistry()
+
+
+def get_openai_client(
+    api_key: Optional[str] = None, base_url: Optional[str] = None
+) -> Any:
+    """Shared OpenAI client for the given key (defaults to OPENAI_API_KEY)"""
+    return _registry.get(
+        "openai",
+        api_key or os.getenv("OPENAI_API_KEY"),
+        base_url or os.getenv("OPENAI_BASE_URL"),
+    )
+
+
+def get_azure_client(
+    token: Optional[str] = None, endpoint: Optional[str] = None
+) -> Any:
+    """Shared Azure inference client for GitHub Models (defaults to GITHUB_TOKEN)"""
+    return _registry.get(
+        "azure", token or os.getenv("GITHUB_TOKEN"), endpoint or AZURE_ENDPOINT
+    )
+
+
+def get_elevenlabs_client(api_key: Optional[str] = None) -> Any:
+    """Shared ElevenLabs client for the given key (defaults to ELEVENLABS_API_KEY)"""
+    return _registry.get("elevenlabs", api_key or os.getenv("ELEVENLABS_API_KEY"))
+
+
+def provider_available(provider: str) -> bool:
+    """True if the SDK for ``provider`` is installed and credentials are set"""
+    if provider == "openai":
+        return OPENAI_AVAILABLE and bool(os.getenv("OPENAI_API_KEY"))
+    if provider == "azure":
+        return AZURE_AI_AVAILABLE and bool(os.getenv("GITHUB_TOKEN"))
+    if provider == "elevenlabs":
+        return ELEVENLABS_AVAILABLE and bool(os.getenv("ELEVENLABS_API_KEY"))
+    return False
+
+
+def invalidate_clients(provider: Optional[str] = None) -> int:
+    """Drop cached clients for one provider (or all of them)"""
+    return _registry.invalidate(provider)
+
+
+def get_pool_stats() -> Dict[str, Any]:
+    """Client reuse and connection pool stats for monitoring endpoints"""
+    return _registry.stats()
@@ -0,0 +1,351 @@
+"""
+Content-addressed on-disk cache for generated media assets.
+
+Images and voiceovers are stored under a hash of everything that determines
+them (provider, model, voice, prompt or text, dimensions), so a repeated
+intro line or call to action is produced once. Blobs live in ASSET_CACHE_DIR
+with a SQLite index recording size and SHA-256; hits are verified before use
+and the cache is kept under ASSET_CACHE_MAX_BYTES by LRU eviction. Hits are
+hard-linked (or reflinked, or as a last resort copied) into the job
+workspace, and cached blobs are read-only so a link cannot be edited in place.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import sqlite3
+import stat
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from utils.platform_utils import remove_file
+
+ASSET_CACHE_DIR = os.getenv("ASSET_CACHE_DIR", "asset_cache")
+ASSET_CACHE_MAX_BYTES = int(float(os.getenv("ASSET_CACHE_MAX_MB", "2048")) * 2**20)
+ASSET_CACHE_ENABLED = os.getenv("ASSET_CACHE_ENABLED", "true").lower() not in (
+    "0",
+    "false",
+    "no",
+)
+ASSET_CACHE_VERIFY = os.getenv("ASSET_CACHE_VERIFY", "true").lower() == "true"
+
+# Linux FICLONE ioctl: share extents copy-on-write (btrfs, xfs, ...).
+_FICLONE = 0x40049409
+
+
+def make_asset_key(
+    provider: str,
+    model: str,
+    voice: Optional[str],
+    content: str,
+    dimensions: Optional[str] = None,
+) -> str:
+    """Hash the inputs that determine a generated asset into a stable key"""
+    payload = json.dumps(
+        [provider, model, voice or "", content, dimensions or ""], ensure_ascii=False
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _sha256_file(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _reflink(src: str, dest: str) -> bool:
+    try:
+        import fcntl
+    except ImportError:
+        return False
+    try:
+        with open(src, "rb") as s, open(dest, "wb") as d:
+            fcntl.ioctl(d.fileno(), _FICLONE, s.fileno())
+        return True
+    except OSError:
+        if os.path.exists(dest):
+            remove_file(dest)
+        return False
+
+
+def link_or_copy(src: str, dest: str) -> str:
+    """Place ``src`` at ``dest`` without copying data where the FS allows
+
+    Returns the method used: "hardlink", "reflink" or "copy".
+    """
+    if os.path.exists(dest):
+        # May be a read-only link to a blob from an earlier fetch.
+        remove_file(dest)
+    try:
+        os.link(src, dest)
+        return "hardlink"
+    except OSError:
+        pass
+    if _reflink(src, dest):
+        return "reflink"
+    shutil.copyfile(src, dest)
+    return "copy"
+
+
+class AssetCache:
+    """Size-bounded LRU cache of generated files with integrity checks"""
+
+    def __init__(
+        self,
+        cache_dir: str = ASSET_CACHE_DIR,
+        max_bytes: int = ASSET_CACHE_MAX_BYTES,
+        enabled: bool = ASSET_CACHE_ENABLED,
+        verify: bool = ASSET_CACHE_VERIFY,
+    ):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        self.verify = verify
+        self._lock = threading.Lock()
+        self._initialized = False
+        self._counters: Dict[str, Dict[str, int]] = {}
+
+    def _connect(self) -> sqlite3.Connection:
+        if not self._initialized:
+            os.makedirs(self.cache_dir, exist_ok=True)
+        conn = sqlite3.connect(os.path.join(self.cache_dir, "index.db"), timeout=30)
+        if not self._initialized:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS assets (
+                    key TEXT PRIMARY KEY,
+                    kind TEXT,
+                    path TEXT,
+                    size INTEGER,
+                    sha256 TEXT,
+                    created_at REAL,
+                    last_access REAL,
+                    hits INTEGER DEFAULT 0
+                )
+            """
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_assets_access ON assets (last_access)"
+            )
+            conn.commit()
+            self._initialized = True
+        return conn
+
+    def _count(self, kind: str, field: str, amount: int = 1) -> None:
+        counters = self._counters.setdefault(
+            kind,
+            {
+                "hits": 0,
+                "misses": 0,
+                "stored": 0,
+                "corrupt": 0,
+                "evictions": 0,
+                "bytes_saved": 0,
+            },
+        )
+        counters[field] += amount
+
+    def _blob_path(self, key: str, ext: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], key + ext)
+
+    def _drop(self, conn: sqlite3.Connection, key: str, path: str) -> None:
+        conn.execute("DELETE FROM assets WHERE key = ?", (key,))
+        try:
+            remove_file(path)
+        except OSError:
+            pass
+
+    def _lookup(self, key: str, kind: str) -> Optional[Tuple[str, int]]:
+        """Verified (path, size) of a cached blob, or None on a miss"""
+        with self._lock:
+            conn = self._connect()
+            try:
+                row = conn.execute(
+                    "SELECT path, size, sha256 FROM assets WHERE key = ?", (key,)
+                ).fetchone()
+                if row is None:
+                    self._count(kind, "misses")
+                    return None
+                path, size, digest = row
+                intact = os.path.isfile(path) and os.path.getsize(path) == size
+                if intact and self.verify:
+                    intact = _sha256_file(path) == digest
+                if not intact:
+                    print(f"⚠️ Asset cache entry {key[:12]} failed its integrity check")
+                    self._drop(conn, key, path)
+                    conn.commit()
+                    self._count(kind, "corrupt")
+                    self._count(kind, "misses")
+                    return None
+                conn.execute(
+                    "UPDATE assets SET last_access = ?, hits = hits + 1 WHERE key = ?",
+                    (time.time(), key),
+                )
+                conn.commit()
+            finally:
+                conn.close()
+        self._count(kind, "hits")
+        self._count(kind, "bytes_saved", size)
+        return path, size
+
+    def fetch(self, key: str, dest: str, kind: str = "asset") -> Optional[str]:
+        """Link a cached asset to ``dest``; returns ``dest`` or None on a miss"""
+        if not self.enabled:
+            return None
+        found = self._lookup(key, kind)
+        if found is None:
+            return None
+        link_or_copy(found[0], dest)
+        return dest
+
+    def read(self, key: str, kind: str = "asset") -> Optional[bytes]:
+        """Contents of a cached asset, or None on a miss"""
+        if not self.enabled:
+            return None
+        found = self._lookup(key, kind)
+        if found is None:
+            return None
+        with open(found[0], "rb") as f:
+            return f.read()
+
+    def store(self, key: str, src: str, kind: str = "asset") -> None:
+        """Add a freshly generated file to the cache (best effort)"""
+        if not self.enabled or not os.path.isfile(src):
+            return
+        ext = os.path.splitext(src)[1]
+        self._store(key, ext, kind, lambda staging: shutil.copyfile(src, staging))
+
+    def store_bytes(self, key: str, data: bytes, ext: str, kind: str = "asset") -> None:
+        """Add generated bytes to the cache (best effort)"""
+        if not self.enabled or not data:
+            return
+
+        def write(staging: str) -> None:
+            with open(staging, "wb") as f:
+                f.write(data)
+
+        self._store(key, ext, kind, write)
+
+    def _store(
+        self, key: str, ext: str, kind: str, write: Callable[[str], None]
+    ) -> None:
+        path = self._blob_path(key, ext)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            staging = f"{path}.{uuid.uuid4().hex[:8]}.part"
+            write(staging)
+            os.chmod(staging, stat.S_IRUSR | stat.S_IRGRP | stat.S_IROTH)
+            digest = _sha256_file(staging)
+            size = os.path.getsize(staging)
+            os.replace(staging, path)
+        except OSError as e:
+            print(f"⚠️ Could not cache {kind} {key[:12]}: {e}")
+            return
+
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            try:
+                conn.execute(
+                    "INSERT OR REPLACE INTO assets (key, kind, path, size, sha256, "
+                    "created_at, last_access, hits) VALUES (?, ?, ?, ?, ?, ?, ?, 0)",
+                    (key, kind, path, size, digest, now, now),
+                )
+                self._count(kind, "stored")
+                self._evict(conn)
+                conn.commit()
+            finally:
+                conn.close()
+
+    def _evict(self, conn: sqlite3.Connection) -> None:
+        """Drop least recently used blobs until the cache fits its budget"""
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM assets").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        rows = conn.execute(
+            "SELECT key, kind, path, size FROM assets ORDER BY last_access"
+        ).fetchall()
+        for key, kind, path, size in rows:
+            if total <= self.max_bytes:
+                break
+            self._drop(conn, key, path)
+            self._count(kind, "evictions")
+            total -= size
+
+    def entries(self) -> List[Tuple[str, int, float]]:
+        """(key, size, last_access) of every blob, least recently used first"""
+        if not self.enabled:
+            return []
+        with self._lock:
+            conn = self._connect()
+            try:
+                return conn.execute(
+                    "SELECT key, size, last_access FROM assets ORDER BY last_access"
+                ).fetchall()
+            finally:
+                conn.close()
+
+    def evict(self, key: str) -> int:
+        """Drop one blob (for the storage governor); returns the bytes freed"""
+        with self._lock:
+            conn = self._connect()
+            try:
+                row = conn.execute(
+                    "SELECT kind, path, size FROM assets WHERE key = ?", (key,)
+                ).fetchone()
+                if row is None:
+                    return 0
+                kind, path, size = row
+                self._drop(conn, key, path)
+                conn.commit()
+            finally:
+                conn.close()
+            self._count(kind, "evictions")
+        return size
+
+    def clear(self) -> None:
+        with self._lock:
+            conn = self._connect()
+            try:
+                for key, path in conn.execute("SELECT key, path FROM assets").fetchall():
+                    self._drop(conn, key, path)
+                conn.commit()
+            finally:
+                conn.close()
+
+    def stats(self) -> Dict[str, Any]:
+        """Per-kind hit/miss counters plus current cache size"""
+        entries, size = 0, 0
+        if self.enabled:
+            with self._lock:
+                conn = self._connect()
+                try:
+                    entries, size = conn.execute(
+                        "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM assets"
+                    ).fetchone()
+                finally:
+                    conn.close()
+        return {
+            "enabled": self.enabled,
+            "entries": entries,
+            "size_mb": round(size / 2**20, 1),
+            "max_mb": round(self.max_bytes / 2**20, 1),
+            "kinds": {kind: dict(c) for kind, c in self._counters.items()},
+        }
+
+
+_asset_cache = AssetCache()
+
+
+def get_asset_cache() -> AssetCache:
+    """Process-wide asset cache"""
+    return _asset_cache
+
+
+def get_asset_cache_stats() -> Dict[str, Any]:
+    return _asset_cache.stats()
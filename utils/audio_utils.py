@@ -0,0 +1,303 @@
+"""
+Pure-Python audio helpers for the renderers.
+
+Writes silent WAV audio directly, and reads exact durations from WAV, MP3
+(Xing/Info/VBRI headers or a frame walk), ADTS AAC and MP4/M4A headers, so
+that neither a silent scene nor a duration lookup needs an ffmpeg/ffprobe
+process. Sources can be file paths or in-memory bytes. MP3 audio can also be
+split at frame boundaries, e.g. to cut one batched TTS response into scenes.
+"""
+
+import io
+import mmap
+import os
+import struct
+import wave
+from typing import List, Optional, Sequence, Union
+
+# Matches ElevenLabs' MP3s, so segments of voiced and silent scenes share
+# one audio format and can be concatenated by stream copy.
+SILENCE_SAMPLE_RATE = 44100
+SILENCE_CHANNELS = 2
+
+AudioSource = Union[str, bytes, bytearray, memoryview]
+
+# MPEG audio version bits -> (name, sample rates)
+_MPEG_SAMPLE_RATES = {
+    3: (1, (44100, 48000, 32000)),  # MPEG-1
+    2: (2, (22050, 24000, 16000)),  # MPEG-2
+    0: (2.5, (11025, 12000, 8000)),  # MPEG-2.5
+}
+# kbps by (MPEG-1?, layer)
+_MPEG_BITRATES = {
+    (True, 1): (0, 32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448),
+    (True, 2): (0, 32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384),
+    (True, 3): (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320),
+    (False, 1): (0, 32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256),
+    (False, 2): (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+    (False, 3): (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+}
+_AAC_SAMPLE_RATES = (
+    96000, 88200, 64000, 48000, 44100, 32000, 24000, 22050, 16000, 12000, 11025, 8000, 7350,
+)
+
+
+class AudioFormatError(ValueError):
+    """Raised when a source is not a WAV/MP3/AAC/MP4 file we can parse"""
+
+
+def silent_wav(
+    duration: float,
+    sample_rate: int = SILENCE_SAMPLE_RATE,
+    channels: int = SILENCE_CHANNELS,
+) -> bytes:
+    """``duration`` seconds of 16-bit PCM silence as a WAV file"""
+    frames = int(round(duration * sample_rate))
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(channels)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(bytes(frames * channels * 2))
+    return buffer.getvalue()
+
+
+def write_silent_wav(
+    path: str, duration: float, sample_rate: int = SILENCE_SAMPLE_RATE
+) -> str:
+    with open(path, "wb") as f:
+        f.write(silent_wav(duration, sample_rate))
+    return path
+
+
+def _wav_duration(data) -> float:
+    pos = 12
+    byte_rate = None
+    while pos + 8 <= len(data):
+        chunk_id = bytes(data[pos : pos + 4])
+        (size,) = struct.unpack_from("<I", data, pos + 4)
+        body = pos + 8
+        if chunk_id == b"fmt ":
+            (byte_rate,) = struct.unpack_from("<I", data, body + 8)
+        elif chunk_id == b"data":
+            if not byte_rate:
+                break
+            # Streamed WAVs leave the size at 0/0xFFFFFFFF: use what is there.
+            available = len(data) - body
+            if size in (0, 0xFFFFFFFF) or size > available:
+                size = available
+            return size / byte_rate
+        pos = body + size + (size & 1)
+    raise AudioFormatError("WAV file has no fmt/data chunks")
+
+
+def _id3_end(data) -> int:
+    """Offset just past a leading ID3v2 tag (0 if there is none)"""
+    if bytes(data[:3]) != b"ID3" or len(data) < 10:
+        return 0
+    size = 0
+    for byte in data[6:10]:
+        size = (size << 7) | (byte & 0x7F)
+    footer = 10 if data[5] & 0x10 else 0
+    return 10 + size + footer
+
+
+def _mp3_header(data, pos):
+    """(frame length, samples per frame, sample rate, header) or None"""
+    if pos + 4 > len(data):
+        return None
+    (header,) = struct.unpack_from(">I", data, pos)
+    if header >> 21 != 0x7FF:
+        return None
+    version_bits = (header >> 19) & 3
+    layer = 4 - ((header >> 17) & 3)
+    bitrate_index = (header >> 12) & 0xF
+    rate_index = (header >> 10) & 3
+    if version_bits == 1 or layer == 4 or bitrate_index in (0, 15) or rate_index == 3:
+        return None
+    version, rates = _MPEG_SAMPLE_RATES[version_bits]
+    mpeg1 = version == 1
+    bitrate = _MPEG_BITRATES[(mpeg1, layer)][bitrate_index] * 1000
+    sample_rate = rates[rate_index]
+    padding = (header >> 9) & 1
+    if layer == 1:
+        return (12 * bitrate // sample_rate + padding) * 4, 384, sample_rate, header
+    samples = 1152 if (layer == 2 or mpeg1) else 576
+    length = (samples // 8) * bitrate // sample_rate + padding
+    return length, samples, sample_rate, header
+
+
+def _first_frame(data, start: int):
+    """(offset, frame) of the first MPEG audio frame at or after ``start``"""
+    pos = start
+    # Tolerate a little junk between the tag and the first frame.
+    while pos < min(len(data), start + 4096):
+        frame = _mp3_header(data, pos)
+        if frame and (
+            _mp3_header(data, pos + frame[0]) is not None
+            or pos + frame[0] == len(data)
+        ):
+            return pos, frame
+        pos += 1
+    raise AudioFormatError("No MPEG audio frame found")
+
+
+def _info_frames(data, pos: int, frame) -> Optional[int]:
+    """Frame count from a Xing/Info/VBRI header frame, if ``pos`` is one"""
+    header = frame[3]
+    mpeg1 = (header >> 19) & 3 == 3
+    mono = (header >> 6) & 3 == 3
+    side_info = (17 if mono else 32) if mpeg1 else (9 if mono else 17)
+    xing = pos + 4 + side_info
+    if bytes(data[xing : xing + 4]) in (b"Xing", b"Info"):
+        (flags,) = struct.unpack_from(">I", data, xing + 4)
+        if flags & 1:
+            return struct.unpack_from(">I", data, xing + 8)[0]
+        return 0
+    if bytes(data[pos + 36 : pos + 40]) == b"VBRI":
+        return struct.unpack_from(">I", data, pos + 50)[0]
+    return None
+
+
+def _mp3_frames(data, start: int):
+    """Yield (offset, length, samples, sample rate) of every audio frame"""
+    pos, frame = _first_frame(data, start)
+    if _info_frames(data, pos, frame) is not None:
+        pos += frame[0]
+    while True:
+        frame = _mp3_header(data, pos)
+        if frame is None:
+            return
+        yield pos, frame[0], frame[1], frame[2]
+        pos += frame[0]
+
+
+def _mp3_duration(data, start: int) -> float:
+    pos, frame = _first_frame(data, start)
+    frames = _info_frames(data, pos, frame)
+    if frames:
+        return frames * frame[1] / frame[2]
+    total = 0
+    sample_rate = frame[2]
+    for _, _, samples, sample_rate in _mp3_frames(data, start):
+        total += samples
+    return total / sample_rate
+
+
+def split_mp3(data: bytes, cut_times: Sequence[float]) -> List[bytes]:
+    """Cut MP3 audio at the frame boundaries nearest ``cut_times`` (seconds)
+
+    Returns ``len(cut_times) + 1`` pieces, each a playable MP3 stream. Any
+    ID3 tag and Xing/Info header are dropped, since the header's frame
+    count would describe the whole file rather than the piece.
+    """
+    view = memoryview(data)
+    cuts = list(cut_times)
+    pieces: List[bytes] = []
+    piece_start = None
+    elapsed = 0.0
+    for pos, length, samples, sample_rate in _mp3_frames(view, _id3_end(view)):
+        if piece_start is None:
+            piece_start = pos
+        # Cut before this frame if its midpoint lies past the cut point.
+        while cuts and elapsed + samples / sample_rate / 2 > cuts[0]:
+            pieces.append(bytes(view[piece_start:pos]))
+            piece_start = pos
+            cuts.pop(0)
+        elapsed += samples / sample_rate
+        end = pos + length
+    if piece_start is None:
+        raise AudioFormatError("No MPEG audio frames to split")
+    pieces.append(bytes(view[piece_start:end]))
+    pieces += [b""] * len(cuts)
+    return pieces
+
+
+def _adts_duration(data) -> float:
+    pos = 0
+    total = 0
+    sample_rate = None
+    while pos + 7 <= len(data):
+        if data[pos] != 0xFF or data[pos + 1] & 0xF6 != 0xF0:
+            break
+        rate_index = (data[pos + 2] >> 2) & 0xF
+        if rate_index >= len(_AAC_SAMPLE_RATES):
+            break
+        sample_rate = _AAC_SAMPLE_RATES[rate_index]
+        length = (
+            ((data[pos + 3] & 3) << 11) | (data[pos + 4] << 3) | (data[pos + 5] >> 5)
+        )
+        if length < 7:
+            break
+        total += 1024 * ((data[pos + 6] & 3) + 1)
+        pos += length
+    if not sample_rate:
+        raise AudioFormatError("No ADTS frame found")
+    return total / sample_rate
+
+
+def _mp4_duration(data) -> float:
+    def boxes(start, end):
+        pos = start
+        while pos + 8 <= end:
+            size, kind = struct.unpack_from(">I4s", data, pos)
+            header = 8
+            if size == 1:
+                (size,) = struct.unpack_from(">Q", data, pos + 8)
+                header = 16
+            elif size == 0:
+                size = end - pos
+            if size < header:
+                return
+            yield kind, pos + header, pos + size
+            pos += size
+
+    for kind, body, end in boxes(0, len(data)):
+        if kind != b"moov":
+            continue
+        for child, child_body, _ in boxes(body, end):
+            if child != b"mvhd":
+                continue
+            if data[child_body] == 1:
+                timescale, duration = struct.unpack_from(">IQ", data, child_body + 20)
+            else:
+                timescale, duration = struct.unpack_from(">II", data, child_body + 12)
+            if timescale:
+                return duration / timescale
+    raise AudioFormatError("MP4 file has no moov/mvhd box")
+
+
+def parse_duration(data) -> float:
+    """Duration of WAV/MP3/ADTS/MP4 audio held in a bytes-like object"""
+    head = bytes(data[:12])
+    if head[:4] == b"RIFF" and head[8:12] == b"WAVE":
+        return _wav_duration(data)
+    if head[4:8] == b"ftyp":
+        return _mp4_duration(data)
+    if len(head) >= 2 and head[0] == 0xFF and head[1] & 0xF6 == 0xF0:
+        return _adts_duration(data)
+    return _mp3_duration(data, _id3_end(data))
+
+
+def audio_duration(source: AudioSource, fallback: bool = True) -> float:
+    """Exact duration in seconds of a file path or in-memory audio
+
+    Headers are parsed in-process; only formats we cannot parse fall back to
+    decoding with ffmpeg (disable with ``fallback=False``).
+    """
+    try:
+        if isinstance(source, str):
+            if os.path.getsize(source) == 0:
+                raise AudioFormatError(f"{source} is empty")
+            with open(source, "rb") as f:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                    return parse_duration(data)
+        return parse_duration(memoryview(source))
+    except (AudioFormatError, struct.error, IndexError) as e:
+        if not fallback:
+            raise AudioFormatError(str(e)) from e
+        from utils.ffmpeg_pool import probe_duration, probe_duration_bytes
+
+        if isinstance(source, str):
+            return probe_duration(source)
+        return probe_duration_bytes(bytes(source))
@@ -0,0 +1,228 @@
+"""
+Parallel ffmpeg segment encoding.
+
+Segment encodes are independent, so they run as concurrent ffmpeg processes
+(bounded by CPU count) instead of one after another. The cores are split
+between the number of concurrent encodes and each encode's ``-threads``
+setting, so N processes do not each spawn a thread per core. Progress is read
+from ``-progress pipe:1`` and handed to a callback as it arrives.
+
+Also home to the small ffmpeg/ffprobe helpers shared by the renderers.
+"""
+
+import os
+import re
+import subprocess
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from utils.platform_utils import get_ffmpeg_command, normalize_path
+
+FFMPEG_WORKERS = int(os.getenv("FFMPEG_WORKERS", "0"))  # 0 = CPU count
+FFMPEG_PROGRESS = os.getenv("FFMPEG_PROGRESS", "true").lower() == "true"
+PROGRESS_INTERVAL = float(os.getenv("FFMPEG_PROGRESS_INTERVAL", "2"))
+
+# (ffmpeg arguments without the binary or output path, output path)
+EncodeJob = Tuple[List[str], str]
+ProgressCallback = Callable[[Dict[str, object]], None]
+
+
+def plan_threads(jobs: int, cpus: Optional[int] = None) -> Tuple[int, int]:
+    """Split the cores into (concurrent encodes, threads per encode)"""
+    cpus = cpus or os.cpu_count() or 1
+    limit = FFMPEG_WORKERS or cpus
+    workers = max(1, min(jobs, limit, cpus))
+    return workers, max(1, cpus // workers)
+
+
+def print_progress(event: Dict[str, object]) -> None:
+    """Default progress callback: one line per update, plus completion"""
+    label = f"Segment {event['index'] + 1}"
+    if event["done"]:
+        print(f"✅ {label} encoded in {event['elapsed']:.1f}s")
+    else:
+        speed = event.get("speed") or "?"
+        print(f"⏳ {label}: {event['out_time']:.1f}s encoded ({speed})")
+
+
+class SegmentEncoder:
+    """Runs ffmpeg segment encodes on a bounded pool of subprocesses"""
+
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        progress: Optional[ProgressCallback] = None,
+    ):
+        self.workers = workers
+        if progress is None and FFMPEG_PROGRESS:
+            progress = print_progress
+        self.progress = progress
+        self._lock = threading.Lock()
+
+    def _emit(self, event: Dict[str, object]) -> None:
+        if self.progress is None:
+            return
+        with self._lock:
+            self.progress(event)
+
+    def _encode(self, index: int, job: EncodeJob, threads: int) -> str:
+        args, output_path = job
+        cmd = [get_ffmpeg_command(), "-y", "-nostats", "-progress", "pipe:1"]
+        cmd += args + ["-threads", str(threads), output_path]
+        started = time.time()
+        last_report = 0.0
+        stats: Dict[str, str] = {}
+        # stderr goes to a file so a chatty encode can never block on a full
+        # pipe while we are reading progress from stdout.
+        with tempfile.TemporaryFile() as stderr:
+            process = subprocess.Popen(
+                cmd, stdout=subprocess.PIPE, stderr=stderr, text=True
+            )
+            for line in process.stdout:
+                key, _, value = line.strip().partition("=")
+                stats[key] = value
+                if key != "progress":
+                    continue
+                now = time.time()
+                if value == "continue" and now - last_report >= PROGRESS_INTERVAL:
+                    last_report = now
+                    self._emit(
+                        {
+                            "index": index,
+                            "output": output_path,
+                            "out_time": _out_time(stats),
+                            "speed": stats.get("speed"),
+                            "done": False,
+                            "elapsed": now - started,
+                        }
+                    )
+            returncode = process.wait()
+            if returncode != 0:
+                stderr.seek(0)
+                tail = stderr.read().decode("utf-8", "replace")[-2000:]
+                raise subprocess.CalledProcessError(returncode, cmd, stderr=tail)
+        self._emit(
+            {
+                "index": index,
+                "output": output_path,
+                "out_time": _out_time(stats),
+                "speed": stats.get("speed"),
+                "done": True,
+                "elapsed": time.time() - started,
+            }
+        )
+        return output_path
+
+    def encode_all(self, jobs: Sequence[EncodeJob]) -> List[str]:
+        """Encode every job concurrently; returns output paths in job order
+
+        The call returns the moment the last encode exits, so the concat pass
+        can start straight away. The first failure cancels encodes that have
+        not started yet and is re-raised.
+        """
+        if not jobs:
+            return []
+        workers, threads = plan_threads(len(jobs))
+        if self.workers:
+            workers = max(1, min(self.workers, len(jobs)))
+            threads = max(1, (os.cpu_count() or 1) // workers)
+        print(
+            f"🎞️ Encoding {len(jobs)} segments: {workers} at a time, "
+            f"{threads} threads each"
+        )
+
+        outputs: List[Optional[str]] = [None] * len(jobs)
+        pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ffmpeg")
+        with pool:
+            futures = {
+                pool.submit(self._encode, i, job, threads): i
+                for i, job in enumerate(jobs)
+            }
+            try:
+                for future in as_completed(futures):
+                    outputs[futures[future]] = future.result()
+            except BaseException:
+                for future in futures:
+                    future.cancel()
+                raise
+        return outputs
+
+
+def _out_time(stats: Dict[str, str]) -> float:
+    """Encoded media time in seconds from ffmpeg's progress keys"""
+    for key in ("out_time_us", "out_time_ms"):
+        try:
+            # Both keys are reported in microseconds by ffmpeg.
+            return int(stats[key]) / 1_000_000
+        except (KeyError, ValueError):
+            continue
+    return 0.0
+
+
+def probe_duration(path: str) -> float:
+    """Media duration in seconds, read from ``ffmpeg -i`` (no ffprobe needed)"""
+    result = subprocess.run(
+        [get_ffmpeg_command(), "-hide_banner", "-i", path],
+        capture_output=True,
+        text=True,
+    )
+    match = re.search(r"Duration: (\d+):(\d+):(\d+(?:\.\d+)?)", result.stderr)
+    if not match:
+        raise RuntimeError(f"Could not read the duration of {path}")
+    hours, minutes, seconds = match.groups()
+    return int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+
+
+def probe_duration_bytes(data: bytes) -> float:
+    """Duration of in-memory audio, decoded from stdin (nothing touches disk)"""
+    result = subprocess.run(
+        [
+            get_ffmpeg_command(),
+            "-hide_banner",
+            "-nostats",
+            "-i",
+            "pipe:0",
+            "-f",
+            "null",
+            "-progress",
+            "pipe:1",
+            "-",
+        ],
+        input=data,
+        capture_output=True,
+    )
+    stats: Dict[str, str] = {}
+    for line in result.stdout.decode("utf-8", "replace").splitlines():
+        key, _, value = line.strip().partition("=")
+        stats[key] = value
+    duration = _out_time(stats)
+    if result.returncode != 0 or duration <= 0:
+        raise RuntimeError("Could not read the duration of in-memory audio")
+    return duration
+
+
+def concat_segments(segment_paths: Sequence[str], list_file: str, output: str) -> str:
+    """Join encoded segments with the concat demuxer (stream copy)"""
+    with open(list_file, "w") as f:
+        for seg in segment_paths:
+            abs_path = os.path.abspath(seg).replace("\\", "/")
+            f.write(f"file '{abs_path}'\n")
+
+    cmd = [
+        get_ffmpeg_command(),
+        "-y",
+        "-f",
+        "concat",
+        "-safe",
+        "0",
+        "-i",
+        normalize_path(list_file),
+        "-c",
+        "copy",
+        output,
+    ]
+    subprocess.run(cmd, check=True)
+    return output
@@ -0,0 +1,362 @@
+"""
+Durable stage-by-stage state for video jobs.
+
+A video job runs through topic, script, scene plan, per-scene image and
+audio, segments, the final render and the upload. Every stage that finishes
+is recorded in JOB_STATE_DB with its result (as JSON) and, for file
+artifacts, the path, size and SHA-256. A retried or restarted job (same job
+id) skips each stage whose record is still valid: artifacts are re-hashed
+before they are reused, and a stage recorded for different inputs (say, a
+scene whose prompt changed) is run again.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from utils.workspace import new_job_id
+
+JOB_STATE_DB = os.getenv("JOB_STATE_DB", "job_state.db")
+# Unfinished jobs are resumed by the next run up to this many attempts.
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+# A "running" job with no progress for this long is assumed to have died with
+# its process (another process's live job keeps recording stages).
+JOB_STALE_SECONDS = float(os.getenv("JOB_STALE_MINUTES", "30")) * 60
+JOB_STATE_RETENTION = float(os.getenv("JOB_STATE_RETENTION_DAYS", "14")) * 86400
+
+
+def _sha256_file(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _fingerprint(inputs: Any) -> Optional[str]:
+    if inputs is None:
+        return None
+    payload = json.dumps(inputs, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class JobBusy(RuntimeError):
+    """Raised when a job to be resumed is already running elsewhere"""
+
+
+class JobStateStore:
+    """SQLite table of jobs and the stages each one has completed"""
+
+    def __init__(self, db_path: str = JOB_STATE_DB, retention: float = JOB_STATE_RETENTION):
+        self.db_path = db_path
+        self.retention = retention
+        self._lock = threading.Lock()
+        self._initialized = False
+        # Jobs being worked on by this process; never handed out for resume.
+        self._running: set = set()
+        self._counters = {"resumed_stages": 0, "recorded_stages": 0, "invalid": 0}
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        if not self._initialized:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS jobs (
+                    job_id TEXT PRIMARY KEY,
+                    kind TEXT,
+                    status TEXT,
+                    error TEXT,
+                    attempts INTEGER,
+                    created_at REAL,
+                    updated_at REAL
+                )
+                """
+            )
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS job_stages (
+                    job_id TEXT,
+                    stage TEXT,
+                    inputs TEXT,
+                    value TEXT,
+                    path TEXT,
+                    size INTEGER,
+                    sha256 TEXT,
+                    updated_at REAL,
+                    PRIMARY KEY (job_id, stage)
+                )
+                """
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status, updated_at)"
+            )
+            self._prune(conn)
+            conn.commit()
+            self._initialized = True
+        return conn
+
+    def _prune(self, conn: sqlite3.Connection) -> None:
+        cutoff = time.time() - self.retention
+        conn.execute("DELETE FROM job_stages WHERE updated_at < ?", (cutoff,))
+        conn.execute("DELETE FROM jobs WHERE updated_at < ?", (cutoff,))
+
+    def start_job(
+        self, job_id: Optional[str] = None, kind: str = "video", resume: bool = False
+    ) -> str:
+        """Create a job, or claim an existing one and mark it running again
+
+        Without a ``job_id`` and with ``resume``, the most recent failed (or
+        abandoned) job of ``kind`` is picked up before a new one is created.
+        Claiming is atomic across processes: an existing job is only taken
+        over if it is not running (or its runner has gone stale), otherwise
+        JobBusy is raised for an explicit ``job_id`` and the next candidate
+        is tried when resuming.
+        """
+        with self._lock:
+            conn = self._connect()
+            try:
+                conn.execute("BEGIN IMMEDIATE")
+                try:
+                    claimed = None
+                    if job_id is not None:
+                        if self._claim(conn, job_id):
+                            claimed = job_id
+                        elif self._exists(conn, job_id):
+                            raise JobBusy(f"Job {job_id} is already running")
+                    elif resume:
+                        for candidate in self._resumable(conn, kind):
+                            if self._claim(conn, candidate):
+                                claimed = candidate
+                                print(f"🔁 Resuming unfinished job {candidate}")
+                                break
+                    if claimed is None:
+                        claimed = job_id or new_job_id()
+                        now = time.time()
+                        conn.execute(
+                            "INSERT INTO jobs (job_id, kind, status, error, attempts, "
+                            "created_at, updated_at) VALUES (?, ?, 'running', NULL, 1, ?, ?)",
+                            (claimed, kind, now, now),
+                        )
+                    conn.commit()
+                except BaseException:
+                    conn.rollback()
+                    raise
+            finally:
+                conn.close()
+            self._running.add(claimed)
+        return claimed
+
+    def _claim(self, conn: sqlite3.Connection, job_id: str) -> bool:
+        """Mark an existing job running unless someone else is running it"""
+        if job_id in self._running:
+            return False
+        now = time.time()
+        cursor = conn.execute(
+            "UPDATE jobs SET status = 'running', error = NULL, attempts = attempts + 1, "
+            "updated_at = ? WHERE job_id = ? AND (status != 'running' OR updated_at < ?)",
+            (now, job_id, now - JOB_STALE_SECONDS),
+        )
+        return cursor.rowcount == 1
+
+    @staticmethod
+    def _exists(conn: sqlite3.Connection, job_id: str) -> bool:
+        row = conn.execute("SELECT 1 FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return row is not None
+
+    def _resumable(self, conn: sqlite3.Connection, kind: str) -> List[str]:
+        """Failed (or abandoned) jobs not running here, most recent first"""
+        rows = conn.execute(
+            "SELECT job_id FROM jobs WHERE kind = ? AND attempts < ? AND "
+            "(status = 'failed' OR (status = 'running' AND updated_at < ?)) "
+            "ORDER BY updated_at DESC",
+            (kind, JOB_MAX_ATTEMPTS, time.time() - JOB_STALE_SECONDS),
+        ).fetchall()
+        return [r[0] for r in rows if r[0] not in self._running]
+
+    def finish_job(self, job_id: str, status: str = "done", error: Optional[str] = None):
+        with self._lock:
+            conn = self._connect()
+            try:
+                conn.execute(
+                    "UPDATE jobs SET status = ?, error = ?, updated_at = ? WHERE job_id = ?",
+                    (status, error, time.time(), job_id),
+                )
+                conn.commit()
+            finally:
+                conn.close()
+            self._running.discard(job_id)
+
+    def is_running(self, job_id: str) -> bool:
+        with self._lock:
+            return job_id in self._running
+
+    def running_job_ids(self) -> set:
+        """Jobs started by this process that have not finished yet"""
+        with self._lock:
+            return set(self._running)
+
+    def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """A job and its recorded stages, or None if it is unknown"""
+        with self._lock:
+            conn = self._connect()
+            try:
+                row = conn.execute(
+                    "SELECT job_id, kind, status, error, attempts, created_at, "
+                    "updated_at FROM jobs WHERE job_id = ?",
+                    (job_id,),
+                ).fetchone()
+                stages = conn.execute(
+                    "SELECT stage, path, size, sha256, updated_at FROM job_stages "
+                    "WHERE job_id = ? ORDER BY updated_at",
+                    (job_id,),
+                ).fetchall()
+            finally:
+                conn.close()
+        if row is None:
+            return None
+        keys = ("job_id", "kind", "status", "error", "attempts", "created_at", "updated_at")
+        job = dict(zip(keys, row))
+        job["stages"] = [
+            dict(zip(("stage", "path", "size", "sha256", "updated_at"), s))
+            for s in stages
+        ]
+        return job
+
+    def get_stage(
+        self, job_id: str, stage: str, inputs: Any = None
+    ) -> Optional[Dict[str, Any]]:
+        """The stage's record if it completed for ``inputs`` and its artifact is intact"""
+        with self._lock:
+            conn = self._connect()
+            try:
+                row = conn.execute(
+                    "SELECT inputs, value, path, size, sha256 FROM job_stages "
+                    "WHERE job_id = ? AND stage = ?",
+                    (job_id, stage),
+                ).fetchone()
+            finally:
+                conn.close()
+        if row is None:
+            return None
+        fingerprint, value, path, size, digest = row
+        if fingerprint != _fingerprint(inputs):
+            return None
+        if path is not None:
+            try:
+                intact = os.path.getsize(path) == size and _sha256_file(path) == digest
+            except OSError:
+                intact = False
+            if not intact:
+                with self._lock:
+                    self._counters["invalid"] += 1
+                return None
+        with self._lock:
+            self._counters["resumed_stages"] += 1
+        return {
+            "value": json.loads(value) if value is not None else None,
+            "path": path,
+        }
+
+    def record_stage(
+        self,
+        job_id: str,
+        stage: str,
+        value: Any = None,
+        path: Optional[str] = None,
+        inputs: Any = None,
+    ) -> None:
+        """Mark a stage complete, hashing its artifact if it has one"""
+        size = digest = None
+        if path is not None:
+            size = os.path.getsize(path)
+            digest = _sha256_file(path)
+        encoded = json.dumps(value, ensure_ascii=False) if value is not None else None
+        with self._lock:
+            conn = self._connect()
+            try:
+                conn.execute(
+                    "INSERT OR REPLACE INTO job_stages (job_id, stage, inputs, value, "
+                    "path, size, sha256, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (job_id, stage, _fingerprint(inputs), encoded, path, size, digest, time.time()),
+                )
+                conn.execute(
+                    "UPDATE jobs SET updated_at = ? WHERE job_id = ?", (time.time(), job_id)
+                )
+                conn.commit()
+            finally:
+                conn.close()
+            self._counters["recorded_stages"] += 1
+
+    def checkpoints(self, job_id: str) -> "JobCheckpoints":
+        return JobCheckpoints(self, job_id)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            conn = self._connect()
+            try:
+                by_status = dict(
+                    conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status")
+                )
+            finally:
+                conn.close()
+            return {
+                "jobs": by_status,
+                "running_here": sorted(self._running),
+                **self._counters,
+            }
+
+
+class JobCheckpoints:
+    """Stage records of one job, with a run-or-resume helper"""
+
+    def __init__(self, store: JobStateStore, job_id: str):
+        self.store = store
+        self.job_id = job_id
+
+    def get(self, stage: str, inputs: Any = None) -> Optional[Dict[str, Any]]:
+        return self.store.get_stage(self.job_id, stage, inputs)
+
+    def record(
+        self, stage: str, value: Any = None, path: Optional[str] = None, inputs: Any = None
+    ) -> None:
+        self.store.record_stage(self.job_id, stage, value, path, inputs)
+
+    def run(
+        self,
+        stage: str,
+        fn: Callable[[], Any],
+        inputs: Any = None,
+        artifact: bool = False,
+    ) -> Any:
+        """Return the stage's recorded result, or run ``fn`` and record it
+
+        With ``artifact`` the result is a file path whose contents are
+        hashed. A result of None means the stage failed and is not recorded.
+        """
+        done = self.get(stage, inputs)
+        if done is not None:
+            print(f"⏭️ Job {self.job_id}: {stage} already done, skipping")
+            return done["path"] if artifact else done["value"]
+        result = fn()
+        if result is not None:
+            if artifact:
+                self.record(stage, path=result, inputs=inputs)
+            else:
+                self.record(stage, value=result, inputs=inputs)
+        return result
+
+
+_job_store = JobStateStore()
+
+
+def get_job_store() -> JobStateStore:
+    """Process-wide job-state store"""
+    return _job_store
+
+
+def get_job_state_stats() -> Dict[str, Any]:
+    return _job_store.stats()
@@ -0,0 +1,57 @@
+"""
+Rolling latency samples with percentile queries.
+"""
+
+import threading
+from collections import deque
+from typing import Any, Deque, Dict, Hashable, Optional
+
+LATENCY_WINDOW = 200
+
+
+class LatencyTracker:
+    """Keeps the most recent latency samples per key (e.g. provider)"""
+
+    def __init__(self, window: int = LATENCY_WINDOW):
+        self.window = window
+        self._lock = threading.Lock()
+        self._samples: Dict[Hashable, Deque[float]] = {}
+
+    def record(self, key: Hashable, seconds: float) -> None:
+        with self._lock:
+            samples = self._samples.get(key)
+            if samples is None:
+                samples = self._samples[key] = deque(maxlen=self.window)
+            samples.append(seconds)
+
+    def count(self, key: Hashable) -> int:
+        with self._lock:
+            return len(self._samples.get(key, ()))
+
+    def percentile(self, key: Hashable, pct: float) -> Optional[float]:
+        """Nearest-rank percentile of the window, or None without samples"""
+        with self._lock:
+            samples = sorted(self._samples.get(key, ()))
+        if not samples:
+            return None
+        rank = max(1, int(round(pct / 100.0 * len(samples))))
+        return samples[min(rank, len(samples)) - 1]
+
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        """p50/p95/p99 per key, in seconds"""
+        with self._lock:
+            keys = list(self._samples)
+        report = {}
+        for key in keys:
+            name = "/".join(key) if isinstance(key, tuple) else str(key)
+            report[name] = {
+                "samples": self.count(key),
+                "p50": _round(self.percentile(key, 50)),
+                "p95": _round(self.percentile(key, 95)),
+                "p99": _round(self.percentile(key, 99)),
+            }
+        return report
+
+
+def _round(value: Optional[float]) -> Optional[float]:
+    return round(value, 3) if value is not None else None
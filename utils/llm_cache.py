@@ -0,0 +1,382 @@
+"""
+Content-addressed cache for LLM completions.
+
+Responses are stored in SQLite keyed by a hash of everything that determines
+the output (provider, model, system message, prompt, temperature, max tokens).
+Entries expire per call-site TTL and the table is capped with LRU eviction.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+CACHE_DB_PATH = os.getenv("LLM_CACHE_DB", "llm_cache.db")
+CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "5000"))
+CACHE_DEFAULT_TTL = int(os.getenv("LLM_CACHE_TTL", "86400"))
+CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "true").lower() not in (
+    "0",
+    "false",
+    "no",
+)
+
+# Seconds each call site may serve a cached answer. A TTL of 0 disables caching
+# for that site. Override any entry with LLM_CACHE_TTL_<CALL_SITE>.
+CALL_SITE_TTLS = {
+    # Shorter than the 15-minute scheduler interval: overlapping manual
+    # triggers share a topic, scheduled runs still get a fresh one.
+    "trending_topic": 600,
+    "viral_ideas": 3600,
+    "video_script": 86400,
+    "short_script": 86400,
+    "scene_plan": 7 * 86400,
+    "thumbnail_idea": 86400,
+    "seo_metadata": 86400,
+    "default": CACHE_DEFAULT_TTL,
+}
+
+
+def get_call_site_ttl(call_site: str) -> int:
+    """Resolve the TTL for a call site, honouring environment overrides"""
+    override = os.getenv(f"LLM_CACHE_TTL_{call_site.upper()}")
+    if override is not None:
+        return int(override)
+    return CALL_SITE_TTLS.get(call_site, CALL_SITE_TTLS["default"])
+
+
+def make_cache_key(
+    provider: str,
+    model: str,
+    system_message: Optional[str],
+    prompt: str,
+    temperature: Optional[float],
+    max_tokens: Optional[int] = None,
+) -> str:
+    """Hash the inputs that determine a completion into a stable key"""
+    payload = json.dumps(
+        [provider, model, system_message or "", prompt, temperature, max_tokens],
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token) for savings reports"""
+    return max(1, len(text) // 4) if text else 0
+
+
+class LLMCache:
+    """SQLite-backed completion cache with TTL expiry and LRU eviction"""
+
+    def __init__(
+        self,
+        db_path: str = CACHE_DB_PATH,
+        max_entries: int = CACHE_MAX_ENTRIES,
+        enabled: bool = CACHE_ENABLED,
+    ):
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._initialized = False
+        self._counters: Dict[str, Dict[str, float]] = {}
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        if not self._initialized:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS llm_cache (
+                    key TEXT PRIMARY KEY,
+                    call_site TEXT,
+                    provider TEXT,
+                    model TEXT,
+                    response TEXT,
+                    created_at REAL,
+                    expires_at REAL,
+                    last_access REAL,
+                    hits INTEGER DEFAULT 0,
+                    latency REAL,
+                    tokens INTEGER
+                )
+            """
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_llm_cache_access ON llm_cache (last_access)"
+            )
+            conn.commit()
+            self._initialized = True
+        return conn
+
+    def _count(self, call_site: str, field: str, amount: float = 1) -> None:
+        site = self._counters.setdefault(
+            call_site,
+            {
+                "hits": 0,
+                "misses": 0,
+                "bypassed": 0,
+                "expired": 0,
+                "evictions": 0,
+                "tokens_saved": 0,
+                "latency_saved": 0.0,
+            },
+        )
+        site[field] += amount
+
+    def get(self, key: str, call_site: str = "default") -> Optional[str]:
+        """Return a live cached response and refresh its LRU position"""
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            try:
+                row = conn.execute(
+                    "SELECT response, expires_at, latency, tokens FROM llm_cache WHERE key = ?",
+                    (key,),
+                ).fetchone()
+                if row is None:
+                    self._count(call_site, "misses")
+                    return None
+                response, expires_at, latency, tokens = row
+                if expires_at is not None and expires_at <= now:
+                    conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                    conn.commit()
+                    self._count(call_site, "expired")
+                    self._count(call_site, "misses")
+                    return None
+                conn.execute(
+                    "UPDATE llm_cache SET last_access = ?, hits = hits + 1 WHERE key = ?",
+                    (now, key),
+                )
+                conn.commit()
+            finally:
+                conn.close()
+            self._count(call_site, "hits")
+            self._count(call_site, "tokens_saved", tokens or 0)
+            self._count(call_site, "latency_saved", latency or 0.0)
+            return response
+
+    def put(
+        self,
+        key: str,
+        response: str,
+        ttl: int,
+        call_site: str = "default",
+        provider: str = "",
+        model: str = "",
+        latency: float = 0.0,
+        tokens: int = 0,
+    ) -> None:
+        """Store a response and evict least-recently-used rows over the cap"""
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            try:
+                conn.execute(
+                    """
+                    INSERT OR REPLACE INTO llm_cache
+                        (key, call_site, provider, model, response, created_at,
+                         expires_at, last_access, hits, latency, tokens)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, 0, ?, ?)
+                """,
+                    (
+                        key,
+                        call_site,
+                        provider,
+                        model,
+                        response,
+                        now,
+                        now + ttl,
+                        now,
+                        latency,
+                        tokens,
+                    ),
+                )
+                evicted = self._evict(conn)
+                conn.commit()
+            finally:
+                conn.close()
+            if evicted:
+                self._count(call_site, "evictions", evicted)
+
+    def _evict(self, conn: sqlite3.Connection) -> int:
+        conn.execute("DELETE FROM llm_cache WHERE expires_at <= ?", (time.time(),))
+        (count,) = conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()
+        overflow = count - self.max_entries
+        if overflow <= 0:
+            return 0
+        conn.execute(
+            """
+            DELETE FROM llm_cache WHERE key IN (
+                SELECT key FROM llm_cache ORDER BY last_access ASC LIMIT ?
+            )
+        """,
+            (overflow,),
+        )
+        return overflow
+
+    def lookup(
+        self,
+        call_site: str,
+        provider: str,
+        model: str,
+        system_message: Optional[str],
+        prompt: str,
+        temperature: Optional[float],
+        max_tokens: Optional[int] = None,
+        ttl: Optional[int] = None,
+        bypass: bool = False,
+    ) -> Optional[Tuple[str, int, Optional[str]]]:
+        """Resolve a request to ``(key, ttl, cached_response)``
+
+        Returns None when the request must not be cached (bypass flag, cache
+        disabled or a zero TTL for the call site).
+        """
+        ttl = get_call_site_ttl(call_site) if ttl is None else ttl
+        if bypass or not self.enabled or ttl <= 0:
+            with self._lock:
+                self._count(call_site, "bypassed")
+            return None
+
+        key = make_cache_key(
+            provider, model, system_message, prompt, temperature, max_tokens
+        )
+        return key, ttl, self.get(key, call_site)
+
+    def store(
+        self,
+        entry: Tuple[str, int, Optional[str]],
+        response: Optional[str],
+        call_site: str,
+        provider: str,
+        model: str,
+        system_message: Optional[str],
+        prompt: str,
+        latency: float,
+    ) -> None:
+        """Store a fresh response for an entry returned by ``lookup``"""
+        if not response:
+            return
+        key, ttl, _ = entry
+        tokens = _estimate_tokens(prompt) + _estimate_tokens(system_message or "")
+        tokens += _estimate_tokens(response)
+        self.put(
+            key,
+            response,
+            ttl,
+            call_site=call_site,
+            provider=provider,
+            model=model,
+            latency=latency,
+            tokens=tokens,
+        )
+
+    def cached_completion(
+        self,
+        call_site: str,
+        provider: str,
+        model: str,
+        system_message: Optional[str],
+        prompt: str,
+        temperature: Optional[float],
+        compute: Callable[[], Optional[str]],
+        max_tokens: Optional[int] = None,
+        ttl: Optional[int] = None,
+        bypass: bool = False,
+    ) -> Optional[str]:
+        """Return a cached completion or call ``compute`` and store its result"""
+        entry = self.lookup(
+            call_site,
+            provider,
+            model,
+            system_message,
+            prompt,
+            temperature,
+            max_tokens,
+            ttl,
+            bypass,
+        )
+        if entry is None:
+            return compute()
+        if entry[2] is not None:
+            return entry[2]
+
+        started = time.time()
+        response = compute()
+        self.store(
+            entry,
+            response,
+            call_site,
+            provider,
+            model,
+            system_message,
+            prompt,
+            time.time() - started,
+        )
+        return response
+
+    def clear(self) -> None:
+        """Remove every cached response"""
+        with self._lock:
+            conn = self._connect()
+            try:
+                conn.execute("DELETE FROM llm_cache")
+                conn.commit()
+            finally:
+                conn.close()
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters per call site plus overall savings"""
+        with self._lock:
+            sites = {name: dict(values) for name, values in self._counters.items()}
+            try:
+                conn = self._connect()
+                try:
+                    (entries,) = conn.execute(
+                        "SELECT COUNT(*) FROM llm_cache"
+                    ).fetchone()
+                finally:
+                    conn.close()
+            except sqlite3.Error:
+                entries = None
+
+        totals = {
+            "hits": 0,
+            "misses": 0,
+            "bypassed": 0,
+            "tokens_saved": 0,
+            "latency_saved": 0.0,
+        }
+        for values in sites.values():
+            for field in totals:
+                totals[field] += values[field]
+        lookups = totals["hits"] + totals["misses"]
+        totals["hit_rate"] = round(totals["hits"] / lookups, 3) if lookups else 0.0
+        totals["latency_saved"] = round(totals["latency_saved"], 2)
+        return {
+            "enabled": self.enabled,
+            "entries": entries,
+            "max_entries": self.max_entries,
+            "totals": totals,
+            "call_sites": sites,
+        }
+
+
+_cache = LLMCache()
+
+
+def get_llm_cache() -> LLMCache:
+    """Process-wide completion cache"""
+    return _cache
+
+
+def cached_completion(*args: Any, **kwargs: Any) -> Optional[str]:
+    """Shortcut for ``get_llm_cache().cached_completion``"""
+    return _cache.cached_completion(*args, **kwargs)
+
+
+def get_cache_stats() -> Dict[str, Any]:
+    """Cache counters for monitoring endpoints"""
+    return _cache.stats()
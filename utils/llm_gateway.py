@@ -0,0 +1,677 @@
+"""
+asyncio gateway for LLM calls.
+
+A single background event loop owns one semaphore per provider, so no more
+than a configured number of requests are in flight against each provider no
+matter how many scheduler, Flask or CrewAI threads are asking. Every request
+carries a deadline and can be cancelled. Synchronous callers use
+``complete()`` / ``run_concurrently()``, which block on the loop.
+
+Requests with ``provider="auto"`` are routed by the health-weighted provider
+router and fail over to the next healthy endpoint on error. With hedging
+enabled, a request that has not been answered within a percentile of its
+provider's recent latency is also sent to a peer endpoint and the first
+answer wins. The losing call cannot be stopped once its HTTP request is out:
+it runs until it returns (at most until the request's deadline, which is its
+HTTP timeout), keeps its provider slot until then and is still billed.
+
+Requests may name a model tier ("small", "large") instead of a concrete model
+and carry a fallback chain plus a quality gate (see ``utils.model_policy``);
+an answer that fails the gate is escalated to the next model in the chain.
+"""
+
+import asyncio
+import concurrent.futures
+import os
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Optional
+
+from utils.ai_clients import get_azure_client, get_openai_client, provider_available
+from utils.latency import LatencyTracker
+from utils.llm_cache import get_llm_cache, make_cache_key
+from utils.model_policy import MODEL_TIERS, get_validator, resolve_model
+from utils.provider_router import NoHealthyEndpoint, get_router
+from utils.rate_limiter import (
+    estimate_tokens,
+    get_rate_limiter,
+    rate_limited_call,
+    tokens_used,
+)
+
+DEFAULT_DEADLINE = float(os.getenv("LLM_REQUEST_DEADLINE", "120"))
+PROVIDER_CONCURRENCY = {
+    "openai": int(os.getenv("LLM_CONCURRENCY_OPENAI", "4")),
+    "azure": int(os.getenv("LLM_CONCURRENCY_AZURE", "2")),
+}
+
+HEDGING_ENABLED = os.getenv("LLM_HEDGING", "false").lower() == "true"
+HEDGE_PERCENTILE = float(os.getenv("LLM_HEDGE_PERCENTILE", "95"))
+HEDGE_MIN_SAMPLES = int(os.getenv("LLM_HEDGE_MIN_SAMPLES", "20"))
+# Used until a provider has HEDGE_MIN_SAMPLES latency samples.
+HEDGE_DEFAULT_DELAY = float(os.getenv("LLM_HEDGE_DEFAULT_DELAY", "15"))
+
+# Provider/model a hedged request is duplicated to.
+HEDGE_PEERS = {
+    "openai": ("azure", os.getenv("AZURE_MODEL", "openai/gpt-4.1")),
+    "azure": ("openai", "gpt-4"),
+}
+
+
+class LLMDeadlineExceeded(TimeoutError):
+    """Raised when a request does not finish before its deadline"""
+
+
+def complete_chat(
+    provider: str,
+    model: str,
+    prompt: str,
+    system_message: Optional[str] = None,
+    temperature: Optional[float] = None,
+    max_tokens: Optional[int] = None,
+    top_p: Optional[float] = None,
+    timeout: Optional[float] = None,
+) -> str:
+    """Blocking chat completion against one provider using the pooled clients
+
+    ``timeout`` bounds the HTTP request itself, so a call whose deadline has
+    passed stops instead of running on in its worker thread.
+    """
+    kwargs: Dict[str, Any] = {}
+    if temperature is not None:
+        kwargs["temperature"] = temperature
+    if max_tokens is not None:
+        kwargs["max_tokens"] = max_tokens
+    if top_p is not None:
+        kwargs["top_p"] = top_p
+
+    if provider == "azure":
+        from azure.ai.inference.models import SystemMessage, UserMessage
+
+        messages = [SystemMessage(system_message)] if system_message else []
+        messages.append(UserMessage(prompt))
+        if timeout is not None:
+            kwargs["read_timeout"] = timeout
+
+        def call():
+            return get_azure_client().complete(
+                messages=messages, model=model, **kwargs
+            )
+
+    else:
+        if timeout is not None:
+            kwargs["timeout"] = timeout
+
+        def call():
+            return get_openai_client().chat.completions.create(
+                model=model, messages=_openai_messages(prompt, system_message), **kwargs
+            )
+
+    tokens = estimate_tokens(prompt, system_message, max_tokens=max_tokens)
+    response = rate_limited_call(provider, call, tokens)
+    return response.choices[0].message.content
+
+
+def _openai_messages(prompt: str, system_message: Optional[str]) -> list:
+    messages = []
+    if system_message:
+        messages.append({"role": "system", "content": system_message})
+    messages.append({"role": "user", "content": prompt})
+    return messages
+
+
+def stream_chat(
+    provider: str,
+    model: str,
+    prompt: str,
+    system_message: Optional[str] = None,
+    temperature: Optional[float] = None,
+    max_tokens: Optional[int] = None,
+) -> Iterator[str]:
+    """Blocking streamed chat completion, yielding text deltas as they arrive"""
+    kwargs: Dict[str, Any] = {"stream": True}
+    if temperature is not None:
+        kwargs["temperature"] = temperature
+    if max_tokens is not None:
+        kwargs["max_tokens"] = max_tokens
+
+    if provider == "azure":
+        from azure.ai.inference.models import SystemMessage, UserMessage
+
+        messages = [SystemMessage(system_message)] if system_message else []
+        messages.append(UserMessage(prompt))
+
+        def call():
+            return get_azure_client().complete(messages=messages, model=model, **kwargs)
+
+    else:
+        # The last chunk then carries the usage, for settling the TPM bucket.
+        kwargs["stream_options"] = {"include_usage": True}
+
+        def call():
+            return get_openai_client().chat.completions.create(
+                model=model, messages=_openai_messages(prompt, system_message), **kwargs
+            )
+
+    tokens = estimate_tokens(prompt, system_message, max_tokens=max_tokens)
+    chunks = rate_limited_call(provider, call, tokens)
+
+    for chunk in chunks:
+        used = tokens_used(chunk)
+        if used is not None:
+            get_rate_limiter().refund_tokens(provider, tokens - used)
+        if not chunk.choices:
+            continue
+        delta = chunk.choices[0].delta
+        content = getattr(delta, "content", None) if delta is not None else None
+        if content:
+            yield content
+
+
+class LLMGateway:
+    """Bounded-concurrency front door for every LLM request in the process"""
+
+    def __init__(self, concurrency: Optional[Dict[str, int]] = None):
+        self.concurrency = dict(concurrency or PROVIDER_CONCURRENCY)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=max(4, sum(self.concurrency.values()) * 2),
+            thread_name_prefix="llm-gateway",
+        )
+        self._tasks: set = set()
+        self._counters = {
+            "submitted": 0,
+            "completed": 0,
+            "failed": 0,
+            "timed_out": 0,
+            "cancelled": 0,
+        }
+        self._in_flight: Dict[str, int] = {}
+        # Changed from the loop and from streaming caller threads.
+        self._in_flight_lock = threading.Lock()
+        self.latency = LatencyTracker()
+        self._hedges = {"eligible": 0, "fired": 0, "hedge_wins": 0}
+        self._tiering: Dict[str, Dict[str, Any]] = {}
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._start_lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(
+                    target=loop.run_forever, name="llm-gateway-loop", daemon=True
+                )
+                thread.start()
+                self._loop, self._thread = loop, thread
+            return self._loop
+
+    def _track(self, provider: str, delta: int) -> None:
+        with self._in_flight_lock:
+            self._in_flight[provider] = self._in_flight.get(provider, 0) + delta
+
+    def _semaphore(self, provider: str) -> asyncio.Semaphore:
+        if provider not in self._semaphores:
+            self._semaphores[provider] = asyncio.Semaphore(
+                self.concurrency.get(provider, 2)
+            )
+        return self._semaphores[provider]
+
+    async def _attempt(
+        self,
+        provider: str,
+        model: str,
+        prompt: str,
+        system_message: Optional[str],
+        temperature: Optional[float],
+        max_tokens: Optional[int],
+        top_p: Optional[float],
+        expires_at: Optional[float] = None,
+    ) -> Optional[str]:
+        """One provider call under its semaphore, recording its latency
+
+        The slot is held until the worker thread's HTTP call has actually
+        returned, even when the awaiting request is cancelled or times out,
+        so the concurrency bound covers every call still on the wire. The
+        time left before ``expires_at`` is the HTTP timeout.
+        """
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphore(provider)
+        await semaphore.acquire()
+        self._track(provider, 1)
+        started = time.monotonic()
+        timeout = None
+        if expires_at is not None:
+            timeout = max(1.0, expires_at - started)
+        call = loop.run_in_executor(
+            self._executor,
+            lambda: complete_chat(
+                provider,
+                model,
+                prompt,
+                system_message,
+                temperature,
+                max_tokens,
+                top_p,
+                timeout,
+            ),
+        )
+
+        def finished(future: asyncio.Future) -> None:
+            self._track(provider, -1)
+            semaphore.release()
+            if not future.cancelled():
+                future.exception()  # retrieved here if nobody awaits it any more
+
+        call.add_done_callback(finished)
+        try:
+            result = await asyncio.shield(call)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            get_router().record(provider, model, False, time.monotonic() - started, e)
+            raise
+        latency = time.monotonic() - started
+        self.latency.record(provider, latency)
+        get_router().record(provider, model, True, latency)
+        return result
+
+    def _hedge_peer(self, provider: str, routed: bool = False) -> Optional[tuple]:
+        """The peer endpoint for ``provider`` if it is usable right now"""
+        if routed:
+            others = get_router().candidates(
+                exclude=[e for e in get_router().endpoints if e[0] == provider]
+            )
+            return others[0] if others else None
+        peer = HEDGE_PEERS.get(provider)
+        if peer is None or not provider_available(peer[0]):
+            return None
+        return peer
+
+    def hedge_delay(self, provider: str) -> float:
+        """Seconds to wait on ``provider`` before hedging to its peer"""
+        if self.latency.count(provider) < HEDGE_MIN_SAMPLES:
+            return HEDGE_DEFAULT_DELAY
+        return self.latency.percentile(provider, HEDGE_PERCENTILE)
+
+    async def _hedged(self, provider: str, model: str, peer: tuple, *args: Any) -> tuple:
+        """Race the primary against a delayed duplicate on the peer provider
+
+        Returns the answer and the (provider, model) that gave it. The loser's
+        task is cancelled, but its HTTP call runs on in the worker thread and
+        holds its provider slot until it returns (see ``_attempt``).
+        """
+        self._hedges["eligible"] += 1
+        endpoints = [(provider, model)]
+        tasks = [asyncio.ensure_future(self._attempt(provider, model, *args))]
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=self.hedge_delay(provider))
+            if not done:
+                self._hedges["fired"] += 1
+                endpoints.append(tuple(peer))
+                tasks.append(asyncio.ensure_future(self._attempt(*peer, *args)))
+
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.exception() is None:
+                        if task is not tasks[0]:
+                            self._hedges["hedge_wins"] += 1
+                        return task.result(), endpoints[tasks.index(task)]
+            # Every attempt failed: surface the primary provider's error.
+            return tasks[0].result(), endpoints[0]
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    async def _dispatch(
+        self, provider: str, model: str, hedge: bool, routed: bool, *args: Any
+    ) -> tuple:
+        """The answer and the (provider, model) endpoint that produced it"""
+        peer = self._hedge_peer(provider, routed) if hedge else None
+        if peer is not None and model in MODEL_TIERS:
+            peer = (peer[0], resolve_model(peer[0], model))
+        model = resolve_model(provider, model)
+        if peer is not None:
+            return await self._hedged(provider, model, peer, *args)
+        return await self._attempt(provider, model, *args), (provider, model)
+
+    async def _routed(self, model: str, hedge: bool, *args: Any) -> tuple:
+        """Try router-ranked endpoints in order until one answers
+
+        ``model`` is a tier name, or "auto" for each endpoint's own model.
+        """
+        candidates = get_router().candidates()
+        if not candidates:
+            raise NoHealthyEndpoint("No AI provider is configured and available")
+        last_error: Optional[Exception] = None
+        for provider, endpoint_model in candidates:
+            target = endpoint_model if model == "auto" else model
+            try:
+                return await self._dispatch(provider, target, hedge, True, *args)
+            except Exception as e:
+                last_error = e
+                print(f"⚠️ {provider}/{model} failed, failing over: {e}")
+        raise last_error
+
+    async def acomplete(
+        self,
+        call_site: str,
+        prompt: str,
+        system_message: Optional[str] = None,
+        provider: str = "openai",
+        model: str = "gpt-4",
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        top_p: Optional[float] = None,
+        deadline: Optional[float] = None,
+        cache_ttl: Optional[int] = None,
+        bypass_cache: bool = False,
+        hedge: Optional[bool] = None,
+        fallback_models: Optional[List[str]] = None,
+        validator: Optional[str] = None,
+    ) -> Optional[str]:
+        """Run one completion under the provider semaphore and a deadline
+
+        ``provider="auto"`` lets the provider router pick the endpoint (and
+        model); the cache key then uses "auto" so routed answers are shared.
+        When ``validator`` names a quality gate, an answer that fails it is
+        retried on each of ``fallback_models`` in turn; only answers that pass
+        are cached.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = DEFAULT_DEADLINE if deadline is None else deadline
+        hedge = HEDGING_ENABLED if hedge is None else hedge
+        cache = get_llm_cache()
+        gate = get_validator(validator)
+        chain = [model] + list(fallback_models or [])
+        self._counters["submitted"] += 1
+        expires_at = time.monotonic() + deadline
+        args = (prompt, system_message, temperature, max_tokens, top_p, expires_at)
+
+        async def run_model(target: str):
+            entry = await loop.run_in_executor(
+                self._executor,
+                lambda: cache.lookup(
+                    call_site,
+                    provider,
+                    target,
+                    system_message,
+                    prompt,
+                    temperature,
+                    max_tokens,
+                    cache_ttl,
+                    bypass_cache,
+                ),
+            )
+            if entry is not None and entry[2] is not None:
+                return entry[2], True
+
+            started = time.monotonic()
+            if provider == "auto":
+                result, answered = await self._routed(target, hedge, *args)
+            else:
+                result, answered = await self._dispatch(
+                    provider, target, hedge, False, *args
+                )
+
+            if entry is not None and (gate is None or gate(result)):
+                latency = time.monotonic() - started
+                store_entry, store_provider, store_model = entry, provider, target
+                if provider != "auto" and answered[0] != provider:
+                    # A hedge peer answered: key the entry by the endpoint that
+                    # produced it, not the one that was asked.
+                    store_provider, store_model = answered
+                    key = make_cache_key(
+                        store_provider,
+                        store_model,
+                        system_message,
+                        prompt,
+                        temperature,
+                        max_tokens,
+                    )
+                    store_entry = (key, entry[1], None)
+                await loop.run_in_executor(
+                    self._executor,
+                    lambda: cache.store(
+                        store_entry,
+                        result,
+                        call_site,
+                        store_provider,
+                        store_model,
+                        system_message,
+                        prompt,
+                        latency,
+                    ),
+                )
+            return result, False
+
+        async def run():
+            for position, target in enumerate(chain):
+                result, cached = await run_model(target)
+                last = position == len(chain) - 1
+                if gate is None or last or cached or gate(result):
+                    self._record_tier(call_site, target, position)
+                    return result
+                print(
+                    f"🔁 {call_site} output from {target} failed its quality gate, "
+                    f"escalating to {chain[position + 1]}"
+                )
+
+        try:
+            # The deadline covers time spent queued on the semaphore as well.
+            result = await asyncio.wait_for(run(), timeout=deadline)
+        except asyncio.TimeoutError:
+            self._counters["timed_out"] += 1
+            raise LLMDeadlineExceeded(
+                f"{call_site} on {provider} exceeded its {deadline:g}s deadline"
+            )
+        except asyncio.CancelledError:
+            self._counters["cancelled"] += 1
+            raise
+        except Exception:
+            self._counters["failed"] += 1
+            raise
+        self._counters["completed"] += 1
+        return result
+
+    def _record_tier(self, call_site: str, model: str, escalations: int) -> None:
+        site = self._tiering.setdefault(call_site, {"escalations": 0, "served": {}})
+        site["escalations"] += escalations
+        site["served"][model] = site["served"].get(model, 0) + 1
+
+    async def agather(self, requests: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+        """Run named requests concurrently; failures are returned, not raised"""
+        names = list(requests)
+        results = await asyncio.gather(
+            *(self.acomplete(**requests[name]) for name in names),
+            return_exceptions=True,
+        )
+        return dict(zip(names, results))
+
+    def submit(self, coro: Any) -> concurrent.futures.Future:
+        """Schedule a coroutine on the gateway loop from any thread"""
+        loop = self._ensure_loop()
+
+        async def tracked():
+            task = asyncio.current_task()
+            self._tasks.add(task)
+            try:
+                return await coro
+            finally:
+                self._tasks.discard(task)
+
+        return asyncio.run_coroutine_threadsafe(tracked(), loop)
+
+    def run(self, coro: Any, deadline: Optional[float] = None) -> Any:
+        """Run a coroutine on the gateway loop and wait for it from this thread
+
+        Waits as long as ``complete`` would for a request with ``deadline``,
+        then cancels the coroutine and raises LLMDeadlineExceeded.
+        """
+        deadline = deadline or DEFAULT_DEADLINE
+        future = self.submit(coro)
+        try:
+            return future.result(timeout=deadline + 5)
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            raise LLMDeadlineExceeded(
+                f"Gateway call exceeded its {deadline:g}s deadline"
+            )
+
+    def complete(self, call_site: str, prompt: str, **kwargs: Any) -> Optional[str]:
+        """Synchronous wrapper around ``acomplete`` for threads and CrewAI"""
+        deadline = kwargs.get("deadline") or DEFAULT_DEADLINE
+        future = self.submit(self.acomplete(call_site, prompt, **kwargs))
+        try:
+            return future.result(timeout=deadline + 5)
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            raise LLMDeadlineExceeded(
+                f"{call_site} exceeded its {deadline:g}s deadline"
+            )
+
+    def run_concurrently(
+        self, requests: Dict[str, Dict[str, Any]], timeout: Optional[float] = None
+    ) -> Dict[str, Any]:
+        """Synchronous wrapper around ``agather``"""
+        deadlines = [r.get("deadline") or DEFAULT_DEADLINE for r in requests.values()]
+        timeout = timeout or (max(deadlines, default=DEFAULT_DEADLINE) + 5)
+        future = self.submit(self.agather(requests))
+        try:
+            return future.result(timeout=timeout)
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            raise LLMDeadlineExceeded("Concurrent LLM batch exceeded its deadline")
+
+    def stream(
+        self,
+        call_site: str,
+        prompt: str,
+        system_message: Optional[str] = None,
+        provider: str = "openai",
+        model: str = "gpt-4",
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        deadline: Optional[float] = None,
+    ) -> Iterator[str]:
+        """Stream a completion in the calling thread under the provider semaphore
+
+        The provider slot is held until the stream is exhausted or closed, and
+        the deadline is checked between chunks.
+        """
+        loop = self._ensure_loop()
+        deadline = DEFAULT_DEADLINE if deadline is None else deadline
+        started = time.monotonic()
+        if provider == "auto":
+            provider, endpoint_model = get_router().choose()
+            model = endpoint_model if model == "auto" else model
+        model = resolve_model(provider, model)
+
+        # Both only run on the loop, so they cannot interleave: whichever of
+        # acquire() and abandon() runs second gives a taken slot back.
+        claim = {"acquired": False, "abandoned": False}
+
+        async def acquire():
+            semaphore = self._semaphore(provider)
+            await asyncio.wait_for(semaphore.acquire(), timeout=deadline)
+            if claim["abandoned"]:
+                semaphore.release()
+                raise asyncio.CancelledError()
+            claim["acquired"] = True
+            return semaphore
+
+        def abandon():
+            claim["abandoned"] = True
+            if claim["acquired"]:
+                self._semaphore(provider).release()
+
+        future = asyncio.run_coroutine_threadsafe(acquire(), loop)
+        try:
+            semaphore = future.result(timeout=deadline + 5)
+        except (asyncio.TimeoutError, concurrent.futures.TimeoutError):
+            future.cancel()
+            loop.call_soon_threadsafe(abandon)
+            self._counters["timed_out"] += 1
+            raise LLMDeadlineExceeded(
+                f"{call_site} on {provider} waited {deadline:g}s for a slot"
+            )
+
+        self._counters["submitted"] += 1
+        self._track(provider, 1)
+        attempt_started = time.monotonic()
+        try:
+            for delta in stream_chat(
+                provider, model, prompt, system_message, temperature, max_tokens
+            ):
+                if time.monotonic() - started > deadline:
+                    self._counters["timed_out"] += 1
+                    raise LLMDeadlineExceeded(
+                        f"{call_site} on {provider} exceeded its {deadline:g}s deadline"
+                    )
+                yield delta
+            self._counters["completed"] += 1
+            get_router().record(
+                provider, model, True, time.monotonic() - attempt_started
+            )
+        except GeneratorExit:
+            self._counters["cancelled"] += 1
+            raise
+        except Exception as e:
+            if not isinstance(e, LLMDeadlineExceeded):
+                self._counters["failed"] += 1
+            get_router().record(
+                provider, model, False, time.monotonic() - attempt_started, e
+            )
+            raise
+        finally:
+            self._track(provider, -1)
+            loop.call_soon_threadsafe(semaphore.release)
+
+    def cancel_all(self) -> int:
+        """Cancel every request currently queued or in flight"""
+        if self._loop is None:
+            return 0
+        tasks = list(self._tasks)
+        for task in tasks:
+            self._loop.call_soon_threadsafe(task.cancel)
+        return len(tasks)
+
+    def stats(self) -> Dict[str, Any]:
+        """Gateway counters and per-provider in-flight requests"""
+        eligible = self._hedges["eligible"]
+        with self._in_flight_lock:
+            in_flight = dict(self._in_flight)
+        return {
+            **self._counters,
+            "in_flight": in_flight,
+            "concurrency": dict(self.concurrency),
+            "latency": self.latency.summary(),
+            "hedging": {
+                "enabled": HEDGING_ENABLED,
+                "percentile": HEDGE_PERCENTILE,
+                **self._hedges,
+                "hedge_rate": round(self._hedges["fired"] / eligible, 3)
+                if eligible
+                else 0.0,
+            },
+            "tiering": {site: dict(v) for site, v in self._tiering.items()},
+        }
+
+
+_gateway = LLMGateway()
+
+# Half-open breakers are probed with the smallest possible completion.
+get_router().set_probe(
+    lambda provider, model: complete_chat(provider, model, "ping", max_tokens=1)
+)
+
+
+def get_gateway() -> LLMGateway:
+    """Process-wide LLM gateway"""
+    return _gateway
@@ -0,0 +1,201 @@
+"""
+Streaming downloads of generated media over a shared HTTP session.
+
+Images and video clips from ModelsLab are fetched through one pooled
+``requests.Session`` (keep-alive connections are reused across scenes and
+jobs) and streamed to disk in fixed-size chunks, so memory use per download
+is one chunk regardless of file size. Data goes to ``<dest>.part`` first; an
+interrupted transfer is resumed with a Range request, the received length is
+checked against Content-Length, and the file is renamed into place only when
+complete.
+"""
+
+import os
+import threading
+import time
+from typing import Any, Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from utils.platform_utils import replace_file
+
+MEDIA_CONNECT_TIMEOUT = float(os.getenv("MEDIA_CONNECT_TIMEOUT", "10"))
+# Maximum silence between chunks, not a cap on the whole download.
+MEDIA_READ_TIMEOUT = float(os.getenv("MEDIA_READ_TIMEOUT", "60"))
+MEDIA_CHUNK_SIZE = int(os.getenv("MEDIA_CHUNK_KB", "256")) * 1024
+MEDIA_FETCH_RETRIES = int(os.getenv("MEDIA_FETCH_RETRIES", "3"))
+MEDIA_POOL_SIZE = int(os.getenv("MEDIA_POOL_SIZE", "16"))
+
+
+class MediaDownloadError(RuntimeError):
+    """Raised when a download cannot be completed after all retries"""
+
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+_stats_lock = threading.Lock()
+_stats = {
+    "downloads": 0,
+    "failures": 0,
+    "resumed": 0,
+    "retries": 0,
+    "bytes": 0,
+    "seconds": 0.0,
+}
+
+
+def get_media_session() -> requests.Session:
+    """Process-wide keep-alive session for media requests"""
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(
+                pool_connections=MEDIA_POOL_SIZE, pool_maxsize=MEDIA_POOL_SIZE
+            )
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            _session = session
+        return _session
+
+
+def _count(field: str, amount: float = 1) -> None:
+    with _stats_lock:
+        _stats[field] += amount
+
+
+def _expected_total(response: requests.Response, offset: int) -> Optional[int]:
+    """Full file size implied by the response headers, if they state one"""
+    content_range = response.headers.get("Content-Range", "")
+    if response.status_code == 206 and "/" in content_range:
+        total = content_range.rsplit("/", 1)[1]
+        if total.isdigit():
+            return int(total)
+    length = response.headers.get("Content-Length")
+    if length and length.isdigit() and "Content-Encoding" not in response.headers:
+        return int(length) + (offset if response.status_code == 206 else 0)
+    return None
+
+
+def _transfer(url: str, part: str, timeout: Any) -> Optional[int]:
+    """Append the rest of ``url`` to ``part``; returns the expected total size"""
+    offset = os.path.getsize(part) if os.path.exists(part) else 0
+    headers = {"Range": f"bytes={offset}-"} if offset else {}
+    with get_media_session().get(
+        url, headers=headers, stream=True, timeout=timeout
+    ) as response:
+        if response.status_code == 416 and offset:
+            # Range starts at or past the end: the previous attempt finished.
+            total = response.headers.get("Content-Range", "").rsplit("/", 1)[-1]
+            return int(total) if total.isdigit() else offset
+        response.raise_for_status()
+        if offset and response.status_code == 206:
+            _count("resumed")
+            mode = "ab"
+        else:
+            # Server ignored the Range header and is sending the whole file.
+            offset = 0
+            mode = "wb"
+        expected = _expected_total(response, offset)
+        with open(part, mode) as f:
+            for chunk in response.iter_content(chunk_size=MEDIA_CHUNK_SIZE):
+                f.write(chunk)
+    return expected
+
+
+def fetch_media(
+    url: str,
+    dest: str,
+    retries: int = MEDIA_FETCH_RETRIES,
+    timeout: Any = None,
+) -> str:
+    """Stream ``url`` to ``dest``, resuming and verifying; returns ``dest``"""
+    timeout = timeout or (MEDIA_CONNECT_TIMEOUT, MEDIA_READ_TIMEOUT)
+    part = f"{dest}.part"
+    if os.path.exists(part):
+        os.remove(part)
+    started = time.time()
+    last_error: Optional[Exception] = None
+    for attempt in range(retries + 1):
+        if attempt:
+            _count("retries")
+            time.sleep(min(2 ** (attempt - 1), 10))
+        try:
+            expected = _transfer(url, part, timeout)
+        except requests.HTTPError as e:
+            status = e.response.status_code if e.response is not None else None
+            last_error = e
+            if status is not None and status < 500 and status != 429:
+                break
+            continue
+        except requests.RequestException as e:
+            # Dropped connections, timeouts and truncated bodies: resume.
+            last_error = e
+            continue
+
+        received = os.path.getsize(part)
+        if expected is not None and received != expected:
+            last_error = MediaDownloadError(
+                f"got {received} of {expected} bytes from {url}"
+            )
+            if received > expected:
+                os.remove(part)
+            continue
+        replace_file(part, dest)
+        _count("downloads")
+        _count("bytes", received)
+        _count("seconds", time.time() - started)
+        return dest
+
+    _count("failures")
+    if os.path.exists(part):
+        os.remove(part)
+    raise MediaDownloadError(f"Download of {url} failed: {last_error}")
+
+
+def fetch_media_bytes(
+    url: str, retries: int = MEDIA_FETCH_RETRIES, timeout: Any = None
+) -> bytes:
+    """Download a small asset (e.g. a still image) into memory, length-checked"""
+    timeout = timeout or (MEDIA_CONNECT_TIMEOUT, MEDIA_READ_TIMEOUT)
+    started = time.time()
+    last_error: Optional[Exception] = None
+    for attempt in range(retries + 1):
+        if attempt:
+            _count("retries")
+            time.sleep(min(2 ** (attempt - 1), 10))
+        try:
+            response = get_media_session().get(url, timeout=timeout)
+            response.raise_for_status()
+        except requests.HTTPError as e:
+            status = e.response.status_code if e.response is not None else None
+            last_error = e
+            if status is not None and status < 500 and status != 429:
+                break
+            continue
+        except requests.RequestException as e:
+            last_error = e
+            continue
+        data = response.content
+        expected = _expected_total(response, 0)
+        if expected is not None and len(data) != expected:
+            last_error = MediaDownloadError(
+                f"got {len(data)} of {expected} bytes from {url}"
+            )
+            continue
+        _count("downloads")
+        _count("bytes", len(data))
+        _count("seconds", time.time() - started)
+        return data
+
+    _count("failures")
+    raise MediaDownloadError(f"Download of {url} failed: {last_error}")
+
+
+def get_media_fetch_stats() -> Dict[str, Any]:
+    with _stats_lock:
+        stats = dict(_stats)
+    stats["seconds"] = round(stats["seconds"], 2)
+    stats["chunk_kb"] = MEDIA_CHUNK_SIZE // 1024
+    return stats
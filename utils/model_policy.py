@@ -0,0 +1,172 @@
+"""
+Declarative per-task model policy.
+
+Each call site names a chain of model tiers plus its generation settings and,
+optionally, a quality gate. The gateway starts on the first (cheapest) tier and
+escalates along the chain only when the output fails the gate, so one-line
+tasks such as topic suggestions stop paying for GPT-4 by default.
+
+Policies can be overridden without code changes by pointing MODEL_POLICY_PATH
+at a JSON file with the same shape as ``MODEL_POLICIES``.
+"""
+
+import json
+import os
+from typing import Any, Callable, Dict, Optional
+
+# Concrete model per provider for each tier.
+MODEL_TIERS = {
+    "small": {
+        "openai": os.getenv("MODEL_TIER_SMALL_OPENAI", "gpt-4o-mini"),
+        "azure": os.getenv("MODEL_TIER_SMALL_AZURE", "openai/gpt-4.1-mini"),
+    },
+    "large": {
+        "openai": os.getenv("MODEL_TIER_LARGE_OPENAI", "gpt-4"),
+        "azure": os.getenv("AZURE_MODEL", "openai/gpt-4.1"),
+    },
+}
+
+MODEL_POLICIES: Dict[str, Dict[str, Any]] = {
+    "trending_topic": {
+        "models": ["small", "large"],
+        "max_tokens": 60,
+        "temperature": 1.0,
+        "validator": "one_liner",
+    },
+    "viral_ideas": {
+        "models": ["small", "large"],
+        "max_tokens": 300,
+        "temperature": 0.8,
+        "validator": "non_empty",
+    },
+    "thumbnail_idea": {
+        "models": ["small", "large"],
+        "max_tokens": 300,
+        "temperature": 0.7,
+        "validator": "non_empty",
+    },
+    "seo_metadata": {
+        "models": ["small", "large"],
+        "max_tokens": 300,
+        "temperature": 0.5,
+        "validator": "seo_metadata",
+    },
+    "scene_plan": {
+        "models": ["small", "large"],
+        "max_tokens": 700,
+        "temperature": None,
+        "validator": "scene_plan",
+    },
+    "video_script": {
+        "models": ["large"],
+        "max_tokens": None,
+        "temperature": 1.0,
+        "validator": "non_empty",
+    },
+    "short_script": {
+        "models": ["large"],
+        "max_tokens": 500,
+        "temperature": 0.9,
+        "validator": "non_empty",
+    },
+    "default": {
+        "models": ["large"],
+        "max_tokens": None,
+        "temperature": 1.0,
+        "validator": None,
+    },
+}
+
+
+def _load_overrides() -> None:
+    path = os.getenv("MODEL_POLICY_PATH")
+    if not path or not os.path.isfile(path):
+        return
+    try:
+        with open(path, "r") as f:
+            overrides = json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        print(f"⚠️ Ignoring invalid model policy file {path}: {e}")
+        return
+    for call_site, policy in overrides.get("policies", overrides).items():
+        if call_site == "tiers":
+            continue
+        MODEL_POLICIES.setdefault(call_site, {}).update(policy)
+    for tier, models in overrides.get("tiers", {}).items():
+        MODEL_TIERS.setdefault(tier, {}).update(models)
+
+
+_load_overrides()
+
+
+def _one_liner(text: str) -> bool:
+    stripped = text.strip()
+    return 0 < len(stripped) <= 200 and stripped.count("\n") <= 1
+
+
+def _scene_plan(text: str) -> bool:
+    """At least one complete shot (narration plus image prompt)"""
+    lowered = text.lower()
+    return "narration:" in lowered and "prompt:" in lowered
+
+
+VALIDATORS: Dict[str, Callable[[str], bool]] = {
+    "non_empty": lambda text: bool(text and text.strip()),
+    "one_liner": _one_liner,
+    "scene_plan": _scene_plan,
+}
+
+
+def register_validator(name: str, fn: Callable[[str], bool]) -> None:
+    """Register a quality gate that policies can refer to by name"""
+    VALIDATORS[name] = fn
+
+
+def get_validator(name: Optional[str]) -> Optional[Callable[[Optional[str]], bool]]:
+    """Resolve a validator name; unknown names fall back to non-empty"""
+    if not name:
+        return None
+    fn = VALIDATORS.get(name, VALIDATORS["non_empty"])
+    return lambda text: bool(text) and fn(text)
+
+
+def get_policy(call_site: str) -> Dict[str, Any]:
+    return MODEL_POLICIES.get(call_site, MODEL_POLICIES["default"])
+
+
+def resolve_model(provider: str, model: str) -> str:
+    """Map a tier name to the provider's concrete model (other names pass through)"""
+    tier = MODEL_TIERS.get(model)
+    if tier is None:
+        return model
+    return tier.get(provider) or MODEL_TIERS["large"].get(provider, model)
+
+
+def policy_request(
+    call_site: str,
+    prompt: str,
+    system_message: Optional[str] = None,
+    provider: str = "auto",
+    **overrides: Any,
+) -> Dict[str, Any]:
+    """Build a gateway request from the call site's policy
+
+    Requests are routed by provider health unless ``provider`` pins one.
+    ``overrides`` replace individual settings (e.g. ``models=["large"]`` to
+    skip the cheap tier, or ``bypass_cache=True``).
+    """
+    policy = {**get_policy(call_site), **overrides}
+    models = list(policy.pop("models"))
+    request = {
+        "call_site": call_site,
+        "prompt": prompt,
+        "system_message": system_message,
+        "provider": provider,
+        "model": models[0],
+        "fallback_models": models[1:],
+        "temperature": policy.pop("temperature", None),
+        "max_tokens": policy.pop("max_tokens", None),
+        "validator": policy.pop("validator", None),
+    }
+    request.update(policy)
+    return request
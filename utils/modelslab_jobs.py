@@ -0,0 +1,280 @@
+"""
+Asynchronous ModelsLab text2video jobs.
+
+ModelsLab renders video in the background: a submission usually answers
+"queued"/"processing" with a job id and a fetch URL, and the clip appears
+later. ``ModelsLabJobClient`` submits every scene up front, then tracks all
+jobs at once, either polling each with exponential backoff or, when
+MODELSLAB_WEBHOOK_URL is set, waiting for ModelsLab to call the Flask app's
+``/modelslab/webhook`` endpoint (with slow polling kept as a backstop).
+Each clip is downloaded as soon as its job completes, while the others are
+still rendering.
+"""
+
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from utils.media_fetch import MEDIA_CONNECT_TIMEOUT, fetch_media, get_media_session
+from utils.platform_utils import normalize_path
+from utils.rate_limiter import rate_limited_call
+
+MODELSLAB_API_BASE = os.getenv("MODELSLAB_API_BASE", "https://modelslab.com/api/v6")
+# Public URL of this app's /modelslab/webhook route; unset means poll only.
+MODELSLAB_WEBHOOK_URL = os.getenv("MODELSLAB_WEBHOOK_URL") or None
+POLL_INITIAL = float(os.getenv("MODELSLAB_POLL_INITIAL", "5"))
+POLL_MAX = float(os.getenv("MODELSLAB_POLL_MAX", "30"))
+POLL_BACKOFF = 1.5
+JOB_TIMEOUT = float(os.getenv("MODELSLAB_JOB_TIMEOUT", "900"))
+DOWNLOAD_WORKERS = int(os.getenv("MODELSLAB_DOWNLOAD_WORKERS", "4"))
+REQUEST_TIMEOUT = float(os.getenv("MODELSLAB_REQUEST_TIMEOUT", "60"))
+
+PENDING_STATES = ("queued", "processing")
+
+
+class ModelsLabJobError(RuntimeError):
+    """Raised when a video job fails, times out or returns no clip"""
+
+
+class VideoJob:
+    """One scene's text2video job and where it has got to"""
+
+    def __init__(self, idx: int, prompt: str):
+        self.idx = idx
+        self.prompt = prompt
+        self.track_id = uuid.uuid4().hex
+        self.job_id: Optional[str] = None
+        self.fetch_url: Optional[str] = None
+        self.status = "new"
+        self.output_url: Optional[str] = None
+        self.path: Optional[str] = None
+        self.error: Optional[str] = None
+        self.submitted_at = 0.0
+        self.finished_at = 0.0
+        self.next_poll = 0.0
+        self.delay = POLL_INITIAL
+        self.polls = 0
+
+    @property
+    def pending(self) -> bool:
+        return self.status in PENDING_STATES
+
+
+def _output_url(data: Dict[str, Any]) -> Optional[str]:
+    output = data.get("output")
+    if isinstance(output, list) and output:
+        return output[0]
+    return data.get("video") or (output if isinstance(output, str) else None)
+
+
+_webhook_jobs: Dict[str, Tuple["ModelsLabJobClient", VideoJob]] = {}
+_webhook_lock = threading.Lock()
+
+
+def handle_webhook(payload: Dict[str, Any]) -> bool:
+    """Route a ModelsLab webhook call to the job waiting for it"""
+    track_id = str(payload.get("track_id") or "")
+    with _webhook_lock:
+        entry = _webhook_jobs.get(track_id)
+    if entry is None:
+        return False
+    client, job = entry
+    client.on_webhook(job, payload)
+    return True
+
+
+class ModelsLabJobClient:
+    """Submits text2video jobs and collects their clips concurrently"""
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        api_base: str = MODELSLAB_API_BASE,
+        webhook_url: Optional[str] = MODELSLAB_WEBHOOK_URL,
+        poll_initial: float = POLL_INITIAL,
+        poll_max: float = POLL_MAX,
+    ):
+        self.api_key = api_key or os.getenv("MODELSLAB_API_KEY")
+        self.api_base = api_base.rstrip("/")
+        self.webhook_url = webhook_url
+        self.poll_initial = poll_initial
+        self.poll_max = poll_max
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+
+    def _post(self, url: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        def post():
+            response = get_media_session().post(
+                url, json=payload, timeout=(MEDIA_CONNECT_TIMEOUT, REQUEST_TIMEOUT)
+            )
+            response.raise_for_status()
+            return response
+
+        return rate_limited_call("modelslab", post).json()
+
+    def _apply(self, job: VideoJob, data: Dict[str, Any]) -> None:
+        """Update a job from a submit, fetch or webhook response"""
+        if job.status in ("done", "failed"):
+            return
+        status = str(data.get("status", "")).lower()
+        if data.get("id") is not None:
+            job.job_id = str(data["id"])
+        job.fetch_url = data.get("fetch_result") or job.fetch_url
+        url = _output_url(data)
+        now = time.time()
+        if status == "success" and url:
+            job.status = "done"
+            job.output_url = url
+            job.finished_at = now
+        elif status in PENDING_STATES or status in ("pending", "starting"):
+            job.status = "queued" if status in ("queued", "pending") else "processing"
+            eta = data.get("eta")
+            wait = job.delay
+            if isinstance(eta, (int, float)) and job.polls == 0:
+                wait = min(max(float(eta), self.poll_initial), self.poll_max)
+            if self.webhook_url:
+                # The webhook should arrive first; polling is only a backstop.
+                wait = self.poll_max
+            job.next_poll = now + wait
+        else:
+            job.status = "failed"
+            # ModelsLab spells it "messege" in some responses.
+            job.error = data.get("message") or data.get("messege") or f"status {status!r}"
+            job.finished_at = now
+
+    def submit(self, job: VideoJob) -> VideoJob:
+        payload = {
+            "key": self.api_key,
+            "prompt": job.prompt,
+            "aspect_ratio": "16:9",
+            "duration": 4,
+            "motion": "medium",
+            "quality": "medium",
+            "webhook": self.webhook_url,
+            "track_id": job.track_id if self.webhook_url else None,
+            "seed": None,
+        }
+        if self.webhook_url:
+            with _webhook_lock:
+                _webhook_jobs[job.track_id] = (self, job)
+        data = self._post(f"{self.api_base}/video/text2video_ultra", payload)
+        with self._lock:
+            job.submitted_at = time.time()
+            job.delay = self.poll_initial
+            self._apply(job, data)
+        return job
+
+    def poll(self, job: VideoJob) -> VideoJob:
+        url = job.fetch_url or f"{self.api_base}/video/fetch/{job.job_id}"
+        data = self._post(url, {"key": self.api_key})
+        with self._lock:
+            job.polls += 1
+            job.delay = min(job.delay * POLL_BACKOFF, self.poll_max)
+            self._apply(job, data)
+        return job
+
+    def on_webhook(self, job: VideoJob, data: Dict[str, Any]) -> None:
+        with self._lock:
+            self._apply(job, data)
+        self._wake.set()
+
+    def run(self, prompts: Sequence[str], workdir: str, timeout: float = JOB_TIMEOUT):
+        """Generate one clip per prompt; returns the jobs in prompt order"""
+        return self.run_jobs(
+            [VideoJob(i, prompt) for i, prompt in enumerate(prompts)], workdir, timeout
+        )
+
+    def run_jobs(
+        self, jobs: List[VideoJob], workdir: str, timeout: float = JOB_TIMEOUT
+    ) -> List[VideoJob]:
+        """Submit every job, then poll/await them and download finished clips
+
+        Jobs that fail, time out or cannot be downloaded keep ``path`` unset
+        and carry the reason in ``error``.
+        """
+        started = time.time()
+        for job in jobs:
+            try:
+                self.submit(job)
+            except Exception as e:
+                job.status, job.error = "failed", f"submit failed: {e}"
+        print(
+            f"🎞️ Submitted {len(jobs)} video jobs "
+            f"({'webhook' if self.webhook_url else 'polling'} mode)"
+        )
+
+        downloads: Dict[int, Future] = {}
+        deadline = started + timeout
+        with ThreadPoolExecutor(
+            max_workers=DOWNLOAD_WORKERS, thread_name_prefix="clip-download"
+        ) as pool:
+            while True:
+                with self._lock:
+                    for job in jobs:
+                        if job.status == "done" and job.idx not in downloads:
+                            print(
+                                f"📥 Scene {job.idx + 1} clip ready after "
+                                f"{job.finished_at - job.submitted_at:.1f}s"
+                            )
+                            dest = normalize_path(
+                                os.path.join(workdir, f"scene_{job.idx:02d}.mp4")
+                            )
+                            downloads[job.idx] = pool.submit(
+                                fetch_media, job.output_url, dest
+                            )
+                    pending = [job for job in jobs if job.pending]
+                if not pending:
+                    break
+                if time.time() > deadline:
+                    for job in pending:
+                        job.status = "failed"
+                        job.error = f"not finished after {timeout:g}s"
+                    break
+                for job in pending:
+                    if job.pending and job.next_poll <= time.time():
+                        try:
+                            self.poll(job)
+                        except Exception as e:
+                            job.next_poll = time.time() + job.delay
+                            print(f"⚠️ Poll of scene {job.idx + 1} failed: {e}")
+                with self._lock:
+                    waits = [job.next_poll for job in jobs if job.pending]
+                    ready = any(
+                        job.status == "done" and job.idx not in downloads
+                        for job in jobs
+                    )
+                if waits and not ready:
+                    self._wake.wait(max(0.0, min(waits) - time.time()))
+                    self._wake.clear()
+
+            for job in jobs:
+                if job.idx not in downloads:
+                    continue
+                try:
+                    job.path = downloads[job.idx].result()
+                except Exception as e:
+                    job.status, job.error = "failed", f"download failed: {e}"
+
+        if self.webhook_url:
+            with _webhook_lock:
+                for job in jobs:
+                    _webhook_jobs.pop(job.track_id, None)
+        done = sum(1 for job in jobs if job.path)
+        print(
+            f"⏱️ {done}/{len(jobs)} clips in {time.time() - started:.1f}s, "
+            f"{sum(job.polls for job in jobs)} polls"
+        )
+        return jobs
+
+
+def generate_clips(prompts: Sequence[str], workdir: str) -> List[str]:
+    """Clip paths for every prompt, in order; raises if any scene failed"""
+    jobs = ModelsLabJobClient().run(prompts, workdir)
+    failed = [job for job in jobs if not job.path]
+    if failed:
+        reasons = "; ".join(f"scene {job.idx + 1}: {job.error}" for job in failed)
+        raise ModelsLabJobError(f"Video generation failed for {reasons}")
+    return [job.path for job in jobs]
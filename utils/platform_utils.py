@@ -1,5 +1,7 @@
 import os
 import sys
+import stat
+import shutil
 import platform
 import subprocess
 from pathlib import Path
@@ -133,6 +135,63 @@ def ensure_directory(path: Union[str, Path]) -> str:
     return str(path_obj)
 
 
+def _clear_readonly_and_retry(func, path, _error) -> None:
+    """rmtree error handler: on Windows drop the read-only attribute and retry
+
+    Elsewhere read-only files unlink as they are, and a chmod on a hard link
+    would also make the cached blob it shares an inode with writable.
+    """
+    if not is_windows():
+        return
+    try:
+        os.chmod(path, stat.S_IREAD | stat.S_IWRITE)
+        func(path)
+    except OSError:
+        pass
+
+
+def remove_tree(path: Union[str, Path]) -> None:
+    """Remove a directory tree, best effort, including read-only files
+
+    Windows refuses to delete read-only files (such as hard links to cached
+    assets), so those are made writable and retried rather than left behind.
+    """
+    if sys.version_info >= (3, 12):
+        shutil.rmtree(path, onexc=_clear_readonly_and_retry)
+    else:
+        shutil.rmtree(path, onerror=_clear_readonly_and_retry)
+
+
+def remove_file(path: Union[str, Path]) -> None:
+    """Remove a file, clearing a read-only attribute if it blocks the removal
+
+    Only Windows refuses to delete read-only files, so only there is the
+    attribute cleared.
+    """
+    try:
+        os.remove(path)
+    except PermissionError:
+        if not is_windows():
+            raise
+        os.chmod(path, stat.S_IREAD | stat.S_IWRITE)
+        os.remove(path)
+
+
+def replace_file(src: Union[str, Path], dest: Union[str, Path]) -> None:
+    """``os.replace`` that also replaces a read-only ``dest`` on Windows
+
+    Finished files are renamed over their destination instead of written
+    through it, since ``dest`` may be a read-only hard link to a cached blob.
+    """
+    try:
+        os.replace(src, dest)
+    except PermissionError:
+        if not is_windows() or not os.path.exists(dest):
+            raise
+        remove_file(dest)
+        os.replace(src, dest)
+
+
 def get_python_executable() -> str:
     """Get the current Python executable path"""
     return sys.executable
@@ -0,0 +1,257 @@
+"""
+Health-weighted routing across LLM endpoints with per-endpoint circuit breakers.
+
+Every completion reports its outcome and latency here. Traffic for requests
+routed with ``provider="auto"`` is spread across healthy endpoints in
+proportion to their success rate and speed. An endpoint whose error rate (or
+failure streak) crosses the threshold has its breaker opened; a background
+thread probes it once the cooldown has passed and closes the breaker again
+when the probe succeeds. An operator override (``/switch_ai``) pins traffic to
+one provider for as long as its breaker is closed.
+"""
+
+import os
+import random
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from utils.ai_clients import provider_available
+
+ROUTER_WINDOW = int(os.getenv("ROUTER_WINDOW", "50"))
+ROUTER_WINDOW_SECONDS = float(os.getenv("ROUTER_WINDOW_SECONDS", "300"))
+BREAKER_ERROR_RATE = float(os.getenv("BREAKER_ERROR_RATE", "0.5"))
+BREAKER_MIN_REQUESTS = int(os.getenv("BREAKER_MIN_REQUESTS", "5"))
+BREAKER_FAILURE_STREAK = int(os.getenv("BREAKER_FAILURE_STREAK", "3"))
+BREAKER_COOLDOWN = float(os.getenv("BREAKER_COOLDOWN", "30"))
+BREAKER_MAX_COOLDOWN = float(os.getenv("BREAKER_MAX_COOLDOWN", "600"))
+PROBE_INTERVAL = float(os.getenv("ROUTER_PROBE_INTERVAL", "10"))
+
+# Endpoints eligible for provider="auto" routing, as (provider, model).
+ROUTED_ENDPOINTS = [
+    ("openai", "gpt-4"),
+    ("azure", os.getenv("AZURE_MODEL", "openai/gpt-4.1")),
+]
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+Endpoint = Tuple[str, str]
+
+
+class NoHealthyEndpoint(RuntimeError):
+    """Raised when no routed endpoint is configured and available"""
+
+
+class EndpointHealth:
+    """Rolling outcomes and breaker state for one (provider, model)"""
+
+    def __init__(self):
+        self.outcomes: deque = deque(maxlen=ROUTER_WINDOW)
+        self.state = CLOSED
+        self.failure_streak = 0
+        self.opened_at = 0.0
+        self.cooldown = BREAKER_COOLDOWN
+        self.trips = 0
+        self.last_error: Optional[str] = None
+
+    def _recent(self) -> List[Tuple[float, bool, float]]:
+        cutoff = time.time() - ROUTER_WINDOW_SECONDS
+        return [o for o in self.outcomes if o[0] >= cutoff]
+
+    def error_rate(self) -> float:
+        recent = self._recent()
+        if not recent:
+            return 0.0
+        return sum(1 for _, ok, _ in recent if not ok) / len(recent)
+
+    def median_latency(self) -> Optional[float]:
+        latencies = sorted(lat for _, ok, lat in self._recent() if ok)
+        return latencies[len(latencies) // 2] if latencies else None
+
+    def weight(self) -> float:
+        """Routing weight: favour low error rates and low latency"""
+        success = 1.0 - self.error_rate()
+        latency = self.median_latency() or 1.0
+        return max(0.01, success * success / max(latency, 0.25))
+
+
+class ProviderRouter:
+    """Chooses endpoints by health and trips breakers on failing ones"""
+
+    def __init__(
+        self,
+        endpoints: Iterable[Endpoint] = ROUTED_ENDPOINTS,
+        is_available: Callable[[str], bool] = provider_available,
+    ):
+        self.endpoints = list(endpoints)
+        self.is_available = is_available
+        self.override: Optional[str] = None
+        self._lock = threading.Lock()
+        self._health: Dict[Endpoint, EndpointHealth] = {}
+        self._prober: Optional[threading.Thread] = None
+        self._probe_fn: Optional[Callable[[str, str], Any]] = None
+
+    def _get(self, endpoint: Endpoint) -> EndpointHealth:
+        health = self._health.get(endpoint)
+        if health is None:
+            health = self._health[endpoint] = EndpointHealth()
+        return health
+
+    def set_override(self, provider: Optional[str]) -> None:
+        """Pin routed traffic to ``provider`` (None or "auto" clears it)"""
+        self.override = None if provider in (None, "auto") else provider
+
+    def routed_endpoint(self, provider: str, model: str) -> Endpoint:
+        """The routed endpoint whose health a call to (provider, model) counts for
+
+        Tiered call sites ask for other models (gpt-4o-mini and the like) on
+        the same provider; their outcomes count towards that provider's
+        routed endpoint, since routing and failover only read those.
+        """
+        for endpoint in self.endpoints:
+            if endpoint[0] == provider:
+                return endpoint
+        return (provider, model)
+
+    def record(
+        self, provider: str, model: str, ok: bool, latency: float, error: Any = None
+    ) -> None:
+        """Report the outcome of one call to an endpoint"""
+        provider, model = self.routed_endpoint(provider, model)
+        with self._lock:
+            health = self._get((provider, model))
+            health.outcomes.append((time.time(), ok, latency))
+            if ok:
+                health.failure_streak = 0
+                if health.state == HALF_OPEN:
+                    self._close(health)
+                return
+            health.failure_streak += 1
+            health.last_error = str(error)[:200] if error else None
+            if health.state == HALF_OPEN:
+                self._open(health, backoff=True)
+            elif health.state == CLOSED and self._should_trip(health):
+                self._open(health)
+                print(f"🔌 Circuit breaker opened for {provider}/{model}")
+            else:
+                return
+        self._ensure_prober()
+
+    def _should_trip(self, health: EndpointHealth) -> bool:
+        if health.failure_streak >= BREAKER_FAILURE_STREAK:
+            return True
+        recent = health._recent()
+        return (
+            len(recent) >= BREAKER_MIN_REQUESTS
+            and health.error_rate() >= BREAKER_ERROR_RATE
+        )
+
+    def _open(self, health: EndpointHealth, backoff: bool = False) -> None:
+        if backoff:
+            health.cooldown = min(BREAKER_MAX_COOLDOWN, health.cooldown * 2)
+        health.state = OPEN
+        health.opened_at = time.time()
+        health.trips += 1
+
+    def _close(self, health: EndpointHealth) -> None:
+        health.state = CLOSED
+        health.cooldown = BREAKER_COOLDOWN
+        health.failure_streak = 0
+        health.outcomes.clear()
+
+    def candidates(self, exclude: Iterable[Endpoint] = ()) -> List[Endpoint]:
+        """Routable endpoints in preference order (override first, then weight)"""
+        excluded = set(exclude)
+        with self._lock:
+            usable = [
+                e
+                for e in self.endpoints
+                if e not in excluded and self.is_available(e[0])
+            ]
+            closed = [e for e in usable if self._get(e).state == CLOSED]
+            weights = {e: self._get(e).weight() for e in closed}
+
+        ordered: List[Endpoint] = []
+        pinned = [e for e in closed if e[0] == self.override]
+        ordered.extend(pinned)
+        pool = [e for e in closed if e not in pinned]
+        while pool:
+            choice = random.choices(pool, weights=[weights[e] for e in pool])[0]
+            ordered.append(choice)
+            pool.remove(choice)
+        # Fall back to tripped endpoints rather than failing outright.
+        ordered.extend(e for e in usable if e not in ordered)
+        return ordered
+
+    def choose(self, exclude: Iterable[Endpoint] = ()) -> Endpoint:
+        """Pick one endpoint for the next routed request"""
+        candidates = self.candidates(exclude)
+        if not candidates:
+            raise NoHealthyEndpoint("No AI provider is configured and available")
+        return candidates[0]
+
+    def set_probe(self, probe_fn: Callable[[str, str], Any]) -> None:
+        """Register the call used to probe half-open endpoints"""
+        self._probe_fn = probe_fn
+
+    def _ensure_prober(self) -> None:
+        """Start the background prober the first time a breaker opens"""
+        with self._lock:
+            if self._prober is not None or self._probe_fn is None:
+                return
+            self._prober = threading.Thread(
+                target=self._probe_loop, name="provider-prober", daemon=True
+            )
+            self._prober.start()
+
+    def _probe_loop(self) -> None:
+        while True:
+            time.sleep(PROBE_INTERVAL)
+            due = []
+            with self._lock:
+                now = time.time()
+                for endpoint, health in self._health.items():
+                    cooled = now - health.opened_at >= health.cooldown
+                    if health.state == OPEN and cooled:
+                        health.state = HALF_OPEN
+                        due.append(endpoint)
+            for provider, model in due:
+                started = time.monotonic()
+                try:
+                    self._probe_fn(provider, model)
+                except Exception as e:
+                    self.record(provider, model, False, time.monotonic() - started, e)
+                    print(f"⚠️ Probe of {provider}/{model} failed: {e}")
+                else:
+                    self.record(provider, model, True, time.monotonic() - started)
+                    print(f"✅ {provider}/{model} recovered, breaker closed")
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Breaker states, error rates, latency and weights per endpoint"""
+        with self._lock:
+            endpoints = {}
+            for endpoint in self.endpoints + [
+                e for e in self._health if e not in self.endpoints
+            ]:
+                health = self._get(endpoint)
+                latency = health.median_latency()
+                endpoints["/".join(endpoint)] = {
+                    "state": health.state,
+                    "available": self.is_available(endpoint[0]),
+                    "error_rate": round(health.error_rate(), 3),
+                    "p50_latency": round(latency, 3) if latency else None,
+                    "weight": round(health.weight(), 3),
+                    "trips": health.trips,
+                    "cooldown": health.cooldown,
+                    "last_error": health.last_error,
+                }
+        return {"override": self.override, "endpoints": endpoints}
+
+
+_router = ProviderRouter()
+
+
+def get_router() -> ProviderRouter:
+    """Process-wide provider router"""
+    return _router
@@ -0,0 +1,414 @@
+"""
+Token-bucket rate limiting for external providers.
+
+Each provider has a requests-per-minute bucket and, where the provider meters
+tokens, a tokens-per-minute bucket. Bucket state lives in SQLite so threads
+and the ``multiprocessing`` workers started by ``main.main`` draw from the same
+quota. A 429 blocks the provider until its Retry-After has passed and halves
+its refill rate; successes ramp the rate back up to the configured ceiling.
+"""
+
+import email.utils
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+RATE_LIMIT_DB = os.getenv("RATE_LIMIT_DB", "rate_limits.db")
+RATE_LIMIT_MAX_WAIT = float(os.getenv("RATE_LIMIT_MAX_WAIT", "300"))
+RATE_LIMIT_MAX_RETRIES = int(os.getenv("RATE_LIMIT_MAX_RETRIES", "4"))
+
+# Defaults per provider; override with RATE_LIMIT_<PROVIDER>_RPM / _TPM.
+# A TPM of 0 means the provider is not metered by tokens.
+DEFAULT_LIMITS = {
+    "openai": {"rpm": 500, "tpm": 30000},
+    "azure": {"rpm": 15, "tpm": 8000},
+    "modelslab": {"rpm": 60, "tpm": 0},
+    "elevenlabs": {"rpm": 100, "tpm": 0},
+    "youtube": {"rpm": 60, "tpm": 0},
+}
+
+MIN_RATE_SCALE = 0.1
+RATE_SCALE_RECOVERY = 0.05
+
+
+class RateLimitTimeout(TimeoutError):
+    """Raised when a caller would have to wait longer than allowed for quota"""
+
+
+def get_limits(provider: str) -> Dict[str, float]:
+    """Configured RPM/TPM ceilings for a provider"""
+    defaults = DEFAULT_LIMITS.get(provider, {"rpm": 60, "tpm": 0})
+    prefix = f"RATE_LIMIT_{provider.upper()}"
+    return {
+        "rpm": float(os.getenv(f"{prefix}_RPM", defaults["rpm"])),
+        "tpm": float(os.getenv(f"{prefix}_TPM", defaults["tpm"])),
+    }
+
+
+def estimate_tokens(*texts: Optional[str], max_tokens: Optional[int] = None) -> int:
+    """Rough prompt + completion token estimate used to charge the TPM bucket"""
+    prompt_tokens = sum(len(t) for t in texts if t) // 4
+    return prompt_tokens + (max_tokens or 500)
+
+
+def tokens_used(response: Any) -> Optional[int]:
+    """Actual token count reported in a response's ``usage``, if any"""
+    total = getattr(getattr(response, "usage", None), "total_tokens", None)
+    return total if isinstance(total, int) else None
+
+
+def is_rate_limited(error: BaseException) -> bool:
+    """True if an SDK or HTTP error represents a 429 response"""
+    # googleapiclient's HttpError carries its response as ``resp``.
+    sources = (error, getattr(error, "response", None), getattr(error, "resp", None))
+    for source in sources:
+        status = getattr(source, "status_code", None) or getattr(source, "status", None)
+        if str(status) == "429":
+            return True
+    return type(error).__name__ == "RateLimitError"
+
+
+def retry_after_seconds(error: BaseException) -> Optional[float]:
+    """Extract Retry-After (seconds or HTTP date) from an error's response"""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or getattr(error, "resp", None) or {}
+    try:
+        millis = headers.get("retry-after-ms")
+        if millis:
+            return float(millis) / 1000.0
+        value = headers.get("retry-after") or headers.get("Retry-After")
+    except AttributeError:
+        return None
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        parsed = email.utils.parsedate_to_datetime(value)
+        return max(0.0, parsed.timestamp() - time.time()) if parsed else None
+
+
+class RateLimiter:
+    """Cross-process token buckets persisted in SQLite"""
+
+    def __init__(self, db_path: str = RATE_LIMIT_DB):
+        self.db_path = db_path
+        self._init_lock = threading.Lock()
+        self._initialized = False
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        if not self._initialized:
+            with self._init_lock:
+                conn.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS rate_buckets (
+                        provider TEXT PRIMARY KEY,
+                        rpm_level REAL,
+                        tpm_level REAL,
+                        rate_scale REAL,
+                        blocked_until REAL,
+                        throttle_streak INTEGER,
+                        throttled_total INTEGER,
+                        granted_total INTEGER,
+                        updated_at REAL
+                    )
+                """
+                )
+                self._initialized = True
+        return conn
+
+    def _load(
+        self, conn: sqlite3.Connection, provider: str, now: float, create: bool = True
+    ) -> Dict:
+        """Read a bucket (creating it full) and refill it up to ``now``
+
+        With ``create=False`` a missing bucket is returned full but not
+        inserted, so read-only callers never write.
+        """
+        limits = get_limits(provider)
+        row = conn.execute(
+            """
+            SELECT rpm_level, tpm_level, rate_scale, blocked_until, throttle_streak,
+                   throttled_total, granted_total, updated_at
+            FROM rate_buckets WHERE provider = ?
+        """,
+            (provider,),
+        ).fetchone()
+        if row is None:
+            bucket = {
+                "rpm_level": limits["rpm"],
+                "tpm_level": limits["tpm"],
+                "rate_scale": 1.0,
+                "blocked_until": 0.0,
+                "throttle_streak": 0,
+                "throttled_total": 0,
+                "granted_total": 0,
+                "updated_at": now,
+            }
+            if not create:
+                return bucket
+            conn.execute(
+                """
+                INSERT INTO rate_buckets VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+                (provider, *bucket.values()),
+            )
+            return bucket
+
+        keys = (
+            "rpm_level",
+            "tpm_level",
+            "rate_scale",
+            "blocked_until",
+            "throttle_streak",
+            "throttled_total",
+            "granted_total",
+            "updated_at",
+        )
+        bucket = dict(zip(keys, row))
+        elapsed = max(0.0, now - bucket["updated_at"])
+        scale = bucket["rate_scale"]
+        for name in ("rpm", "tpm"):
+            capacity = limits[name]
+            level = bucket[f"{name}_level"] + elapsed * capacity / 60.0 * scale
+            bucket[f"{name}_level"] = min(capacity, level)
+        bucket["updated_at"] = now
+        return bucket
+
+    def _store(self, conn: sqlite3.Connection, provider: str, bucket: Dict) -> None:
+        conn.execute(
+            """
+            UPDATE rate_buckets SET rpm_level = ?, tpm_level = ?, rate_scale = ?,
+                blocked_until = ?, throttle_streak = ?, throttled_total = ?,
+                granted_total = ?, updated_at = ?
+            WHERE provider = ?
+        """,
+            (
+                bucket["rpm_level"],
+                bucket["tpm_level"],
+                bucket["rate_scale"],
+                bucket["blocked_until"],
+                bucket["throttle_streak"],
+                bucket["throttled_total"],
+                bucket["granted_total"],
+                bucket["updated_at"],
+                provider,
+            ),
+        )
+
+    def _update(self, provider: str, change: Callable[[Dict, float], Any]) -> Any:
+        """Apply ``change`` to a refilled bucket inside one write transaction"""
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                now = time.time()
+                bucket = self._load(conn, provider, now)
+                result = change(bucket, now)
+                self._store(conn, provider, bucket)
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+            return result
+        finally:
+            conn.close()
+
+    def _peek(self, provider: str) -> Dict:
+        """A refilled copy of the bucket, read without taking the write lock"""
+        conn = self._connect()
+        try:
+            return self._load(conn, provider, time.time(), create=False)
+        finally:
+            conn.close()
+
+    def try_acquire(self, provider: str, tokens: int = 0) -> float:
+        """Take one request (and ``tokens``) if available; else seconds to wait"""
+        limits = get_limits(provider)
+        tokens = min(tokens, limits["tpm"]) if limits["tpm"] else 0
+
+        def change(bucket, now):
+            if bucket["blocked_until"] > now:
+                return bucket["blocked_until"] - now
+            scale = bucket["rate_scale"]
+            waits = [0.0]
+            if bucket["rpm_level"] < 1:
+                rate = limits["rpm"] / 60.0 * scale
+                waits.append((1 - bucket["rpm_level"]) / rate)
+            if tokens and bucket["tpm_level"] < tokens:
+                rate = limits["tpm"] / 60.0 * scale
+                waits.append((tokens - bucket["tpm_level"]) / rate)
+            wait = max(waits)
+            if wait == 0.0:
+                bucket["rpm_level"] -= 1
+                bucket["tpm_level"] -= tokens
+                bucket["granted_total"] += 1
+            return wait
+
+        return self._update(provider, change)
+
+    def acquire(
+        self, provider: str, tokens: int = 0, max_wait: Optional[float] = None
+    ) -> float:
+        """Block until the provider has quota; returns the seconds spent waiting"""
+        max_wait = RATE_LIMIT_MAX_WAIT if max_wait is None else max_wait
+        started = time.monotonic()
+        while True:
+            wait = self.try_acquire(provider, tokens)
+            waited = time.monotonic() - started
+            if wait <= 0:
+                return waited
+            if waited + wait > max_wait:
+                raise RateLimitTimeout(
+                    f"{provider} quota unavailable for {wait:.1f}s "
+                    f"(max wait {max_wait:g}s)"
+                )
+            # Re-check at least once a second in case another process backed off.
+            time.sleep(min(wait, 1.0))
+
+    def report_success(self, provider: str, refund: int = 0) -> None:
+        """Additively restore the refill rate after a successful call
+
+        ``refund`` settles the call's token estimate against its actual usage
+        (negative when the call used more than was charged).
+        """
+        capacity = get_limits(provider)["tpm"]
+
+        def change(bucket, now):
+            bucket["throttle_streak"] = 0
+            bucket["rate_scale"] = min(1.0, bucket["rate_scale"] + RATE_SCALE_RECOVERY)
+            if capacity and refund:
+                bucket["tpm_level"] = min(capacity, bucket["tpm_level"] + refund)
+
+        self._update(provider, change)
+
+    def report_throttled(
+        self, provider: str, retry_after: Optional[float] = None, refund: int = 0
+    ) -> float:
+        """Record a 429: block until Retry-After and halve the refill rate
+
+        ``refund`` returns the tokens charged for the rejected request, which
+        the provider did not spend.
+        """
+        capacity = get_limits(provider)["tpm"]
+
+        def change(bucket, now):
+            if capacity and refund:
+                bucket["tpm_level"] = min(capacity, bucket["tpm_level"] + refund)
+            bucket["throttle_streak"] += 1
+            bucket["throttled_total"] += 1
+            bucket["rate_scale"] = max(MIN_RATE_SCALE, bucket["rate_scale"] / 2)
+            delay = retry_after
+            if delay is None:
+                delay = min(60.0, 2.0 ** bucket["throttle_streak"])
+            bucket["blocked_until"] = max(bucket["blocked_until"], now + delay)
+            bucket["rpm_level"] = 0.0
+            return delay
+
+        return self._update(provider, change)
+
+    def refund_tokens(self, provider: str, tokens: int) -> None:
+        """Return over-estimated tokens (or charge extra when negative)"""
+        capacity = get_limits(provider)["tpm"]
+        if not capacity or not tokens:
+            return
+
+        def change(bucket, now):
+            bucket["tpm_level"] = min(capacity, bucket["tpm_level"] + tokens)
+
+        self._update(provider, change)
+
+    def call(
+        self,
+        provider: str,
+        fn: Callable[[], Any],
+        tokens: int = 0,
+        max_retries: int = RATE_LIMIT_MAX_RETRIES,
+    ) -> Any:
+        """Run ``fn`` under the provider's quota, retrying 429s adaptively
+
+        ``tokens`` is charged up front; when the response reports its actual
+        usage the difference is refunded (or charged) afterwards, so the TPM
+        bucket tracks real spend rather than the estimate.
+        """
+        attempt = 0
+        while True:
+            self.acquire(provider, tokens)
+            try:
+                result = fn()
+            except Exception as e:
+                if not is_rate_limited(e) or attempt >= max_retries:
+                    raise
+                attempt += 1
+                delay = self.report_throttled(provider, retry_after_seconds(e), tokens)
+                print(
+                    f"⏳ {provider} rate limited, retry {attempt}/{max_retries} "
+                    f"in {delay:.1f}s"
+                )
+                continue
+            used = tokens_used(result)
+            refund = tokens - used if tokens and used is not None else 0
+            self.report_success(provider, refund)
+            return result
+
+    def headroom(self, provider: str) -> float:
+        """Fraction of the provider's quota that is idle right now (0 to 1)
+
+        Zero while the provider is blocked by a 429; capped by the reduced
+        refill rate while it recovers from one.
+        """
+        limits = get_limits(provider)
+        bucket = self._peek(provider)
+        if bucket["blocked_until"] > bucket["updated_at"]:
+            return 0.0
+        fractions = [bucket["rate_scale"]]
+        for name in ("rpm", "tpm"):
+            if limits[name]:
+                fractions.append(bucket[f"{name}_level"] / limits[name])
+        return max(0.0, min(fractions))
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Live bucket levels for every configured provider"""
+        levels = {}
+        for provider in sorted(set(DEFAULT_LIMITS) | self._known_providers()):
+            limits = get_limits(provider)
+            bucket = self._peek(provider)
+            levels[provider] = {
+                "rpm_limit": limits["rpm"],
+                "rpm_available": round(bucket["rpm_level"], 2),
+                "tpm_limit": limits["tpm"] or None,
+                "tpm_available": (
+                    round(bucket["tpm_level"], 1) if limits["tpm"] else None
+                ),
+                "rate_scale": round(bucket["rate_scale"], 2),
+                "blocked_for": round(
+                    max(0.0, bucket["blocked_until"] - bucket["updated_at"]), 1
+                ),
+                "granted_total": bucket["granted_total"],
+                "throttled_total": bucket["throttled_total"],
+            }
+        return levels
+
+    def _known_providers(self) -> set:
+        conn = self._connect()
+        try:
+            rows = conn.execute("SELECT provider FROM rate_buckets").fetchall()
+            return {row[0] for row in rows}
+        finally:
+            conn.close()
+
+
+_limiter = RateLimiter()
+
+
+def get_rate_limiter() -> RateLimiter:
+    """Process-wide limiter (state is shared with other processes via SQLite)"""
+    return _limiter
+
+
+def rate_limited_call(provider: str, fn: Callable[[], Any], tokens: int = 0) -> Any:
+    """Shortcut for ``get_rate_limiter().call``"""
+    return _limiter.call(provider, fn, tokens)
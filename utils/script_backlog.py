@@ -0,0 +1,200 @@
+"""
+Backlog of ready-to-render video items.
+
+Picking a topic, writing the script and planning the scenes are the LLM-bound
+part of a video job. Doing them at render time puts every slow completion on
+the video's critical path, so a background filler prepares items ahead of
+time instead: whenever the rate limiter shows the LLM providers mostly idle,
+it tops the backlog up to SCRIPT_BACKLOG_DEPTH items. Jobs pop the oldest
+item and only generate live when the backlog is empty. Items expire after
+SCRIPT_BACKLOG_TTL_HOURS, since the trends they were written for go stale.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional, Sequence
+
+from utils.rate_limiter import get_rate_limiter
+
+SCRIPT_BACKLOG_DB = os.getenv("SCRIPT_BACKLOG_DB", "script_backlog.db")
+# Items to keep ready; 0 disables the backlog.
+SCRIPT_BACKLOG_DEPTH = int(os.getenv("SCRIPT_BACKLOG_DEPTH", "3"))
+SCRIPT_BACKLOG_TTL = float(os.getenv("SCRIPT_BACKLOG_TTL_HOURS", "24")) * 3600
+# How often the filler checks the depth and the providers' quota.
+SCRIPT_BACKLOG_FILL_INTERVAL = float(os.getenv("SCRIPT_BACKLOG_FILL_MINUTES", "1")) * 60
+# The filler only spends quota while every LLM provider has at least this
+# fraction of its RPM/TPM buckets available.
+SCRIPT_BACKLOG_MIN_HEADROOM = float(os.getenv("SCRIPT_BACKLOG_MIN_HEADROOM", "0.5"))
+SCRIPT_BACKLOG_PROVIDERS = [
+    p.strip()
+    for p in os.getenv("SCRIPT_BACKLOG_PROVIDERS", "openai,azure").split(",")
+    if p.strip()
+]
+
+
+def has_spare_quota(
+    providers: Sequence[str] = SCRIPT_BACKLOG_PROVIDERS,
+    min_headroom: float = SCRIPT_BACKLOG_MIN_HEADROOM,
+) -> bool:
+    """True if every provider has at least ``min_headroom`` of its quota idle"""
+    limiter = get_rate_limiter()
+    return all(limiter.headroom(p) >= min_headroom for p in providers)
+
+
+class ScriptBacklog:
+    """SQLite queue of (topic, script, plan) items, oldest first"""
+
+    def __init__(
+        self,
+        db_path: str = SCRIPT_BACKLOG_DB,
+        depth: int = SCRIPT_BACKLOG_DEPTH,
+        ttl: float = SCRIPT_BACKLOG_TTL,
+    ):
+        self.db_path = db_path
+        self.depth = depth
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._initialized = False
+        self._counters = {"pushed": 0, "popped": 0, "empty": 0, "expired": 0}
+
+    @property
+    def enabled(self) -> bool:
+        return self.depth > 0
+
+    def _connect(self) -> sqlite3.Connection:
+        # Autocommit, so pop() can take the write lock up front with BEGIN
+        # IMMEDIATE and two processes never pop the same item.
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        if not self._initialized:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS backlog_items (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    topic TEXT,
+                    script TEXT,
+                    plan TEXT,
+                    created_at REAL,
+                    expires_at REAL
+                )
+                """
+            )
+            self._initialized = True
+        return conn
+
+    def _expire(self, conn: sqlite3.Connection) -> int:
+        removed = conn.execute(
+            "DELETE FROM backlog_items WHERE expires_at < ?", (time.time(),)
+        ).rowcount
+        self._counters["expired"] += removed
+        return removed
+
+    def push(self, topic: str, script: str, plan: Dict[str, Any]) -> int:
+        """Queue a prepared item; returns its id"""
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            try:
+                cursor = conn.execute(
+                    "INSERT INTO backlog_items (topic, script, plan, created_at, "
+                    "expires_at) VALUES (?, ?, ?, ?, ?)",
+                    (topic, script, json.dumps(plan, ensure_ascii=False), now, now + self.ttl),
+                )
+            finally:
+                conn.close()
+            self._counters["pushed"] += 1
+        return cursor.lastrowid
+
+    def pop(self) -> Optional[Dict[str, Any]]:
+        """Remove and return the oldest unexpired item, or None if there is none"""
+        with self._lock:
+            conn = self._connect()
+            try:
+                conn.execute("BEGIN IMMEDIATE")
+                try:
+                    self._expire(conn)
+                    row = conn.execute(
+                        "SELECT id, topic, script, plan, created_at FROM backlog_items "
+                        "ORDER BY id LIMIT 1"
+                    ).fetchone()
+                    if row is not None:
+                        conn.execute("DELETE FROM backlog_items WHERE id = ?", (row[0],))
+                    conn.execute("COMMIT")
+                except Exception:
+                    conn.execute("ROLLBACK")
+                    raise
+            finally:
+                conn.close()
+            if row is None:
+                self._counters["empty"] += 1
+                return None
+            self._counters["popped"] += 1
+        item_id, topic, script, plan, created_at = row
+        return {
+            "id": item_id,
+            "topic": topic,
+            "script": script,
+            "plan": json.loads(plan),
+            "created_at": created_at,
+        }
+
+    def purge(self) -> int:
+        """Drop expired items; returns how many were removed"""
+        with self._lock:
+            conn = self._connect()
+            try:
+                return self._expire(conn)
+            finally:
+                conn.close()
+
+    def topics(self) -> List[str]:
+        """Topics of the unexpired items, for steering new topics away from them"""
+        with self._lock:
+            conn = self._connect()
+            try:
+                rows = conn.execute(
+                    "SELECT topic FROM backlog_items WHERE expires_at >= ? ORDER BY id",
+                    (time.time(),),
+                ).fetchall()
+            finally:
+                conn.close()
+        return [row[0] for row in rows]
+
+    def missing(self) -> int:
+        """Items needed to reach the target depth"""
+        if not self.enabled:
+            return 0
+        return max(0, self.depth - len(self.topics()))
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            try:
+                count, oldest = conn.execute(
+                    "SELECT COUNT(*), MIN(created_at) FROM backlog_items "
+                    "WHERE expires_at >= ?",
+                    (now,),
+                ).fetchone()
+            finally:
+                conn.close()
+            return {
+                "depth": count,
+                "target_depth": self.depth,
+                "oldest_age_seconds": round(now - oldest, 1) if oldest else None,
+                **self._counters,
+            }
+
+
+_backlog = ScriptBacklog()
+
+
+def get_script_backlog() -> ScriptBacklog:
+    """Process-wide script backlog"""
+    return _backlog
+
+
+def get_script_backlog_stats() -> Dict[str, Any]:
+    return _backlog.stats()
@@ -0,0 +1,206 @@
+"""
+Bounded-lookahead pipelining of multi-stage jobs.
+
+A job that runs prepare → assets → render → upload leaves most of the host
+idle at any moment: the LLM and network stages wait on remote services while
+ffmpeg sits idle, then ffmpeg saturates the CPU while the network is quiet.
+``StagePipeline`` runs every stage on its own thread pool, whose size is that
+stage's concurrency budget, and hands a job to the next stage as soon as it
+leaves the previous one, so job N+1 is prepared while job N renders. At most
+``lookahead + 1`` jobs are in flight, which bounds how much work is done
+speculatively ahead of the slowest stage. After consecutive failed jobs,
+admission backs off exponentially, so a stage that fails fast (an outage, a
+bad key) does not turn the pipeline into a hot loop of doomed jobs.
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Sequence, Tuple
+
+# (name, fn, concurrency): fn takes a job and returns it (or a replacement)
+# for the next stage, None to drop it quietly, or raises to fail it.
+Stage = Tuple[str, Callable[[Any], Any], int]
+
+
+def parse_budgets(spec: str, defaults: Dict[str, int]) -> Dict[str, int]:
+    """Per-stage concurrency from "name=N,name=N", over ``defaults``"""
+    budgets = dict(defaults)
+    for part in spec.split(","):
+        name, _, value = part.partition("=")
+        if name.strip() and value.strip():
+            budgets[name.strip()] = max(1, int(value))
+    return budgets
+
+
+class StagePipeline:
+    """Moves jobs through ordered stages, each with its own concurrency"""
+
+    def __init__(
+        self,
+        stages: Sequence[Stage],
+        lookahead: int = 1,
+        on_error: Optional[Callable[[Any, str, Exception], None]] = None,
+        failure_backoff: float = 30.0,
+        max_backoff: float = 1800.0,
+    ):
+        self.stages = list(stages)
+        self.max_in_flight = 1 + max(0, lookahead)
+        self.on_error = on_error
+        # Delay before the next admission after N failed jobs in a row:
+        # failure_backoff * 2 ** (N - 1), capped at max_backoff.
+        self.failure_backoff = failure_backoff
+        self.max_backoff = max_backoff
+        self._failure_streak = 0
+        self._last_failure = 0.0
+        self._cond = threading.Condition()
+        self._in_flight = 0
+        self._stats: Dict[str, Dict[str, float]] = {
+            name: {"jobs": 0, "failed": 0, "busy_seconds": 0.0, "active": 0}
+            for name, _, _ in self.stages
+        }
+        self._completed = 0
+
+    def _run_stage(self, pools, index: int, job: Any) -> None:
+        name, fn, _ = self.stages[index]
+        stats = self._stats[name]
+        result = None
+        handed_on = False
+        with self._cond:
+            stats["active"] += 1
+        started = time.time()
+        try:
+            try:
+                result = fn(job)
+            except Exception as e:
+                with self._cond:
+                    stats["failed"] += 1
+                    self._failure_streak += 1
+                    self._last_failure = time.time()
+                if self.on_error is not None:
+                    try:
+                        self.on_error(job, name, e)
+                    except Exception as handler_error:
+                        print(f"⚠️ Pipeline error handler failed on {name}: {handler_error}")
+            else:
+                with self._cond:
+                    stats["jobs"] += 1
+            finally:
+                with self._cond:
+                    stats["active"] -= 1
+                    stats["busy_seconds"] += time.time() - started
+
+            if result is not None and index + 1 < len(self.stages):
+                pools[index + 1].submit(self._run_stage, pools, index + 1, result)
+                handed_on = True
+        finally:
+            # Always account for the job, or run() would wait on it forever.
+            if not handed_on:
+                with self._cond:
+                    if result is not None:
+                        self._completed += 1
+                        self._failure_streak = 0
+                    self._in_flight -= 1
+                    self._cond.notify_all()
+
+    def _backoff_until(self) -> float:
+        """Earliest admission time after the current run of failures"""
+        with self._cond:
+            if not self._failure_streak or self.failure_backoff <= 0:
+                return 0.0
+            delay = self.failure_backoff * 2 ** min(self._failure_streak - 1, 30)
+            return self._last_failure + min(self.max_backoff, delay)
+
+    def run(
+        self,
+        next_job: Callable[[], Any],
+        max_jobs: Optional[int] = None,
+        should_stop: Optional[Callable[[], bool]] = None,
+        min_interval: float = 0.0,
+    ) -> Dict[str, Any]:
+        """Admit jobs from ``next_job`` until it returns None, ``max_jobs`` is
+        reached or ``should_stop`` says so, then drain and report
+
+        A new job is admitted whenever fewer than ``lookahead + 1`` are in
+        flight, at least ``min_interval`` seconds after the previous one and
+        after any failure backoff has passed.
+        """
+        started = time.time()
+        admitted = 0
+        pools = [
+            ThreadPoolExecutor(max_workers=budget, thread_name_prefix=f"stage-{name}")
+            for name, _, budget in self.stages
+        ]
+        last_admit = 0.0
+        try:
+            while max_jobs is None or admitted < max_jobs:
+                with self._cond:
+                    while self._in_flight >= self.max_in_flight:
+                        self._cond.wait()
+                while True:
+                    # Re-checked each second: a job still in flight may fail
+                    # meanwhile and extend the backoff.
+                    wait = max(last_admit + min_interval, self._backoff_until())
+                    wait -= time.time()
+                    if wait <= 0 or (should_stop is not None and should_stop()):
+                        break
+                    time.sleep(min(wait, 1.0))
+                if should_stop is not None and should_stop():
+                    break
+                job = next_job()
+                if job is None:
+                    break
+                last_admit = time.time()
+                admitted += 1
+                with self._cond:
+                    self._in_flight += 1
+                pools[0].submit(self._run_stage, pools, 0, job)
+
+            with self._cond:
+                while self._in_flight:
+                    self._cond.wait()
+        finally:
+            for pool in pools:
+                pool.shutdown(wait=True)
+        return self.report(started, admitted)
+
+    def report(self, started: float, admitted: int) -> Dict[str, Any]:
+        wall = time.time() - started
+        with self._cond:
+            completed = self._completed
+            stages = {
+                name: {
+                    "jobs": int(s["jobs"]),
+                    "failed": int(s["failed"]),
+                    "busy_seconds": round(s["busy_seconds"], 2),
+                    "utilization": round(s["busy_seconds"] / wall, 2) if wall else 0.0,
+                }
+                for name, s in self._stats.items()
+            }
+        return {
+            "admitted": admitted,
+            "completed": completed,
+            "wall_seconds": round(wall, 2),
+            "jobs_per_hour": round(completed * 3600 / wall, 1) if wall else 0.0,
+            "failure_streak": self._failure_streak,
+            "stages": stages,
+        }
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Jobs in flight and per-stage activity, for status endpoints"""
+        with self._cond:
+            return {
+                "in_flight": self._in_flight,
+                "max_in_flight": self.max_in_flight,
+                "completed": self._completed,
+                "failure_streak": self._failure_streak,
+                "backoff_seconds": round(max(0.0, self._backoff_until() - time.time()), 1),
+                "stages": {
+                    name: {
+                        "active": int(s["active"]),
+                        "jobs": int(s["jobs"]),
+                        "failed": int(s["failed"]),
+                    }
+                    for name, s in self._stats.items()
+                },
+            }
@@ -0,0 +1,268 @@
+"""
+Disk-space governor for rendered output and the asset cache.
+
+Job workspaces, promoted videos, drafts and the scene files of ad-hoc renders
+accumulate under the output directories, and on a long-running host they
+eventually fill the disk and every render fails. ``StorageGovernor.collect``
+removes output older than STORAGE_MAX_AGE_HOURS, then evicts least recently
+used output and asset-cache entries until their combined size is within
+STORAGE_QUOTA_MB and the disk has STORAGE_MIN_FREE_MB free. Anything belonging
+to a job that is still running (its workspace, its promoted video) or touched
+within the grace period is never removed. ``admit`` runs before each render
+and holds it back while the disk stays below the free-space floor.
+"""
+
+import os
+import shutil
+import threading
+import time
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from utils.asset_cache import get_asset_cache
+from utils.job_state import get_job_store
+from utils.platform_utils import normalize_path, remove_file, remove_tree
+from utils.workspace import VIDEO_OUTPUT_DIR, WORKSPACE_ROOT, active_job_ids
+
+STORAGE_OUTPUT_DIR = os.getenv("STORAGE_OUTPUT_DIR", "output")
+# Combined budget for the output directories and the asset cache.
+STORAGE_QUOTA_BYTES = int(float(os.getenv("STORAGE_QUOTA_MB", "10240")) * 2**20)
+STORAGE_MAX_AGE = float(os.getenv("STORAGE_MAX_AGE_HOURS", "72")) * 3600
+# Renders are held back while the output filesystem has less than this free.
+STORAGE_MIN_FREE_BYTES = int(float(os.getenv("STORAGE_MIN_FREE_MB", "2048")) * 2**20)
+# Files touched this recently may belong to a render nobody registered.
+STORAGE_GRACE = float(os.getenv("STORAGE_GRACE_MINUTES", "15")) * 60
+STORAGE_ADMISSION_TIMEOUT = float(os.getenv("STORAGE_ADMISSION_TIMEOUT", "1800"))
+STORAGE_GC_INTERVAL = float(os.getenv("STORAGE_GC_INTERVAL_MINUTES", "10")) * 60
+
+
+class DiskSpaceLow(RuntimeError):
+    """Raised when free disk space stays below the floor for the admission timeout"""
+
+
+class OutputEntry(NamedTuple):
+    """A removable unit of output: a job workspace or a single file"""
+
+    path: str
+    size: int
+    last_used: float
+
+
+def _usage(path: str) -> Tuple[int, float]:
+    """Total size and latest access/modification time of a file or tree"""
+    if not os.path.isdir(path):
+        st = os.stat(path)
+        return st.st_size, max(st.st_mtime, st.st_atime)
+    # Writing files bumps the directory's own mtime, so only files count.
+    size, last_used = 0, None
+    for dirpath, _, filenames in os.walk(path):
+        for name in filenames:
+            try:
+                st = os.stat(os.path.join(dirpath, name))
+            except OSError:
+                continue
+            size += st.st_size
+            last_used = max(last_used or 0.0, st.st_mtime, st.st_atime)
+    return size, os.stat(path).st_mtime if last_used is None else last_used
+
+
+def _remove(path: str) -> None:
+    if os.path.isdir(path):
+        remove_tree(path)
+    else:
+        try:
+            remove_file(path)
+        except OSError:
+            pass
+
+
+class StorageGovernor:
+    """Keeps the output directories and the asset cache within their budget"""
+
+    def __init__(
+        self,
+        output_dirs: Optional[Iterable[str]] = None,
+        quota_bytes: int = STORAGE_QUOTA_BYTES,
+        max_age: float = STORAGE_MAX_AGE,
+        min_free_bytes: int = STORAGE_MIN_FREE_BYTES,
+        grace: float = STORAGE_GRACE,
+    ):
+        dirs = output_dirs or (WORKSPACE_ROOT, VIDEO_OUTPUT_DIR, STORAGE_OUTPUT_DIR)
+        self.output_dirs = list(dict.fromkeys(normalize_path(d) for d in dirs))
+        self.quota_bytes = quota_bytes
+        self.max_age = max_age
+        self.min_free_bytes = min_free_bytes
+        self.grace = grace
+        self._lock = threading.Lock()
+        self._counters = {
+            "collections": 0,
+            "evicted": 0,
+            "evicted_bytes": 0,
+            "admission_waits": 0,
+            "admission_wait_seconds": 0.0,
+        }
+        self._last_collection: Optional[float] = None
+
+    def in_use(self) -> set:
+        """Ids of jobs whose files must not be touched"""
+        return active_job_ids() | get_job_store().running_job_ids()
+
+    def _entries(self) -> Iterator[OutputEntry]:
+        """Each file or directory directly inside an output root
+
+        Roots nested in another root (output/jobs in output) are listed on
+        their own rather than as one unit, and the asset cache is skipped.
+        """
+        skip = set(self.output_dirs) | {normalize_path(get_asset_cache().cache_dir)}
+        for root in self.output_dirs:
+            if not os.path.isdir(root):
+                continue
+            for name in os.listdir(root):
+                path = os.path.join(root, name)
+                if path in skip:
+                    continue
+                try:
+                    size, last_used = _usage(path)
+                except OSError:
+                    continue
+                yield OutputEntry(path, size, last_used)
+
+    def _protected(self, entry: OutputEntry, in_use: set, now: float) -> bool:
+        if now - entry.last_used < self.grace:
+            return True
+        # Workspaces are named after their job and promoted files start with it.
+        name = os.path.basename(entry.path)
+        return any(name.startswith(job_id) for job_id in in_use)
+
+    def free_bytes(self) -> int:
+        root = next((d for d in self.output_dirs if os.path.isdir(d)), ".")
+        return shutil.disk_usage(root).free
+
+    def collect(self, need_free: int = 0) -> Dict[str, Any]:
+        """Evict stale and least recently used files; returns what was removed
+
+        ``need_free`` raises the free-space target above the configured floor.
+        """
+        now = time.time()
+        removed: List[Tuple[str, int]] = []
+        with self._lock:
+            in_use = self.in_use()
+            entries = list(self._entries())
+            cache = get_asset_cache()
+            cached = cache.entries()
+            used = sum(e.size for e in entries) + sum(size for _, size, _ in cached)
+
+            candidates = []
+            for entry in entries:
+                if self._protected(entry, in_use, now):
+                    continue
+                if now - entry.last_used > self.max_age:
+                    _remove(entry.path)
+                    removed.append((entry.path, entry.size))
+                    used -= entry.size
+                else:
+                    candidates.append((entry.last_used, entry.size, entry.path, None))
+            candidates.extend(
+                (last_access, size, None, key)
+                for key, size, last_access in cached
+                if now - last_access >= self.grace
+            )
+
+            freed = sum(size for _, size in removed)
+            shortfall = max(self.min_free_bytes, need_free) - self.free_bytes()
+            for last_used, size, path, key in sorted(candidates, key=lambda c: c[0]):
+                if used <= self.quota_bytes and shortfall <= 0:
+                    break
+                if key is not None:
+                    size = cache.evict(key)
+                    path = f"asset_cache:{key[:12]}"
+                else:
+                    _remove(path)
+                removed.append((path, size))
+                used -= size
+                freed += size
+                shortfall -= size
+
+            self._counters["collections"] += 1
+            self._counters["evicted"] += len(removed)
+            self._counters["evicted_bytes"] += freed
+            self._last_collection = now
+        if removed:
+            print(f"🧹 Storage: evicted {len(removed)} entries ({freed / 2**20:.1f} MB)")
+        return {"removed": [path for path, _ in removed], "freed_bytes": freed}
+
+    def admit(
+        self,
+        need_free: int = 0,
+        timeout: float = STORAGE_ADMISSION_TIMEOUT,
+        poll: float = 30.0,
+    ) -> float:
+        """Wait until the disk has room for a new render; returns seconds waited
+
+        Collects first when free space is below the floor; if that is not
+        enough (say, running jobs hold the space) it re-checks every ``poll``
+        seconds and raises DiskSpaceLow after ``timeout``.
+        """
+        target = max(self.min_free_bytes, need_free)
+        started = time.monotonic()
+        waited = 0.0
+        announced = False
+        while self.free_bytes() < target:
+            self.collect(need_free)
+            if self.free_bytes() >= target:
+                break
+            waited = time.monotonic() - started
+            if waited >= timeout:
+                raise DiskSpaceLow(
+                    f"Only {self.free_bytes() / 2**20:.0f} MB free after {waited:.0f}s, "
+                    f"need {target / 2**20:.0f} MB"
+                )
+            if not announced:
+                print(f"💾 Disk space low, holding render (need {target / 2**20:.0f} MB free)")
+                announced = True
+            time.sleep(min(poll, timeout - waited))
+            waited = time.monotonic() - started
+        if waited:
+            with self._lock:
+                self._counters["admission_waits"] += 1
+                self._counters["admission_wait_seconds"] += waited
+        return waited
+
+    def stats(self) -> Dict[str, Any]:
+        """Current usage per directory, free space and eviction counters"""
+        by_dir = {}
+        for root in self.output_dirs:
+            if os.path.isdir(root):
+                by_dir[root] = 0
+        for entry in self._entries():
+            by_dir[os.path.dirname(entry.path)] += entry.size
+        cache = get_asset_cache().stats()
+        output_mb = sum(by_dir.values()) / 2**20
+        with self._lock:
+            counters = dict(self._counters)
+            last = self._last_collection
+        counters["evicted_mb"] = round(counters.pop("evicted_bytes") / 2**20, 1)
+        counters["admission_wait_seconds"] = round(counters["admission_wait_seconds"], 1)
+        return {
+            "used_mb": round(output_mb + cache["size_mb"], 1),
+            "quota_mb": round(self.quota_bytes / 2**20, 1),
+            "output_mb": {root: round(size / 2**20, 1) for root, size in by_dir.items()},
+            "asset_cache_mb": cache["size_mb"],
+            "disk_free_mb": round(self.free_bytes() / 2**20, 1),
+            "min_free_mb": round(self.min_free_bytes / 2**20, 1),
+            "max_age_hours": round(self.max_age / 3600, 1),
+            "protected_jobs": sorted(self.in_use()),
+            "last_collection_age_seconds": round(time.time() - last, 1) if last else None,
+            **counters,
+        }
+
+
+_governor = StorageGovernor()
+
+
+def get_storage_governor() -> StorageGovernor:
+    """Process-wide storage governor"""
+    return _governor
+
+
+def get_storage_stats() -> Dict[str, Any]:
+    return _governor.stats()
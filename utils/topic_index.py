@@ -0,0 +1,341 @@
+"""
+Persistent near-duplicate index of past video topics and scripts.
+
+Each entry is embedded once and appended to a float32 vector file (loaded as
+a NumPy matrix of unit vectors) with its metadata in a ``topic_index`` table
+in video_logs.db. A lookup is a single matrix-vector product, so checking a
+new topic against tens of thousands of past ones takes milliseconds and runs
+before any image, voiceover or encode work is started.
+
+Without NumPy or an OpenAI key the index disables itself and every topic is
+treated as new.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional, Sequence
+
+try:
+    import numpy as np
+
+    NUMPY_AVAILABLE = True
+except ImportError:
+    np = None
+    NUMPY_AVAILABLE = False
+
+from utils.ai_clients import get_openai_client, provider_available
+from utils.rate_limiter import estimate_tokens, rate_limited_call
+
+TOPIC_INDEX_DB = os.getenv("TOPIC_INDEX_DB", "video_logs.db")
+TOPIC_INDEX_DIR = os.getenv("TOPIC_INDEX_DIR", "topic_index")
+EMBEDDING_MODEL = os.getenv("TOPIC_EMBEDDING_MODEL", "text-embedding-3-small")
+SIMILARITY_THRESHOLDS = {
+    "topic": float(os.getenv("TOPIC_SIMILARITY_THRESHOLD", "0.88")),
+    "script": float(os.getenv("SCRIPT_SIMILARITY_THRESHOLD", "0.92")),
+}
+TOPIC_INDEX_ENABLED = os.getenv("TOPIC_INDEX_ENABLED", "true").lower() == "true"
+
+
+def embed_texts(texts: Sequence[str]) -> List[List[float]]:
+    """Embed texts with the pooled OpenAI client (rate limited)"""
+
+    def call():
+        return get_openai_client().embeddings.create(
+            model=EMBEDDING_MODEL, input=list(texts)
+        )
+
+    response = rate_limited_call("openai", call, estimate_tokens(*texts))
+    return [item.embedding for item in response.data]
+
+
+class TopicIndex:
+    """Append-only cosine-similarity index for one kind of text"""
+
+    def __init__(
+        self,
+        kind: str = "topic",
+        db_path: str = TOPIC_INDEX_DB,
+        vector_dir: str = TOPIC_INDEX_DIR,
+        embed_fn=embed_texts,
+    ):
+        self.kind = kind
+        self.db_path = db_path
+        self.vector_path = os.path.join(vector_dir, f"{kind}.f32")
+        self.embed_fn = embed_fn
+        self._lock = threading.Lock()
+        self._matrix = None
+        self._size = 0
+        self._dim: Optional[int] = None
+        self._ids: List[int] = []
+        self._loaded = False
+        self._checks = 0
+        self._rejections = 0
+        self._init_db()
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def _init_db(self) -> None:
+        conn = self._connect()
+        try:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS topic_index (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    kind TEXT NOT NULL,
+                    row INTEGER NOT NULL,
+                    dim INTEGER NOT NULL,
+                    text TEXT,
+                    video_id TEXT,
+                    created_at REAL,
+                    UNIQUE (kind, row)
+                )
+                """
+            )
+            conn.commit()
+        finally:
+            conn.close()
+
+    @property
+    def enabled(self) -> bool:
+        has_embedder = self.embed_fn is not embed_texts or provider_available("openai")
+        return TOPIC_INDEX_ENABLED and NUMPY_AVAILABLE and has_embedder
+
+    def _load(self) -> None:
+        """Read the vector file and align it with the metadata rows"""
+        if self._loaded:
+            return
+        self._loaded = True
+        conn = self._connect()
+        try:
+            # Under the write lock, so no other process is between writing
+            # its vectors and recording them while the file is trimmed.
+            conn.execute("BEGIN IMMEDIATE")
+            rows = conn.execute(
+                "SELECT id, dim FROM topic_index WHERE kind = ? ORDER BY row",
+                (self.kind,),
+            ).fetchall()
+            if not os.path.exists(self.vector_path):
+                return
+            raw = np.fromfile(self.vector_path, dtype=np.float32)
+            dim = rows[0][1] if rows else 0
+            usable = min(len(rows), raw.size // dim) if dim else 0
+            if raw.size > usable * dim:
+                # A crash or failed insert after the vector write leaves
+                # vectors with no metadata; drop them so row numbers and
+                # file offsets stay aligned.
+                os.truncate(self.vector_path, usable * dim * 4)
+        finally:
+            conn.rollback()
+            conn.close()
+        if not usable:
+            return
+        self._dim = dim
+        self._grow(usable)
+        self._matrix[:usable] = raw[: usable * dim].reshape(usable, dim)
+        self._size = usable
+        self._ids = [row_id for row_id, _ in rows[:usable]]
+
+    def _reload(self) -> None:
+        self._matrix, self._size, self._ids, self._loaded = None, 0, [], False
+        self._load()
+
+    def _grow(self, needed: int) -> None:
+        """Ensure capacity for ``needed`` rows, doubling to amortise appends"""
+        capacity = 0 if self._matrix is None else self._matrix.shape[0]
+        if needed <= capacity:
+            return
+        new = np.zeros((max(needed, capacity * 2, 256), self._dim), np.float32)
+        if self._size:
+            new[: self._size] = self._matrix[: self._size]
+        self._matrix = new
+
+    @staticmethod
+    def _normalise(vectors: Any) -> Any:
+        vectors = np.asarray(vectors, dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+        return vectors / np.maximum(norms, 1e-12)
+
+    def search_vector(self, vector: Any, k: int = 5) -> List[Dict[str, Any]]:
+        """Top-``k`` past entries by cosine similarity to an embedding"""
+        with self._lock:
+            self._load()
+            if not self._size:
+                return []
+            scores = self._matrix[: self._size] @ self._normalise(vector)
+            k = min(k, self._size)
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top])]
+            ids = [self._ids[i] for i in top]
+            similarities = [float(scores[i]) for i in top]
+        return self._describe(ids, similarities)
+
+    def _describe(self, ids: List[int], similarities: List[float]) -> List[Dict]:
+        conn = self._connect()
+        try:
+            placeholders = ",".join("?" * len(ids))
+            rows = conn.execute(
+                f"SELECT id, text, video_id, created_at FROM topic_index "
+                f"WHERE id IN ({placeholders})",
+                ids,
+            ).fetchall()
+        finally:
+            conn.close()
+        meta = {row[0]: row[1:] for row in rows}
+        matches = []
+        for row_id, similarity in zip(ids, similarities):
+            text, video_id, created_at = meta.get(row_id, (None, None, None))
+            matches.append(
+                {
+                    "similarity": round(similarity, 4),
+                    "text": text,
+                    "video_id": video_id,
+                    "created_at": created_at,
+                }
+            )
+        return matches
+
+    def find_duplicate(
+        self, text: str, threshold: Optional[float] = None
+    ) -> Optional[Dict[str, Any]]:
+        """The closest past entry if it is at least ``threshold`` similar
+
+        Returns None for new topics, and also when the index is disabled or
+        the embedding call fails (the pipeline should not stall on it).
+        """
+        if not self.enabled or not text:
+            return None
+        if threshold is None:
+            threshold = SIMILARITY_THRESHOLDS.get(self.kind, 0.9)
+        try:
+            vector = self.embed_fn([text])[0]
+        except Exception as e:
+            print(f"⚠️ Topic index lookup skipped: {e}")
+            return None
+        self._checks += 1
+        matches = self.search_vector(vector, k=1)
+        if matches and matches[0]["similarity"] >= threshold:
+            self._rejections += 1
+            return matches[0]
+        return None
+
+    def add(self, text: str, video_id: Optional[str] = None) -> bool:
+        """Embed and append one entry; returns False when it could not be added"""
+        return self.add_many([text], [video_id]) == 1
+
+    def add_many(
+        self, texts: Sequence[str], video_ids: Optional[Sequence[Any]] = None
+    ) -> int:
+        """Embed and append entries in one batch (incremental, no rebuild)"""
+        texts = [t for t in texts if t]
+        if not self.enabled or not texts:
+            return 0
+        video_ids = list(video_ids or [None] * len(texts))
+        try:
+            vectors = self._normalise(self.embed_fn(texts))
+        except Exception as e:
+            print(f"⚠️ Could not add to topic index: {e}")
+            return 0
+
+        with self._lock:
+            self._load()
+            try:
+                start, ids = self._append(texts, video_ids, vectors)
+            except (sqlite3.Error, OSError) as e:
+                print(f"⚠️ Could not add to topic index: {e}")
+                return 0
+            if start is None:
+                return 0
+            if start != self._size:
+                # Another process appended since we loaded; re-read everything.
+                self._reload()
+                return len(texts)
+            self._grow(start + len(texts))
+            self._matrix[start : start + len(texts)] = vectors
+            self._size = start + len(texts)
+            self._ids.extend(ids)
+        return len(texts)
+
+    def _append(self, texts: List[str], video_ids: List[Any], vectors: Any) -> tuple:
+        """Write vectors at the next free rows and record them, atomically
+
+        The next row is read from SQLite under a write lock, so processes
+        sharing the index never reuse a row number, and the vectors are
+        written at ``row * dim`` rather than appended, so leftovers of a
+        failed write are overwritten. Returns (first row, ids), or
+        (None, []) if the embedding size does not match the index.
+        """
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                start, dim = conn.execute(
+                    "SELECT COALESCE(MAX(row) + 1, 0), MIN(dim) FROM topic_index "
+                    "WHERE kind = ?",
+                    (self.kind,),
+                ).fetchone()
+                dim = dim or self._dim or vectors.shape[1]
+                if vectors.shape[1] != dim:
+                    print(
+                        f"⚠️ Embedding size changed ({vectors.shape[1]} != {dim}); "
+                        f"not indexing"
+                    )
+                    conn.execute("ROLLBACK")
+                    return None, []
+                self._dim = dim
+                os.makedirs(os.path.dirname(self.vector_path) or ".", exist_ok=True)
+                with open(self.vector_path, "ab"):
+                    pass
+                with open(self.vector_path, "r+b") as f:
+                    f.truncate(start * dim * 4)
+                    f.seek(start * dim * 4)
+                    vectors.tofile(f)
+                now = time.time()
+                ids = []
+                for offset, (text, video_id) in enumerate(zip(texts, video_ids)):
+                    cursor = conn.execute(
+                        "INSERT INTO topic_index (kind, row, dim, text, video_id, "
+                        "created_at) VALUES (?, ?, ?, ?, ?, ?)",
+                        (self.kind, start + offset, dim, text[:2000], video_id, now),
+                    )
+                    ids.append(cursor.lastrowid)
+                conn.commit()
+            except BaseException:
+                conn.rollback()
+                raise
+        finally:
+            conn.close()
+        return start, ids
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            if self.enabled:
+                self._load()
+            return {
+                "enabled": self.enabled,
+                "entries": self._size,
+                "dimensions": self._dim,
+                "threshold": SIMILARITY_THRESHOLDS.get(self.kind),
+                "checks": self._checks,
+                "rejected": self._rejections,
+            }
+
+
+_indexes: Dict[str, TopicIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_topic_index(kind: str = "topic") -> TopicIndex:
+    """Process-wide index for ``kind`` ("topic" or "script")"""
+    with _indexes_lock:
+        if kind not in _indexes:
+            _indexes[kind] = TopicIndex(kind)
+        return _indexes[kind]
+
+
+def get_topic_index_stats() -> Dict[str, Any]:
+    return {
+        kind: get_topic_index(kind).stats() for kind in SIMILARITY_THRESHOLDS
+    }
@@ -0,0 +1,122 @@
+"""
+Batched ElevenLabs narration.
+
+Instead of one ``text_to_speech.convert`` call per scene, every scene's
+narration is voiced in a single ``convert_with_timestamps`` request, with the
+scenes separated by a paragraph break. The response carries per-character
+start/end times; the audio is cut (in-process, at MP3 frame boundaries)
+halfway through each pause between scenes, so every scene gets its own
+buffer and its duration follows from the split points. Narrations longer
+than TTS_BATCH_MAX_CHARS in total are sent as several consecutive batches.
+"""
+
+import base64
+import os
+from typing import Any, List, Sequence, Tuple
+
+from utils.ai_clients import ELEVENLABS_REQUEST_OPTIONS
+from utils.audio_utils import split_mp3
+
+# Each scene's narration starts a new paragraph, which the voice reads with a
+# natural pause: that pause is where the audio is cut.
+SCENE_SEPARATOR = "\n\n"
+# Per-request character budget; ElevenLabs caps requests at 5-40k characters
+# depending on the model.
+TTS_BATCH_MAX_CHARS = int(os.getenv("TTS_BATCH_MAX_CHARS", "4500"))
+
+
+class TTSAlignmentError(ValueError):
+    """Raised when a timestamped response cannot be split back into scenes"""
+
+
+def join_narrations(texts: Sequence[str]) -> Tuple[str, List[Tuple[int, int]]]:
+    """The batched request text and each narration's (start, end) offsets"""
+    spans = []
+    pos = 0
+    for i, text in enumerate(texts):
+        if i:
+            pos += len(SCENE_SEPARATOR)
+        spans.append((pos, pos + len(text)))
+        pos += len(text)
+    return SCENE_SEPARATOR.join(texts), spans
+
+
+def batch_groups(texts: Sequence[str], max_chars: int = TTS_BATCH_MAX_CHARS):
+    """Split narration indices into consecutive groups under ``max_chars``"""
+    groups: List[List[int]] = []
+    size = 0
+    for i, text in enumerate(texts):
+        extra = len(SCENE_SEPARATOR) + len(text)
+        if groups and size + extra <= max_chars:
+            groups[-1].append(i)
+            size += extra
+        else:
+            groups.append([i])
+            size = len(text)
+    return groups
+
+
+def _field(obj: Any, *names: str) -> Any:
+    """Attribute or key from an SDK model or a plain JSON dict"""
+    for name in names:
+        value = obj.get(name) if isinstance(obj, dict) else getattr(obj, name, None)
+        if value is not None:
+            return value
+    raise TTSAlignmentError(f"Response has no {' / '.join(names)}")
+
+
+def scene_cut_times(
+    alignment: Any, text: str, spans: Sequence[Tuple[int, int]]
+) -> List[float]:
+    """Times (seconds) midway through the pause between consecutive scenes"""
+    characters = _field(alignment, "characters")
+    starts = _field(alignment, "character_start_times_seconds")
+    ends = _field(alignment, "character_end_times_seconds")
+    if not len(characters) == len(starts) == len(ends) == len(text):
+        raise TTSAlignmentError(
+            f"Alignment covers {len(characters)} characters, "
+            f"the request had {len(text)}"
+        )
+    if "".join(characters) != text:
+        raise TTSAlignmentError("Alignment characters do not match the request text")
+
+    cuts = []
+    for (_, prev_end), (next_start, _) in zip(spans, spans[1:]):
+        last = prev_end - 1
+        while last > 0 and text[last].isspace():
+            last -= 1
+        first = next_start
+        while first < len(text) - 1 and text[first].isspace():
+            first += 1
+        cuts.append((ends[last] + starts[first]) / 2)
+    if cuts != sorted(cuts):
+        raise TTSAlignmentError("Alignment times are not in order")
+    return cuts
+
+
+def split_batched_audio(
+    audio: bytes, alignment: Any, text: str, spans: Sequence[Tuple[int, int]]
+) -> List[bytes]:
+    """One MP3 buffer per narration span"""
+    pieces = split_mp3(audio, scene_cut_times(alignment, text, spans))
+    empty = [i + 1 for i, piece in enumerate(pieces) if not piece]
+    if empty:
+        raise TTSAlignmentError(f"No audio left for scene(s) {empty}")
+    return pieces
+
+
+def synthesize_batch(
+    client: Any, texts: Sequence[str], voice_id: str, model_id: str
+) -> List[bytes]:
+    """Voice ``texts`` with one timestamped request; returns one MP3 per text"""
+    text, spans = join_narrations(texts)
+    response = client.text_to_speech.convert_with_timestamps(
+        voice_id=voice_id,
+        text=text,
+        model_id=model_id,
+        request_options=ELEVENLABS_REQUEST_OPTIONS,
+    )
+    # The SDK model names it audio_base_64; the JSON API says audio_base64.
+    audio = base64.b64decode(_field(response, "audio_base_64", "audio_base64"))
+    alignment = _field(response, "alignment")
+    return split_batched_audio(audio, alignment, text, spans)
@@ -0,0 +1,163 @@
+"""
+Per-job workspaces for video rendering.
+
+Every render gets its own directory under WORKSPACE_ROOT, so concurrent jobs
+never share ``scene_00.png`` / ``segment_00.mp4`` / ``final_video.mp4``. The
+finished video is promoted into VIDEO_OUTPUT_DIR with an atomic rename, and
+the workspace is removed according to WORKSPACE_CLEANUP. A process-wide
+semaphore caps how many jobs render at once.
+"""
+
+import os
+import re
+import shutil
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional
+
+from utils.platform_utils import ensure_directory, normalize_path, remove_tree
+
+WORKSPACE_ROOT = os.getenv("WORKSPACE_ROOT", os.path.join("output", "jobs"))
+VIDEO_OUTPUT_DIR = os.getenv("VIDEO_OUTPUT_DIR", os.path.join("output", "videos"))
+MAX_CONCURRENT_JOBS = int(os.getenv("MAX_CONCURRENT_VIDEO_JOBS", "2"))
+# Seconds to wait for a free job slot before giving up.
+JOB_SLOT_TIMEOUT = float(os.getenv("VIDEO_JOB_SLOT_TIMEOUT", "1800"))
+# "always", "on_success" (keep failed workspaces for debugging) or "never".
+WORKSPACE_CLEANUP = os.getenv("WORKSPACE_CLEANUP", "on_success")
+# Leftover workspaces older than this are removed by sweep_stale_workspaces.
+WORKSPACE_MAX_AGE = float(os.getenv("WORKSPACE_MAX_AGE_HOURS", "24")) * 3600
+
+
+_JOB_ID_PATTERN = re.compile(r"\d{8}-\d{6}-[0-9a-f]{8}")
+
+
+class WorkspaceBusy(RuntimeError):
+    """Raised when no job slot frees up within the slot timeout"""
+
+
+def new_job_id() -> str:
+    """Sortable, unique id for a render job"""
+    return f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}"
+
+
+def is_job_id(value: Any) -> bool:
+    """True if ``value`` has the form of a ``new_job_id`` id
+
+    Job ids end up in file and directory names, so ids that arrive from
+    outside (API requests) must be checked before they are used.
+    """
+    return isinstance(value, str) and _JOB_ID_PATTERN.fullmatch(value) is not None
+
+
+class JobWorkspace:
+    """A private directory for one render job"""
+
+    def __init__(self, job_id: Optional[str] = None, root: str = WORKSPACE_ROOT):
+        self.job_id = job_id or new_job_id()
+        self.path = normalize_path(os.path.join(root, self.job_id))
+        self.created_at = time.time()
+        self.promoted: Optional[str] = None
+        ensure_directory(self.path)
+
+    def path_for(self, name: str) -> str:
+        """Absolute path of ``name`` inside the workspace"""
+        return os.path.join(self.path, name)
+
+    def promote(self, src: str, name: Optional[str] = None) -> str:
+        """Move a finished file out of the workspace atomically
+
+        The file is first placed next to its destination under a temporary
+        name and then renamed, so readers of VIDEO_OUTPUT_DIR never see a
+        partial video, even when the workspace is on another filesystem.
+        """
+        out_dir = ensure_directory(normalize_path(VIDEO_OUTPUT_DIR))
+        ext = os.path.splitext(src)[1]
+        dest = os.path.join(out_dir, name or f"{self.job_id}{ext}")
+        try:
+            os.replace(src, dest)
+        except OSError:
+            staging = f"{dest}.{uuid.uuid4().hex[:8]}.part"
+            shutil.copyfile(src, staging)
+            os.replace(staging, dest)
+            os.remove(src)
+        self.promoted = dest
+        return dest
+
+    def cleanup(self) -> None:
+        remove_tree(self.path)
+
+
+_slots = threading.BoundedSemaphore(MAX_CONCURRENT_JOBS)
+_active: Dict[str, JobWorkspace] = {}
+_active_lock = threading.Lock()
+
+
+@contextmanager
+def job_workspace(
+    job_id: Optional[str] = None,
+    cleanup: str = WORKSPACE_CLEANUP,
+    timeout: float = JOB_SLOT_TIMEOUT,
+) -> Iterator[JobWorkspace]:
+    """Hold a job slot and a fresh workspace for the duration of a render"""
+    if not _slots.acquire(timeout=timeout):
+        raise WorkspaceBusy(
+            f"No video job slot free after {timeout:g}s "
+            f"({MAX_CONCURRENT_JOBS} jobs running)"
+        )
+    workspace = None
+    succeeded = False
+    try:
+        workspace = JobWorkspace(job_id)
+        with _active_lock:
+            _active[workspace.job_id] = workspace
+        print(f"📁 Job {workspace.job_id} workspace: {workspace.path}")
+        yield workspace
+        succeeded = True
+    finally:
+        if workspace is not None:
+            with _active_lock:
+                _active.pop(workspace.job_id, None)
+            if cleanup == "always" or (cleanup == "on_success" and succeeded):
+                workspace.cleanup()
+        _slots.release()
+
+
+def active_job_ids() -> set:
+    with _active_lock:
+        return set(_active)
+
+
+def sweep_stale_workspaces(max_age: float = WORKSPACE_MAX_AGE) -> int:
+    """Remove leftover workspaces older than ``max_age`` seconds"""
+    root = normalize_path(WORKSPACE_ROOT)
+    if not os.path.isdir(root):
+        return 0
+    active = active_job_ids()
+    removed = 0
+    now = time.time()
+    for name in os.listdir(root):
+        path = os.path.join(root, name)
+        if name in active or not os.path.isdir(path):
+            continue
+        if now - os.path.getmtime(path) > max_age:
+            remove_tree(path)
+            removed += 1
+    return removed
+
+
+def get_workspace_stats() -> Dict[str, Any]:
+    with _active_lock:
+        jobs = {
+            job_id: {
+                "path": ws.path,
+                "running_seconds": round(time.time() - ws.created_at, 1),
+            }
+            for job_id, ws in _active.items()
+        }
+    return {
+        "max_concurrent_jobs": MAX_CONCURRENT_JOBS,
+        "active_jobs": jobs,
+        "cleanup": WORKSPACE_CLEANUP,
+    }